@@ -1,45 +1,217 @@
 # backend/core/ai_client.py
 
+import json
 import os
-import requests
+from typing import AsyncIterator, Optional
+
+import httpx
 from fastapi import HTTPException
 
+from core.llm_cache import LLM_CACHE_ENABLED, cache_key, llm_cache
+from core.llm_dispatch import dispatcher
+from core.resilience import LLMProviderError, breaker, execute, timeout_for
+
+DEFAULT_API_URL = "https://api.siliconflow.com/v1/chat/completions"
+
+# Override to point at an OpenAI-compatible stand-in (e.g. scripts/llm_stub_server.py)
+API_URL = os.getenv("SILICONFLOW_API_URL", DEFAULT_API_URL)
+
 SILICONFLOW_API_KEY = os.getenv("SILICONFLOW_API_KEY")
-if not SILICONFLOW_API_KEY:
+if not SILICONFLOW_API_KEY and API_URL == DEFAULT_API_URL:
     raise RuntimeError("SILICONFLOW_API_KEY is missing in environment!")
-
-API_URL = "https://api.siliconflow.com/v1/chat/completions"
 MODEL_NAME = "Qwen/Qwen2.5-7B-Instruct"   # New model name
+SYSTEM_PROMPT = "You are a helpful AI assistant."
+# Qwen best temperature: 0.6 (soft, stable style)
+TEMPERATURE = 0.6
 
+# Connection pool sizing (per worker process).
+# - max connections: upper bound of concurrent sockets to the provider
+# - keepalive: idle sockets kept open for reuse between calls
+LLM_MAX_CONNECTIONS = int(os.getenv("LLM_MAX_CONNECTIONS", "200"))
+LLM_MAX_KEEPALIVE = int(os.getenv("LLM_MAX_KEEPALIVE", "50"))
+LLM_KEEPALIVE_EXPIRY = float(os.getenv("LLM_KEEPALIVE_EXPIRY", "30"))
+LLM_TIMEOUT = float(os.getenv("LLM_TIMEOUT", "60"))  # default; per-call-type budgets in core.resilience
+LLM_CONNECT_TIMEOUT = float(os.getenv("LLM_CONNECT_TIMEOUT", "5"))
 
-def call_siliconflow(prompt: str) -> str:
-    """Generic LLM call helper, always using Qwen2.5-7B-Instruct."""
+_client: Optional[httpx.AsyncClient] = None
 
-    headers = {
-        "Authorization": f"Bearer {SILICONFLOW_API_KEY}",
-        "Content-Type": "application/json",
-    }
 
+def get_client() -> httpx.AsyncClient:
+    """Return the shared pooled AsyncClient (created lazily on the running loop)."""
+    global _client
+    if _client is None or _client.is_closed:
+        _client = httpx.AsyncClient(
+            headers={
+                "Authorization": f"Bearer {SILICONFLOW_API_KEY or 'stub'}",
+                "Content-Type": "application/json",
+            },
+            limits=httpx.Limits(
+                max_connections=LLM_MAX_CONNECTIONS,
+                max_keepalive_connections=LLM_MAX_KEEPALIVE,
+                keepalive_expiry=LLM_KEEPALIVE_EXPIRY,
+            ),
+            timeout=httpx.Timeout(LLM_TIMEOUT, connect=LLM_CONNECT_TIMEOUT),
+        )
+    return _client
+
+
+async def close_client() -> None:
+    """Close the shared client (called on app shutdown)."""
+    global _client
+    if _client is not None and not _client.is_closed:
+        await _client.aclose()
+    _client = None
+
+
+async def call_siliconflow(
+    prompt: str, bypass_cache: bool = False, call_type: str = "reply", user_id: Optional[int] = None
+) -> str:
+    """Generic LLM call helper, always using Qwen2.5-7B-Instruct.
+
+    Identical requests are served from the response cache; bypass_cache=True
+    (force regenerate) always calls the model and refreshes the cached value.
+    call_type (reply | analysis | summary | quote) selects the timeout budget
+    and the priority in core.llm_dispatch, which queues calls fairly per user_id;
+    calls go through the circuit breaker and budgeted retries in core.resilience.
+    """
+    key = cache_key(MODEL_NAME, SYSTEM_PROMPT, prompt, TEMPERATURE)
+    if LLM_CACHE_ENABLED:
+        if bypass_cache:
+            llm_cache.record_bypass()
+        else:
+            cached = await llm_cache.get(key)
+            if cached is not None:
+                return cached
+
+    async with dispatcher.slot(call_type, user_id):
+        content = await execute(call_type, lambda timeout: _post_completion(prompt, timeout))
+
+    if LLM_CACHE_ENABLED and content:
+        await llm_cache.put(key, MODEL_NAME, content)
+    return content
+
+
+def _build_payload(prompt: str, stream: bool = False) -> dict:
     payload = {
         "model": MODEL_NAME,
         "messages": [
-            {"role": "system", "content": "You are a helpful AI assistant."},
+            {"role": "system", "content": SYSTEM_PROMPT},
             {"role": "user", "content": prompt},
         ],
-        # Qwen best temperature: 0.6 (soft, stable style)
-        "temperature": 0.6,
+        "temperature": TEMPERATURE,
     }
+    if stream:
+        payload["stream"] = True
+    return payload
+
+
+def _is_retryable_status(status_code: int) -> bool:
+    return status_code == 429 or status_code >= 500
+
+
+async def _post_completion(prompt: str, timeout: float) -> str:
+    payload = _build_payload(prompt)
 
     try:
-        resp = requests.post(API_URL, json=payload, headers=headers, timeout=60)
-    except Exception as e:
-        raise HTTPException(status_code=502, detail=f"SiliconFlow unreachable: {e}")
+        resp = await get_client().post(
+            API_URL,
+            json=payload,
+            timeout=httpx.Timeout(timeout, connect=LLM_CONNECT_TIMEOUT),
+        )
+    except httpx.HTTPError as e:
+        raise LLMProviderError(f"SiliconFlow unreachable: {e}") from e
 
     if resp.status_code != 200:
-        raise RuntimeError(f"SiliconFlow API error {resp.status_code}: {resp.text}")
+        raise LLMProviderError(
+            f"SiliconFlow API error {resp.status_code}: {resp.text[:500]}",
+            status_code=resp.status_code,
+            retryable=_is_retryable_status(resp.status_code),
+        )
 
-    data = resp.json()
     try:
-        return data["choices"][0]["message"]["content"].strip()
-    except:
-        return ""
+        content = resp.json()["choices"][0]["message"]["content"]
+    except (ValueError, KeyError, IndexError, TypeError) as e:
+        raise LLMProviderError(
+            f"SiliconFlow returned an invalid response: {resp.text[:200]}",
+            status_code=resp.status_code,
+        ) from e
+    return (content or "").strip()
+
+
+async def stream_siliconflow(
+    prompt: str, bypass_cache: bool = False, call_type: str = "reply", user_id: Optional[int] = None
+) -> AsyncIterator[str]:
+    """Streaming variant of call_siliconflow: yields content deltas as they arrive.
+
+    A cache hit is yielded as a single chunk. The full completion is written to
+    the response cache once the stream finishes.
+    """
+    key = cache_key(MODEL_NAME, SYSTEM_PROMPT, prompt, TEMPERATURE)
+    if LLM_CACHE_ENABLED:
+        if bypass_cache:
+            llm_cache.record_bypass()
+        else:
+            cached = await llm_cache.get(key)
+            if cached is not None:
+                yield cached
+                return
+
+    # The slot is held until the stream ends, so a long reply counts against the limit
+    async with dispatcher.slot(call_type, user_id):
+        # Streams are not retried or hedged (bytes already went to the client),
+        # but they respect the breaker and feed it their outcome.
+        if not breaker.allow():
+            raise HTTPException(status_code=503, detail="AI service temporarily unavailable.")
+
+        parts: list[str] = []
+        timeout = httpx.Timeout(timeout_for(call_type), connect=LLM_CONNECT_TIMEOUT)
+        recorded = False
+        try:
+            try:
+                async with get_client().stream(
+                    "POST", API_URL, json=_build_payload(prompt, stream=True), timeout=timeout
+                ) as resp:
+                    if resp.status_code != 200:
+                        body = (await resp.aread()).decode("utf-8", errors="replace")
+                        if _is_retryable_status(resp.status_code):
+                            breaker.record_failure()
+                        else:
+                            breaker.record_success()
+                        recorded = True
+                        raise HTTPException(status_code=502, detail=f"AI service error: {resp.status_code} {body[:200]}")
+
+                    # OpenAI-compatible SSE: "data: {json}" lines, terminated by "data: [DONE]"
+                    async for line in resp.aiter_lines():
+                        if not line.startswith("data:"):
+                            continue
+                        data = line[5:].strip()
+                        if data == "[DONE]":
+                            break
+                        try:
+                            delta = json.loads(data)["choices"][0]["delta"].get("content") or ""
+                        except Exception:
+                            continue
+                        if delta:
+                            parts.append(delta)
+                            yield delta
+            except httpx.HTTPError as e:
+                breaker.record_failure()
+                recorded = True
+                raise HTTPException(status_code=502, detail=f"SiliconFlow unreachable: {e}")
+            except HTTPException:
+                raise
+            except Exception:
+                breaker.record_failure()
+                recorded = True
+                raise
+
+            breaker.record_success()
+            recorded = True
+        finally:
+            # Consumer went away mid-stream (GeneratorExit / cancellation): free a half-open probe
+            if not recorded:
+                breaker.release_probe()
+
+    content = "".join(parts).strip()
+    if LLM_CACHE_ENABLED and content:
+        await llm_cache.put(key, MODEL_NAME, content)
@@ -0,0 +1,65 @@
+# backend/core/embeddings.py
+#
+# Offline text embeddings for "similar entries": a signed hashed bag of word
+# uni/bigrams (core/text_features) in EMBEDDING_DIM buckets. Signed feature
+# hashing is a sparse random projection, so cosine similarity between two
+# embeddings approximates the cosine between the full n-gram vectors. Stored
+# as int8 (one byte per dimension).
+
+from __future__ import annotations
+
+import numpy as np
+
+from core.text_features import hashed_ngrams
+
+EMBEDDING_DIM = 256
+
+# Bump when the featurization changes; stored vectors of older versions are recomputed
+EMBEDDING_VERSION = 1
+
+# Function words that would otherwise dominate every vector
+STOPWORDS = frozenset(
+    """
+    a an and are as at be been but by can could did do does for from had has have he her him his
+    how i i'm if in into is it it's its just me my of on or our out she so some than that the their
+    them then there they this to too up us was we were what when which who will with would you your
+    am all about again also any because before being both each few more most no nor not now off once
+    only other over own same should such under until very while why
+    """.split()
+)
+
+_SCALE = 127.0
+
+
+def embed(text: str) -> np.ndarray:
+    """int8 vector of length EMBEDDING_DIM (all zeros for text without content words)."""
+    vec = np.zeros(EMBEDDING_DIM, dtype=np.float32)
+    features = hashed_ngrams(text, EMBEDDING_DIM, max_n=2, skip=STOPWORDS)
+    if features:
+        idx = np.fromiter(features.keys(), dtype=np.int64, count=len(features))
+        vec[idx] = np.fromiter(features.values(), dtype=np.float32, count=len(features))
+        # Unit length already; scale so the largest component uses the full int8 range
+        peak = float(np.abs(vec).max())
+        if peak > 0:
+            vec *= _SCALE / peak
+    return np.rint(vec).astype(np.int8)
+
+
+def to_bytes(vec: np.ndarray) -> bytes:
+    return vec.astype(np.int8).tobytes()
+
+
+def from_bytes(raw: bytes) -> np.ndarray:
+    return np.frombuffer(raw, dtype=np.int8)
+
+
+def cosine_scores(matrix: np.ndarray, norms: np.ndarray, query: np.ndarray) -> np.ndarray:
+    """Cosine similarity of each int8 row of `matrix` (row norms given) with `query`."""
+    q = query.astype(np.float32)
+    q_norm = float(np.linalg.norm(q))
+    if q_norm == 0 or len(matrix) == 0:
+        return np.zeros(len(matrix), dtype=np.float32)
+    dots = matrix.astype(np.float32) @ q
+    with np.errstate(divide="ignore", invalid="ignore"):
+        scores = dots / (norms * q_norm)
+    return np.nan_to_num(scores, nan=0.0, posinf=0.0, neginf=0.0)
@@ -0,0 +1,143 @@
+# backend/core/json_extract.py
+#
+# Pull a JSON object/array out of an LLM completion in one left-to-right scan.
+# Candidate starts are found with a regex; the first few are handed straight
+# to the C decoder, otherwise the scan jumps between brackets, commas and whole
+# string literals (regexes that cannot backtrack across the text) and parses
+# each balanced candidate once. Prose, code fences and trailing text around
+# the JSON are skipped. Completions cut off mid-JSON are repaired: an open string is closed
+# and the open brackets are closed, or, failing that, the text is cut back to
+# the last complete member.
+
+from __future__ import annotations
+
+import json
+import re
+from typing import Any, Callable, Dict, List, Optional
+
+# Inside a candidate: a whole string literal (consumed in one match), a
+# structural character, or a quote that opens a string that never ends
+_TOKEN = re.compile(r'"[^"\\]*(?:\\.[^"\\]*)*"|[{}\[\],]|"', re.DOTALL)
+
+# Where a candidate may start: a bracket followed by what JSON allows there, so
+# prose like "{name}" or "[citation needed]" is skipped without a parse attempt
+_OBJECT_START = r'\{\s*["}]'
+_ARRAY_START = r'\[\s*[-"{\[\]0-9tfn]'
+_OBJECT_RE = re.compile(_OBJECT_START)
+_ARRAY_OR_OBJECT_RE = re.compile(f"{_ARRAY_START}|{_OBJECT_START}")
+
+_CLOSERS = {"{": "}", "[": "]"}
+
+# Deeper candidates are abandoned: model output never nests like this, and it
+# bounds both the repair work and json.loads recursion
+MAX_DEPTH = 32
+
+
+_decoder = json.JSONDecoder()
+
+# Candidates first tried with the C decoder, which parses a value and ignores
+# whatever follows it; later candidates only get the token scan, so prose full
+# of brackets cannot make the decoder re-read the text over and over
+DIRECT_ATTEMPTS = 3
+
+
+def _loads(candidate: str) -> Any:
+    try:
+        return json.loads(candidate)
+    except Exception:
+        return None
+
+
+def _closers(stack) -> str:
+    return "".join(_CLOSERS[c] for c in reversed(stack))
+
+
+def _scan(text: str, start_re: "re.Pattern[str]", accept: Callable[[Any], Any]) -> Any:
+    """First balanced (or repairable truncated) JSON value at a `start_re` match
+    for which accept(value) is not None; returns accept(value)."""
+    start = -1
+    stack: List[str] = []
+    checkpoint = None         # (end, open brackets) after the last complete member
+    in_string = False
+    pos = 0
+    attempts = 0
+
+    while True:
+        if start < 0:
+            m = start_re.search(text, pos)
+            if m is None:
+                return None
+            start, pos = m.start(), m.start() + 1
+
+            if attempts < DIRECT_ATTEMPTS:
+                attempts += 1
+                try:
+                    value, end = _decoder.raw_decode(text, start)
+                except Exception:
+                    pass
+                else:
+                    result = accept(value)
+                    if result is not None:
+                        return result
+                    start, pos = -1, end  # valid JSON, just not what we want
+                    continue
+
+            stack, checkpoint = [text[start]], None
+            continue
+
+        m = _TOKEN.search(text, pos)
+        if m is None:
+            break
+        tok, pos = m.group(), m.end()
+
+        if tok[0] == '"':
+            if len(tok) == 1:
+                in_string = True  # runs to the end of the text
+                break
+        elif tok == ",":
+            checkpoint = (m.start(), tuple(stack))
+        elif tok in "{[":
+            stack.append(tok)
+            if len(stack) > MAX_DEPTH:
+                start = -1
+        elif _CLOSERS[stack[-1]] != tok:
+            start = -1  # mismatched bracket: not JSON
+        else:
+            stack.pop()
+            if not stack:
+                result = accept(_loads(text[start:pos]))
+                if result is not None:
+                    return result
+                start = -1
+
+    # Truncated: close what is open, else fall back to the last complete member
+    tail = text[start:]
+    if in_string:
+        if (len(tail) - len(tail.rstrip("\\"))) % 2:
+            tail = tail[:-1]  # dangling escape
+        tail += '"'
+    result = accept(_loads(tail.rstrip().rstrip(",") + _closers(stack)))
+    if result is None and checkpoint is not None:
+        end, open_brackets = checkpoint
+        result = accept(_loads(text[start:end] + _closers(open_brackets)))
+    return result
+
+
+def extract_json_object(text: str) -> Optional[Dict[str, Any]]:
+    """The first JSON object in text (repaired if truncated), or None."""
+    return _scan(text or "", _OBJECT_RE, lambda v: v if isinstance(v, dict) else None)
+
+
+def _as_result_list(value: Any) -> Optional[List[Any]]:
+    if isinstance(value, dict):
+        value = value.get("results") or value.get("entries")
+    if isinstance(value, list) and all(isinstance(item, dict) for item in value):
+        return value
+    return None
+
+
+def extract_json_array(text: str) -> Optional[List[Any]]:
+    """The first JSON array of objects in text, or the "results"/"entries"
+    array of the first object that has one (repaired if truncated), or None.
+    Arrays of scalars (e.g. "[20]" in prose) are skipped."""
+    return _scan(text or "", _ARRAY_OR_OBJECT_RE, _as_result_list)
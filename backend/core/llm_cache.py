@@ -0,0 +1,215 @@
+# backend/core/llm_cache.py
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Optional
+
+from sqlalchemy import delete, select
+from sqlalchemy.dialects.postgresql import insert
+
+from database import SessionLocal
+from models import LLMResponseCache
+
+LLM_CACHE_ENABLED = os.getenv("LLM_CACHE_ENABLED", "true").lower() == "true"
+
+# In-memory tier (per worker process)
+LLM_CACHE_MEMORY_SIZE = int(os.getenv("LLM_CACHE_MEMORY_SIZE", "1024"))
+
+# Persistent tier (shared by all workers)
+LLM_CACHE_TTL_SECONDS = int(os.getenv("LLM_CACHE_TTL_SECONDS", str(7 * 24 * 3600)))
+LLM_CACHE_DB_MAX_ROWS = int(os.getenv("LLM_CACHE_DB_MAX_ROWS", "50000"))
+
+# Run DB eviction once every N writes
+_EVICT_EVERY_WRITES = 200
+
+
+def cache_key(model: str, system: str, prompt: str, temperature: float) -> str:
+    raw = json.dumps([model, system, prompt, temperature], ensure_ascii=False, separators=(",", ":"))
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class _LRU:
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self._data: "OrderedDict[str, tuple[str, datetime]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[str]:
+        now = datetime.now(timezone.utc)
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return None
+            value, expires_at = item
+            if expires_at <= now:
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def put(self, key: str, value: str, expires_at: datetime) -> None:
+        with self._lock:
+            self._data[key] = (value, expires_at)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+class LLMResponseCacheStore:
+    """Two-tier cache for LLM completions: in-memory LRU in front of a DB table."""
+
+    def __init__(self):
+        self.memory = _LRU(LLM_CACHE_MEMORY_SIZE)
+        self._lock = threading.Lock()
+        self._writes_since_evict = 0
+        self.counters: Dict[str, int] = {
+            "memory_hits": 0,
+            "db_hits": 0,
+            "misses": 0,
+            "bypasses": 0,
+            "writes": 0,
+            "evicted_rows": 0,
+        }
+
+    def _incr(self, name: str, n: int = 1) -> None:
+        with self._lock:
+            self.counters[name] += n
+
+    # ---------- DB tier (sync; called via asyncio.to_thread) ----------
+    def _db_get(self, key: str) -> Optional[tuple[str, datetime]]:
+        now = datetime.now(timezone.utc)
+        db = SessionLocal()
+        try:
+            row = db.execute(
+                select(LLMResponseCache).where(
+                    LLMResponseCache.cache_key == key,
+                    LLMResponseCache.expires_at > now,
+                )
+            ).scalar_one_or_none()
+            if row is None:
+                return None
+            row.hit_count = (row.hit_count or 0) + 1
+            row.last_hit_at = now
+            result = (row.response, row.expires_at)
+            db.commit()
+            return result
+        finally:
+            db.close()
+
+    def _db_put(self, key: str, model: str, value: str, expires_at: datetime) -> None:
+        now = datetime.now(timezone.utc)
+        db = SessionLocal()
+        try:
+            stmt = insert(LLMResponseCache).values(
+                cache_key=key,
+                model_name=model,
+                response=value,
+                expires_at=expires_at,
+                last_hit_at=now,
+            )
+            stmt = stmt.on_conflict_do_update(
+                index_elements=[LLMResponseCache.cache_key],
+                set_={"response": value, "expires_at": expires_at, "last_hit_at": now},
+            )
+            db.execute(stmt)
+            db.commit()
+        finally:
+            db.close()
+
+    def evict(self) -> int:
+        """Delete expired rows, then the least recently hit rows above the size cap."""
+        now = datetime.now(timezone.utc)
+        db = SessionLocal()
+        try:
+            removed = db.execute(
+                delete(LLMResponseCache).where(LLMResponseCache.expires_at <= now)
+            ).rowcount or 0
+
+            overflow_ids = (
+                select(LLMResponseCache.id)
+                .order_by(LLMResponseCache.last_hit_at.desc())
+                .offset(LLM_CACHE_DB_MAX_ROWS)
+                .scalar_subquery()
+            )
+            removed += db.execute(
+                delete(LLMResponseCache).where(LLMResponseCache.id.in_(overflow_ids))
+            ).rowcount or 0
+
+            db.commit()
+        finally:
+            db.close()
+
+        self._incr("evicted_rows", removed)
+        return removed
+
+    # ---------- public async API ----------
+    async def get(self, key: str) -> Optional[str]:
+        value = self.memory.get(key)
+        if value is not None:
+            self._incr("memory_hits")
+            return value
+
+        try:
+            found = await asyncio.to_thread(self._db_get, key)
+        except Exception:
+            found = None
+
+        if found is None:
+            self._incr("misses")
+            return None
+
+        value, expires_at = found
+        self.memory.put(key, value, expires_at)
+        self._incr("db_hits")
+        return value
+
+    async def put(self, key: str, model: str, value: str) -> None:
+        expires_at = datetime.now(timezone.utc) + timedelta(seconds=LLM_CACHE_TTL_SECONDS)
+        self.memory.put(key, value, expires_at)
+        self._incr("writes")
+
+        try:
+            await asyncio.to_thread(self._db_put, key, model, value, expires_at)
+        except Exception:
+            # Cache writes must never fail the LLM call itself
+            return
+
+        with self._lock:
+            self._writes_since_evict += 1
+            run_evict = self._writes_since_evict >= _EVICT_EVERY_WRITES
+            if run_evict:
+                self._writes_since_evict = 0
+        if run_evict:
+            try:
+                await asyncio.to_thread(self.evict)
+            except Exception:
+                pass
+
+    def record_bypass(self) -> None:
+        self._incr("bypasses")
+
+    def stats(self) -> Dict[str, object]:
+        with self._lock:
+            counters = dict(self.counters)
+        hits = counters["memory_hits"] + counters["db_hits"]
+        lookups = hits + counters["misses"]
+        return {
+            "enabled": LLM_CACHE_ENABLED,
+            **counters,
+            "hit_rate": round(hits / lookups, 3) if lookups else 0.0,
+            "llm_calls_saved": hits,
+            "memory_entries": len(self.memory),
+        }
+
+
+llm_cache = LLMResponseCacheStore()
@@ -0,0 +1,178 @@
+# backend/core/llm_dispatch.py
+
+from __future__ import annotations
+
+import asyncio
+import os
+import time
+from collections import OrderedDict, deque
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Deque, Dict, Optional
+
+
+# -----------------------------
+# Config
+# -----------------------------
+# Provider calls in flight at once (per worker process); the rest wait in the queue
+LLM_DISPATCH_CONCURRENCY = int(os.getenv("LLM_DISPATCH_CONCURRENCY", "32"))
+
+# A call that has waited this long is served before newer higher-priority calls
+LLM_DISPATCH_STARVATION_SECONDS = float(os.getenv("LLM_DISPATCH_STARVATION_SECONDS", "30"))
+
+# call_type -> priority class, most urgent first: someone is waiting on a
+# reply; quotes and insights notes block a screen; analysis is background work
+PRIORITIES = ("reply", "quote", "summary", "analysis")
+
+# Calls without a user (scripts, shared prompts) queue together
+_NO_USER = "-"
+
+
+@dataclass
+class _Waiter:
+    future: asyncio.Future
+    enqueued_at: float
+
+
+@dataclass
+class _ClassQueue:
+    # user -> that user's waiting calls; users are served round-robin in this order
+    users: "OrderedDict[Any, Deque[_Waiter]]" = field(default_factory=OrderedDict)
+    queued: int = 0
+    in_flight: int = 0
+    dispatched: int = 0
+    wait_total: float = 0.0
+    wait_max: float = 0.0
+    recent_waits: Deque[float] = field(default_factory=lambda: deque(maxlen=200))
+
+    def oldest(self) -> Optional[float]:
+        return min((calls[0].enqueued_at for calls in self.users.values()), default=None)
+
+    def pop(self) -> _Waiter:
+        user, calls = next(iter(self.users.items()))
+        waiter = calls.popleft()
+        if calls:
+            self.users.move_to_end(user)  # next call of this user goes behind the others
+        else:
+            del self.users[user]
+        self.queued -= 1
+        return waiter
+
+    def remove(self, user: Any, waiter: _Waiter) -> None:
+        calls = self.users.get(user)
+        if calls is not None and waiter in calls:
+            calls.remove(waiter)
+            self.queued -= 1
+            if not calls:
+                del self.users[user]
+
+
+class LLMDispatcher:
+    """Bounded, prioritized admission of outbound LLM calls.
+
+    At most `concurrency` calls run at once. When all slots are busy, a freed
+    slot goes to the most urgent class with waiting calls (see PRIORITIES);
+    within a class, users take turns, so one user's backfill does not queue
+    ahead of everyone else's calls. A call waiting longer than
+    starvation_seconds goes first regardless of class.
+    """
+
+    def __init__(self, concurrency: int = LLM_DISPATCH_CONCURRENCY,
+                 starvation_seconds: float = LLM_DISPATCH_STARVATION_SECONDS):
+        self.concurrency = max(1, concurrency)
+        self.starvation_seconds = starvation_seconds
+        self.active = 0
+        self.classes: Dict[str, _ClassQueue] = {name: _ClassQueue() for name in PRIORITIES}
+
+    @staticmethod
+    def class_for(call_type: str) -> str:
+        # Unknown call types are treated as background work
+        return call_type if call_type in PRIORITIES else PRIORITIES[-1]
+
+    def _queued(self) -> int:
+        return sum(q.queued for q in self.classes.values())
+
+    def _next_class(self) -> Optional[_ClassQueue]:
+        waiting = [q for q in self.classes.values() if q.queued]
+        if not waiting:
+            return None
+        cutoff = time.monotonic() - self.starvation_seconds
+        starved = [(oldest, q) for q in waiting if (oldest := q.oldest()) is not None and oldest <= cutoff]
+        if starved:
+            return min(starved, key=lambda item: item[0])[1]
+        return waiting[0]
+
+    def _dispatch(self) -> None:
+        while self.active < self.concurrency:
+            queue = self._next_class()
+            if queue is None:
+                return
+            waiter = queue.pop()
+            if waiter.future.done():  # cancelled while queued
+                continue
+            self.active += 1
+            waiter.future.set_result(None)
+
+    def _record_start(self, queue: _ClassQueue, waited: float) -> None:
+        queue.in_flight += 1
+        queue.dispatched += 1
+        queue.wait_total += waited
+        queue.wait_max = max(queue.wait_max, waited)
+        queue.recent_waits.append(waited)
+
+    def _release(self, queue: _ClassQueue) -> None:
+        queue.in_flight -= 1
+        self.active -= 1
+        self._dispatch()
+
+    @asynccontextmanager
+    async def slot(self, call_type: str, user_id: Optional[int] = None) -> AsyncIterator[None]:
+        """Hold one provider slot for the duration of the block."""
+        queue = self.classes[self.class_for(call_type)]
+        user = user_id if user_id is not None else _NO_USER
+        started = time.monotonic()
+
+        if self.active < self.concurrency and not self._queued():
+            self.active += 1
+        else:
+            waiter = _Waiter(asyncio.get_running_loop().create_future(), started)
+            queue.users.setdefault(user, deque()).append(waiter)
+            queue.queued += 1
+            try:
+                await waiter.future
+            except asyncio.CancelledError:
+                if waiter.future.done() and not waiter.future.cancelled():
+                    # Granted just as the caller went away: hand the slot on
+                    self.active -= 1
+                    self._dispatch()
+                else:
+                    queue.remove(user, waiter)
+                raise
+
+        self._record_start(queue, time.monotonic() - started)
+        try:
+            yield
+        finally:
+            self._release(queue)
+
+    def snapshot(self) -> Dict[str, Any]:
+        classes = {}
+        for name, q in self.classes.items():
+            waits = sorted(q.recent_waits)
+            p95 = waits[min(len(waits) - 1, int(len(waits) * 0.95))] if waits else None
+            classes[name] = {
+                "queued": q.queued,
+                "in_flight": q.in_flight,
+                "dispatched": q.dispatched,
+                "wait_avg_ms": round(q.wait_total / q.dispatched * 1000, 1) if q.dispatched else None,
+                "wait_p95_ms": round(p95 * 1000, 1) if p95 is not None else None,
+                "wait_max_ms": round(q.wait_max * 1000, 1),
+            }
+        return {"concurrency": self.concurrency, "active": self.active, "classes": classes}
+
+
+dispatcher = LLMDispatcher()
+
+
+def llm_dispatch_snapshot() -> Dict[str, Any]:
+    return dispatcher.snapshot()
@@ -0,0 +1,330 @@
+# backend/core/local_classifier.py
+
+from __future__ import annotations
+
+import json
+import math
+import os
+import threading
+from typing import Any, Dict, List, Optional
+
+from core.text_features import hashed_ngrams, tokenize
+
+try:
+    import numpy as np
+except ImportError:  # numpy is only needed for the hashed n-gram backend
+    np = None
+
+# "off": always use the LLM; "shadow": always use the LLM, log local agreement;
+# "on": use the local result when confident enough, otherwise fall back to the LLM
+LOCAL_CLASSIFIER_MODE = os.getenv("LOCAL_CLASSIFIER_MODE", "off").lower()
+LOCAL_CLASSIFIER_THRESHOLD = float(os.getenv("LOCAL_CLASSIFIER_THRESHOLD", "0.7"))
+
+# "lexicon" (built-in word lists) or "ngram" (linear model trained by scripts/train_local_classifier.py)
+LOCAL_CLASSIFIER_BACKEND = os.getenv("LOCAL_CLASSIFIER_BACKEND", "lexicon").lower()
+LOCAL_CLASSIFIER_WEIGHTS = os.getenv(
+    "LOCAL_CLASSIFIER_WEIGHTS",
+    os.path.join(os.path.dirname(os.path.dirname(__file__)), "data", "local_classifier.npz"),
+)
+
+EMOTION_LABELS = ["joy", "calm", "tired", "anxiety", "sadness", "anger"]
+THEME_LABELS = ["work", "hobbies", "social", "other"]
+
+# Shadow stats are bucketed by confidence so the threshold can be read off directly
+_CONFIDENCE_BUCKETS = [0.0, 0.3, 0.5, 0.6, 0.7, 0.8, 0.9]
+
+
+# -------------------------------
+# Lexicon backend
+# -------------------------------
+EMOTION_LEXICON: Dict[str, Dict[str, float]] = {
+    "joy": {
+        "happy": 1.0, "glad": 1.0, "joy": 1.0, "excited": 1.0, "great": 0.7, "amazing": 1.0,
+        "wonderful": 1.0, "fun": 0.8, "laughed": 0.9, "laugh": 0.8, "smile": 0.7, "smiled": 0.7,
+        "proud": 0.9, "grateful": 0.8, "love": 0.6, "loved": 0.7, "awesome": 1.0, "bright": 0.6,
+        "celebrate": 0.9, "celebrated": 0.9, "delighted": 1.0, "finally": 0.3, "yay": 1.0,
+        "good day": 0.8, "so good": 0.8, "开心": 1.0, "高兴": 1.0, "快乐": 1.0,
+    },
+    "calm": {
+        "calm": 1.0, "peaceful": 1.0, "quiet": 0.8, "relaxed": 1.0, "relaxing": 0.9, "relax": 0.8,
+        "tea": 0.4, "slow": 0.5, "gentle": 0.6, "clear": 0.5, "content": 0.7, "rest": 0.5,
+        "meditated": 0.9, "meditation": 0.8, "breathe": 0.6, "cozy": 0.8, "steady": 0.6,
+        "balanced": 0.7, "at ease": 1.0, "平静": 1.0, "放松": 1.0,
+    },
+    "tired": {
+        "tired": 1.0, "exhausted": 1.0, "sleepy": 1.0, "drained": 1.0, "fatigue": 1.0,
+        "worn": 0.7, "burnout": 1.0, "burned out": 1.0, "burnt out": 1.0, "nap": 0.6,
+        "sleep": 0.4, "overslept": 0.5, "long day": 0.8, "no energy": 1.0, "累": 1.0, "困": 1.0,
+    },
+    "anxiety": {
+        "anxious": 1.0, "anxiety": 1.0, "worried": 1.0, "worry": 0.9, "nervous": 1.0,
+        "stress": 0.8, "stressed": 0.9, "panic": 1.0, "afraid": 0.9, "scared": 0.9, "fear": 0.8,
+        "deadline": 0.6, "overwhelmed": 0.9, "uneasy": 0.9, "restless": 0.7, "tense": 0.8,
+        "pressure": 0.6, "what if": 0.6, "焦虑": 1.0, "担心": 1.0, "紧张": 1.0,
+    },
+    "sadness": {
+        "sad": 1.0, "cried": 1.0, "cry": 0.9, "crying": 1.0, "lonely": 1.0, "alone": 0.6,
+        "miss": 0.7, "missed": 0.6, "depressed": 1.0, "down": 0.5, "heartbroken": 1.0,
+        "hurt": 0.7, "lost": 0.5, "empty": 0.8, "grief": 1.0, "disappointed": 0.8, "upset": 0.6,
+        "难过": 1.0, "伤心": 1.0,
+    },
+    "anger": {
+        "angry": 1.0, "mad": 0.9, "furious": 1.0, "annoyed": 0.9, "annoying": 0.8,
+        "frustrated": 0.9, "frustrating": 0.8, "hate": 0.9, "hated": 0.9, "irritated": 0.9,
+        "rage": 1.0, "snapped": 0.9, "unfair": 0.7, "yelled": 0.9, "pissed": 1.0,
+        "fed up": 1.0, "生气": 1.0, "愤怒": 1.0,
+    },
+}
+
+THEME_LEXICON: Dict[str, Dict[str, float]] = {
+    "work": {
+        "work": 1.0, "job": 1.0, "office": 1.0, "boss": 1.0, "manager": 0.9, "meeting": 0.9,
+        "meetings": 0.9, "deadline": 0.9, "project": 0.7, "email": 0.6, "colleague": 0.9,
+        "colleagues": 0.9, "coworker": 0.9, "client": 0.8, "task": 0.6, "tasks": 0.6,
+        "exam": 0.8, "class": 0.6, "homework": 0.9, "study": 0.7, "studying": 0.7,
+        "interview": 0.8, "salary": 0.9, "career": 0.9, "工作": 1.0, "学习": 0.8,
+    },
+    "hobbies": {
+        "book": 0.8, "read": 0.6, "reading": 0.8, "game": 0.8, "games": 0.8, "gaming": 0.9,
+        "music": 0.8, "guitar": 1.0, "piano": 1.0, "paint": 0.9, "painting": 0.9, "draw": 0.8,
+        "drawing": 0.8, "movie": 0.7, "film": 0.6, "cook": 0.6, "cooking": 0.7, "baking": 0.8,
+        "garden": 0.8, "hike": 0.9, "hiking": 0.9, "run": 0.5, "running": 0.6, "gym": 0.7,
+        "yoga": 0.8, "photography": 0.9, "knitting": 1.0, "walked": 0.4, "walk": 0.4,
+        "爱好": 1.0,
+    },
+    "social": {
+        "friend": 1.0, "friends": 1.0, "family": 0.9, "mom": 0.8, "dad": 0.8, "mother": 0.8,
+        "father": 0.8, "sister": 0.8, "brother": 0.8, "partner": 0.8, "boyfriend": 0.9,
+        "girlfriend": 0.9, "party": 0.9, "dinner with": 0.9, "date": 0.6, "together": 0.5,
+        "talked": 0.5, "chat": 0.5, "called": 0.4, "visited": 0.6, "roommate": 0.8,
+        "朋友": 1.0, "家人": 1.0,
+    },
+}
+
+NEGATIONS = {"not", "no", "never", "don't", "didn't", "isn't", "wasn't", "can't", "couldn't", "hardly", "不", "没"}
+INTENSIFIERS = {"very", "so", "really", "extremely", "super", "totally", "incredibly", "completely", "too", "非常", "特别"}
+
+# Weight given to "other" when nothing points at a concrete theme
+_OTHER_THEME_PRIOR = 0.5
+
+
+def _grams(tokens: List[str]) -> List[tuple]:
+    """(position, gram) for unigrams and bigrams."""
+    grams = [(i, t) for i, t in enumerate(tokens)]
+    grams.extend((i, f"{tokens[i]} {tokens[i + 1]}") for i in range(len(tokens) - 1))
+    return grams
+
+
+class LexiconClassifier:
+    """Weighted keyword matching with simple negation and intensifier handling."""
+
+    name = "lexicon"
+
+    def classify(self, text: str) -> Dict[str, Any]:
+        tokens = tokenize(text)
+        grams = _grams(tokens)
+
+        emotion_scores = {label: 0.0 for label in EMOTION_LABELS}
+        boosted = 0
+        for pos, gram in grams:
+            for label, words in EMOTION_LEXICON.items():
+                weight = words.get(gram)
+                if weight is None:
+                    continue
+                window = tokens[max(0, pos - 2):pos]
+                if any(w in NEGATIONS for w in window):
+                    continue  # "not happy" is not evidence for joy
+                if any(w in INTENSIFIERS for w in window):
+                    weight *= 1.5
+                    boosted += 1
+                emotion_scores[label] += weight
+
+        theme_raw = {label: 0.0 for label in THEME_LABELS}
+        for _, gram in grams:
+            for label, words in THEME_LEXICON.items():
+                theme_raw[label] += words.get(gram, 0.0)
+        theme_raw["other"] += _OTHER_THEME_PRIOR
+
+        total_emotion = sum(emotion_scores.values())
+        if total_emotion > 0:
+            emotion = max(EMOTION_LABELS, key=lambda k: emotion_scores[k])
+            top = emotion_scores[emotion]
+            # Share of the winning label, damped when there is little evidence at all
+            emotion_conf = (top / total_emotion) * (1.0 - math.exp(-top / 1.5))
+        else:
+            emotion, top, emotion_conf = "calm", 0.0, 0.0
+
+        theme_total = sum(theme_raw.values())
+        theme_scores = {k: round(v / theme_total, 6) for k, v in theme_raw.items()}
+        primary_theme = max(THEME_LABELS, key=lambda k: theme_scores[k])
+        theme_conf = theme_scores[primary_theme]
+
+        exclaims = (text or "").count("!") + (text or "").count("！")
+        strength = top + 0.5 * boosted + 0.3 * min(exclaims, 3)
+        intensity = 1 if strength < 1.2 else (2 if strength < 2.5 else 3)
+
+        return {
+            "reply": "",
+            "emotion": emotion,
+            "intensity": intensity,
+            "theme_scores": theme_scores,
+            "primary_theme": primary_theme,
+            "confidence": round(emotion_conf * (0.5 + 0.5 * theme_conf), 4),
+        }
+
+
+# -------------------------------
+# Hashed n-gram linear backend
+# -------------------------------
+def _softmax(z):
+    z = z - z.max()
+    e = np.exp(z)
+    return e / e.sum()
+
+
+class HashedNgramClassifier:
+    """Softmax regression over hashed word 1-2 grams; weights come from a .npz file.
+
+    Expected arrays: dim, emotion_W/emotion_b, intensity_W/intensity_b, theme_W/theme_b
+    (W has shape (dim, n_labels)); label order matches EMOTION_LABELS / THEME_LABELS
+    and intensities 1..3.
+    """
+
+    name = "ngram"
+
+    def __init__(self, path: str):
+        if np is None:
+            raise RuntimeError("numpy is required for LOCAL_CLASSIFIER_BACKEND=ngram")
+        with np.load(path) as data:
+            self.dim = int(data["dim"])
+            self.weights = {
+                head: (data[f"{head}_W"].astype(np.float32), data[f"{head}_b"].astype(np.float32))
+                for head in ("emotion", "intensity", "theme")
+            }
+
+    def _predict(self, head: str, idx, vals):
+        W, b = self.weights[head]
+        return _softmax(vals @ W[idx] + b)
+
+    def classify(self, text: str) -> Dict[str, Any]:
+        features = hashed_ngrams(text, self.dim)
+        idx = np.fromiter(features.keys(), dtype=np.int64, count=len(features))
+        vals = np.fromiter(features.values(), dtype=np.float32, count=len(features))
+
+        p_emotion = self._predict("emotion", idx, vals)
+        p_intensity = self._predict("intensity", idx, vals)
+        p_theme = self._predict("theme", idx, vals)
+
+        e = int(p_emotion.argmax())
+        theme_scores = {label: round(float(p), 6) for label, p in zip(THEME_LABELS, p_theme)}
+        return {
+            "reply": "",
+            "emotion": EMOTION_LABELS[e],
+            "intensity": int(p_intensity.argmax()) + 1,
+            "theme_scores": theme_scores,
+            "primary_theme": THEME_LABELS[int(p_theme.argmax())],
+            "confidence": round(float(p_emotion[e]) * (0.5 + 0.5 * float(p_theme.max())), 4),
+        }
+
+
+# -------------------------------
+# Shadow-mode agreement stats
+# -------------------------------
+class AgreementStats:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.local_used = 0
+        self.llm_fallbacks = 0
+        self.buckets = {
+            b: {"n": 0, "emotion": 0, "theme": 0, "intensity": 0} for b in _CONFIDENCE_BUCKETS
+        }
+
+    def _bucket(self, confidence: float) -> float:
+        return max(b for b in _CONFIDENCE_BUCKETS if confidence >= b)
+
+    def record_local(self) -> None:
+        with self._lock:
+            self.local_used += 1
+
+    def record_comparison(self, local: Dict[str, Any], llm: Dict[str, Any]) -> None:
+        agree = {
+            "emotion": local["emotion"] == llm.get("emotion"),
+            "theme": local["primary_theme"] == llm.get("primary_theme"),
+            "intensity": local["intensity"] == llm.get("intensity"),
+        }
+        with self._lock:
+            self.llm_fallbacks += 1
+            bucket = self.buckets[self._bucket(local["confidence"])]
+            bucket["n"] += 1
+            for k, ok in agree.items():
+                bucket[k] += int(ok)
+
+        print("[local_classifier] " + json.dumps({
+            "confidence": local["confidence"],
+            "local": [local["emotion"], local["intensity"], local["primary_theme"]],
+            "llm": [llm.get("emotion"), llm.get("intensity"), llm.get("primary_theme")],
+            **agree,
+        }))
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            buckets = {}
+            for b, s in self.buckets.items():
+                if not s["n"]:
+                    continue
+                buckets[f">={b}"] = {
+                    "n": s["n"],
+                    **{k: round(s[k] / s["n"], 3) for k in ("emotion", "theme", "intensity")},
+                }
+            return {
+                "local_used": self.local_used,
+                "llm_fallbacks": self.llm_fallbacks,
+                "agreement_by_confidence": buckets,
+            }
+
+
+# -------------------------------
+# Module-level classifier
+# -------------------------------
+_classifier = None
+_classifier_lock = threading.Lock()
+agreement = AgreementStats()
+
+
+def enabled() -> bool:
+    return LOCAL_CLASSIFIER_MODE in ("on", "shadow")
+
+
+def get_classifier():
+    global _classifier
+    if _classifier is None:
+        with _classifier_lock:
+            if _classifier is None:
+                if LOCAL_CLASSIFIER_BACKEND == "ngram":
+                    _classifier = HashedNgramClassifier(LOCAL_CLASSIFIER_WEIGHTS)
+                else:
+                    _classifier = LexiconClassifier()
+    return _classifier
+
+
+def classify(text: str) -> Dict[str, Any]:
+    """Same shape as call_llm_for_reply_emotion_and_theme plus a 0..1 "confidence"."""
+    return get_classifier().classify(text)
+
+
+def accepts(result: Optional[Dict[str, Any]]) -> bool:
+    """True if the local result should be used instead of calling the LLM."""
+    return (
+        LOCAL_CLASSIFIER_MODE == "on"
+        and result is not None
+        and result["confidence"] >= LOCAL_CLASSIFIER_THRESHOLD
+    )
+
+
+def local_classifier_snapshot() -> Dict[str, Any]:
+    return {
+        "mode": LOCAL_CLASSIFIER_MODE,
+        "backend": LOCAL_CLASSIFIER_BACKEND,
+        "threshold": LOCAL_CLASSIFIER_THRESHOLD,
+        **agreement.snapshot(),
+    }
@@ -0,0 +1,263 @@
+# backend/core/rate_limit.py
+
+from __future__ import annotations
+
+import asyncio
+import math
+import os
+import threading
+import time
+import uuid
+from typing import Any, AsyncIterator, Dict, Optional, Tuple
+
+from fastapi import Depends, HTTPException
+from sqlalchemy import create_engine, text
+
+from core.auth import get_current_user
+from database import SQLALCHEMY_DATABASE_URL
+from models import User
+
+
+# -----------------------------
+# Config
+# -----------------------------
+RATE_LIMIT_ENABLED = os.getenv("RATE_LIMIT_ENABLED", "true").lower() == "true"
+
+# Backend: "memory" (per worker process) | "postgres" (buckets and slots shared by all workers)
+RATE_LIMIT_BACKEND = os.getenv("RATE_LIMIT_BACKEND", "memory")
+
+# Per-user buckets, by route class: refill rate and burst size
+USER_RATE_PER_MINUTE: Dict[str, float] = {
+    "reply": float(os.getenv("RATE_LIMIT_REPLY_PER_MINUTE", "6")),
+    "insights": float(os.getenv("RATE_LIMIT_INSIGHTS_PER_MINUTE", "30")),
+    "time_capsule": float(os.getenv("RATE_LIMIT_TIME_CAPSULE_PER_MINUTE", "10")),
+}
+USER_BURST: Dict[str, float] = {
+    "reply": float(os.getenv("RATE_LIMIT_REPLY_BURST", "3")),
+    "insights": float(os.getenv("RATE_LIMIT_INSIGHTS_BURST", "10")),
+    "time_capsule": float(os.getenv("RATE_LIMIT_TIME_CAPSULE_BURST", "5")),
+}
+
+# One bucket for all users and route classes, sized to the provider quota
+RATE_LIMIT_GLOBAL_PER_MINUTE = float(os.getenv("RATE_LIMIT_GLOBAL_PER_MINUTE", "600"))
+RATE_LIMIT_GLOBAL_BURST = float(os.getenv("RATE_LIMIT_GLOBAL_BURST", "100"))
+
+# LLM-backed requests a user may have in flight at once
+RATE_LIMIT_USER_CONCURRENCY = int(os.getenv("RATE_LIMIT_USER_CONCURRENCY", "2"))
+
+# postgres backend: a slot left behind by a dead worker is reused after this long
+RATE_LIMIT_LEASE_SECONDS = float(os.getenv("RATE_LIMIT_LEASE_SECONDS", "120"))
+
+# Retry-After for a request rejected because the user's slots are all busy
+CONCURRENCY_RETRY_AFTER = 1
+
+
+# -----------------------------
+# Backends
+# -----------------------------
+class MemoryRateLimitBackend:
+    """Token buckets and in-flight slots in this process only."""
+
+    def __init__(self):
+        self._buckets: Dict[str, Tuple[float, float]] = {}  # key -> (tokens, monotonic time)
+        self._slots: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    async def take(self, key: str, capacity: float, per_second: float, cost: float = 1.0) -> float:
+        """Spend cost tokens; returns 0 if allowed, else seconds until they are available."""
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated = self._buckets.get(key, (capacity, now))
+            tokens = min(capacity, tokens + (now - updated) * per_second)
+            if tokens >= cost:
+                self._buckets[key] = (tokens - cost, now)
+                return 0.0
+            self._buckets[key] = (tokens, now)
+        return (cost - tokens) / per_second if per_second > 0 else math.inf
+
+    async def acquire_slot(self, key: str, limit: int) -> Optional[str]:
+        with self._lock:
+            if self._slots.get(key, 0) >= limit:
+                return None
+            self._slots[key] = self._slots.get(key, 0) + 1
+        return key
+
+    async def release_slot(self, key: str, lease: str) -> None:
+        with self._lock:
+            remaining = self._slots.get(key, 0) - 1
+            if remaining > 0:
+                self._slots[key] = remaining
+            else:
+                self._slots.pop(key, None)
+
+
+class PostgresRateLimitBackend:
+    """Token buckets (rate_limit_buckets) and slot leases (rate_limit_leases) in Postgres.
+
+    Each check is one atomic statement, so all workers share the same limits.
+    """
+
+    _TAKE = text(
+        """
+        INSERT INTO rate_limit_buckets AS b (key, tokens, updated_at)
+        VALUES (:key, :capacity - :cost, clock_timestamp())
+        ON CONFLICT (key) DO UPDATE SET
+            tokens = LEAST(:capacity, b.tokens + EXTRACT(EPOCH FROM clock_timestamp() - b.updated_at) * :rate) - :cost,
+            updated_at = clock_timestamp()
+        WHERE LEAST(:capacity, b.tokens + EXTRACT(EPOCH FROM clock_timestamp() - b.updated_at) * :rate) >= :cost
+        RETURNING b.tokens
+        """
+    )
+    _AVAILABLE = text(
+        """
+        SELECT LEAST(:capacity, tokens + EXTRACT(EPOCH FROM clock_timestamp() - updated_at) * :rate)
+        FROM rate_limit_buckets WHERE key = :key
+        """
+    )
+    _ACQUIRE = text(
+        """
+        INSERT INTO rate_limit_leases AS l (key, slot, holder, expires_at)
+        VALUES (:key, :slot, :holder, clock_timestamp() + make_interval(secs => :ttl))
+        ON CONFLICT (key, slot) DO UPDATE SET holder = EXCLUDED.holder, expires_at = EXCLUDED.expires_at
+        WHERE l.expires_at < clock_timestamp()
+        RETURNING l.slot
+        """
+    )
+    _RELEASE = text("DELETE FROM rate_limit_leases WHERE key = :key AND holder = :holder")
+
+    def __init__(self):
+        # Dedicated pool: every statement commits on its own
+        self._engine = create_engine(
+            SQLALCHEMY_DATABASE_URL,
+            pool_size=int(os.getenv("RATE_LIMIT_POOL_SIZE", "5")),
+            max_overflow=int(os.getenv("RATE_LIMIT_MAX_OVERFLOW", "10")),
+            isolation_level="AUTOCOMMIT",
+        )
+
+    def _take(self, key: str, capacity: float, per_second: float, cost: float) -> float:
+        params = {"key": key, "capacity": capacity, "rate": per_second, "cost": cost}
+        with self._engine.connect() as conn:
+            if conn.execute(self._TAKE, params).first() is not None:
+                return 0.0
+            available = conn.execute(self._AVAILABLE, params).scalar() or 0.0
+        return (cost - float(available)) / per_second if per_second > 0 else math.inf
+
+    def _acquire_slot(self, key: str, limit: int) -> Optional[str]:
+        holder = uuid.uuid4().hex
+        with self._engine.connect() as conn:
+            for slot in range(limit):
+                params = {"key": key, "slot": slot, "holder": holder, "ttl": RATE_LIMIT_LEASE_SECONDS}
+                if conn.execute(self._ACQUIRE, params).first() is not None:
+                    return holder
+        return None
+
+    def _release_slot(self, key: str, lease: str) -> None:
+        with self._engine.connect() as conn:
+            conn.execute(self._RELEASE, {"key": key, "holder": lease})
+
+    async def take(self, key: str, capacity: float, per_second: float, cost: float = 1.0) -> float:
+        return await asyncio.to_thread(self._take, key, capacity, per_second, cost)
+
+    async def acquire_slot(self, key: str, limit: int) -> Optional[str]:
+        return await asyncio.to_thread(self._acquire_slot, key, limit)
+
+    async def release_slot(self, key: str, lease: str) -> None:
+        await asyncio.to_thread(self._release_slot, key, lease)
+
+
+# -----------------------------
+# Limiter
+# -----------------------------
+def _too_many(detail: str, retry_after: float) -> HTTPException:
+    return HTTPException(
+        status_code=429,
+        detail=detail,
+        headers={"Retry-After": str(max(1, math.ceil(min(retry_after, 3600))))},
+    )
+
+
+class RateLimiter:
+    """Admission for LLM-backed requests: user slot, then user bucket, then global bucket."""
+
+    def __init__(self, backend):
+        self.backend = backend
+        self._counters_lock = threading.Lock()
+        self.counters: Dict[str, int] = {
+            "allowed": 0,
+            "rejected_concurrency": 0,
+            "rejected_user_rate": 0,
+            "rejected_global_rate": 0,
+        }
+
+    def _count(self, name: str) -> None:
+        with self._counters_lock:
+            self.counters[name] += 1
+
+    async def acquire(self, user_id: int, route_class: str) -> Tuple[str, str]:
+        """Admit one request or raise 429; returns the slot to pass to release()."""
+        slot_key = f"user:{user_id}:inflight"
+        lease = await self.backend.acquire_slot(slot_key, RATE_LIMIT_USER_CONCURRENCY)
+        if lease is None:
+            self._count("rejected_concurrency")
+            raise _too_many("Too many AI requests in progress. Please wait for one to finish.", CONCURRENCY_RETRY_AFTER)
+
+        try:
+            wait = await self.backend.take(
+                f"user:{user_id}:{route_class}",
+                USER_BURST[route_class],
+                USER_RATE_PER_MINUTE[route_class] / 60.0,
+            )
+            if wait > 0:
+                self._count("rejected_user_rate")
+                raise _too_many("Too many AI requests. Please try again later.", wait)
+
+            wait = await self.backend.take("global", RATE_LIMIT_GLOBAL_BURST, RATE_LIMIT_GLOBAL_PER_MINUTE / 60.0)
+            if wait > 0:
+                self._count("rejected_global_rate")
+                raise _too_many("The AI service is busy. Please try again later.", wait)
+        except BaseException:
+            await self.backend.release_slot(slot_key, lease)
+            raise
+
+        self._count("allowed")
+        return slot_key, lease
+
+    async def release(self, slot: Tuple[str, str]) -> None:
+        await self.backend.release_slot(*slot)
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._counters_lock:
+            counters = dict(self.counters)
+        return {"enabled": RATE_LIMIT_ENABLED, "backend": RATE_LIMIT_BACKEND, **counters}
+
+
+def _build_backend():
+    if RATE_LIMIT_BACKEND == "postgres":
+        return PostgresRateLimitBackend()
+    return MemoryRateLimitBackend()
+
+
+rate_limiter = RateLimiter(_build_backend())
+
+
+def rate_limit_snapshot() -> Dict[str, Any]:
+    return rate_limiter.snapshot()
+
+
+def llm_rate_limit(route_class: str):
+    """Route dependency: 429 (with Retry-After) when the user or the service is over its
+    limits; otherwise holds one of the user's in-flight slots until the response is sent."""
+    if route_class not in USER_BURST:
+        raise ValueError(f"Unknown rate limit class: {route_class}")
+
+    async def _limit(current_user: User = Depends(get_current_user)) -> AsyncIterator[None]:
+        if not RATE_LIMIT_ENABLED:
+            yield
+            return
+        slot = await rate_limiter.acquire(current_user.id, route_class)
+        try:
+            yield
+        finally:
+            await rate_limiter.release(slot)
+
+    return _limit
@@ -0,0 +1,280 @@
+# backend/core/resilience.py
+
+from __future__ import annotations
+
+import asyncio
+import os
+import random
+import threading
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, Optional
+
+from fastapi import HTTPException
+
+
+# -----------------------------
+# Config
+# -----------------------------
+# Total time budget per attempt, by call type
+CALL_TIMEOUTS: Dict[str, float] = {
+    "reply": float(os.getenv("LLM_TIMEOUT_REPLY", "45")),
+    "analysis": float(os.getenv("LLM_TIMEOUT_ANALYSIS", "30")),
+    "summary": float(os.getenv("LLM_TIMEOUT_SUMMARY", "20")),
+    "quote": float(os.getenv("LLM_TIMEOUT_QUOTE", "15")),
+}
+DEFAULT_TIMEOUT = float(os.getenv("LLM_TIMEOUT", "60"))
+
+LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", "2"))
+LLM_RETRY_BASE_DELAY = float(os.getenv("LLM_RETRY_BASE_DELAY", "0.5"))
+LLM_RETRY_MAX_DELAY = float(os.getenv("LLM_RETRY_MAX_DELAY", "5"))
+
+# Retry budget: each request earns RATIO retry tokens, each retry spends one
+LLM_RETRY_BUDGET_RATIO = float(os.getenv("LLM_RETRY_BUDGET_RATIO", "0.2"))
+LLM_RETRY_BUDGET_MAX = float(os.getenv("LLM_RETRY_BUDGET_MAX", "20"))
+
+LLM_BREAKER_FAILURE_THRESHOLD = int(os.getenv("LLM_BREAKER_FAILURE_THRESHOLD", "5"))
+LLM_BREAKER_COOLDOWN = float(os.getenv("LLM_BREAKER_COOLDOWN", "30"))
+
+# Hedging: send a second request once the first is slower than the observed p95
+LLM_HEDGE_ENABLED = os.getenv("LLM_HEDGE_ENABLED", "false").lower() == "true"
+LLM_HEDGE_MIN_SAMPLES = int(os.getenv("LLM_HEDGE_MIN_SAMPLES", "20"))
+LLM_HEDGE_MIN_DELAY = float(os.getenv("LLM_HEDGE_MIN_DELAY", "1.0"))
+
+
+class LLMProviderError(Exception):
+    """A failed call to the LLM provider."""
+
+    def __init__(self, message: str, status_code: Optional[int] = None, retryable: bool = True):
+        super().__init__(message)
+        self.status_code = status_code
+        self.retryable = retryable
+
+
+def timeout_for(call_type: str) -> float:
+    return CALL_TIMEOUTS.get(call_type, DEFAULT_TIMEOUT)
+
+
+# -----------------------------
+# Retry budget
+# -----------------------------
+class RetryBudget:
+    """Token bucket that caps retries at a fraction of overall traffic.
+
+    Prevents retry storms: when the provider is failing for everyone,
+    retries stop once the budget is spent instead of multiplying load.
+    """
+
+    def __init__(self, ratio: float, max_tokens: float):
+        self.ratio = ratio
+        self.max_tokens = max_tokens
+        self._tokens = max_tokens
+        self._lock = threading.Lock()
+
+    def record_request(self) -> None:
+        with self._lock:
+            self._tokens = min(self.max_tokens, self._tokens + self.ratio)
+
+    def try_spend(self) -> bool:
+        with self._lock:
+            if self._tokens >= 1.0:
+                self._tokens -= 1.0
+                return True
+            return False
+
+    @property
+    def tokens(self) -> float:
+        return round(self._tokens, 2)
+
+
+# -----------------------------
+# Circuit breaker
+# -----------------------------
+class CircuitBreaker:
+    """closed -> open after N consecutive failures; open -> half_open after cooldown;
+    half_open lets one probe through: success closes, failure re-opens."""
+
+    def __init__(self, failure_threshold: int, cooldown: float):
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self.state = "closed"
+        self.consecutive_failures = 0
+        self.opened_at: Optional[float] = None
+        self.total_rejected = 0
+        self._probe_in_flight = False
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        with self._lock:
+            if self.state == "closed":
+                return True
+            if self.state == "open" and time.monotonic() - (self.opened_at or 0) >= self.cooldown:
+                self.state = "half_open"
+                self._probe_in_flight = False
+            if self.state == "half_open" and not self._probe_in_flight:
+                self._probe_in_flight = True
+                return True
+            self.total_rejected += 1
+            return False
+
+    def record_success(self) -> None:
+        with self._lock:
+            self.state = "closed"
+            self.consecutive_failures = 0
+            self.opened_at = None
+            self._probe_in_flight = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self.consecutive_failures += 1
+            if self.state == "half_open" or self.consecutive_failures >= self.failure_threshold:
+                self.state = "open"
+                self.opened_at = time.monotonic()
+            self._probe_in_flight = False
+
+    def release_probe(self) -> None:
+        """Free the half-open probe slot without an outcome (e.g. the call was cancelled)."""
+        with self._lock:
+            self._probe_in_flight = False
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            retry_in = None
+            if self.state == "open" and self.opened_at is not None:
+                retry_in = max(0.0, round(self.cooldown - (time.monotonic() - self.opened_at), 1))
+            return {
+                "state": self.state,
+                "consecutive_failures": self.consecutive_failures,
+                "retry_in_seconds": retry_in,
+                "total_rejected": self.total_rejected,
+            }
+
+
+# -----------------------------
+# Latency tracking (for hedging)
+# -----------------------------
+class LatencyTracker:
+    def __init__(self, window: int = 200):
+        self._samples: Dict[str, Deque[float]] = {}
+        self._window = window
+        self._lock = threading.Lock()
+
+    def record(self, call_type: str, seconds: float) -> None:
+        with self._lock:
+            self._samples.setdefault(call_type, deque(maxlen=self._window)).append(seconds)
+
+    def p95(self, call_type: str) -> Optional[float]:
+        with self._lock:
+            samples = list(self._samples.get(call_type, ()))
+        if len(samples) < LLM_HEDGE_MIN_SAMPLES:
+            return None
+        samples.sort()
+        return samples[min(len(samples) - 1, int(len(samples) * 0.95))]
+
+    def snapshot(self) -> Dict[str, Optional[float]]:
+        with self._lock:
+            call_types = list(self._samples.keys())
+        return {ct: (round(p, 3) if (p := self.p95(ct)) is not None else None) for ct in call_types}
+
+
+breaker = CircuitBreaker(LLM_BREAKER_FAILURE_THRESHOLD, LLM_BREAKER_COOLDOWN)
+retry_budget = RetryBudget(LLM_RETRY_BUDGET_RATIO, LLM_RETRY_BUDGET_MAX)
+latency = LatencyTracker()
+
+
+def _backoff_delay(attempt: int) -> float:
+    # Full jitter: uniform(0, min(max, base * 2^attempt))
+    return random.uniform(0, min(LLM_RETRY_MAX_DELAY, LLM_RETRY_BASE_DELAY * (2 ** attempt)))
+
+
+async def _attempt_with_hedge(call_type: str, fn: Callable[[float], Awaitable[Any]], timeout: float) -> Any:
+    """One logical attempt; optionally races a hedged duplicate after p95 latency."""
+    hedge_after = latency.p95(call_type) if LLM_HEDGE_ENABLED else None
+    if hedge_after is None:
+        return await asyncio.wait_for(fn(timeout), timeout)
+
+    hedge_after = max(hedge_after, LLM_HEDGE_MIN_DELAY)
+    primary = asyncio.ensure_future(asyncio.wait_for(fn(timeout), timeout))
+    try:
+        done, _ = await asyncio.wait({primary}, timeout=hedge_after)
+    except asyncio.CancelledError:
+        primary.cancel()
+        raise
+    if done:
+        return primary.result()
+
+    remaining = max(0.1, timeout - hedge_after)
+    hedge = asyncio.ensure_future(asyncio.wait_for(fn(remaining), remaining))
+    pending = {primary, hedge}
+    last_exc: Optional[BaseException] = None
+    try:
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task.exception() is None:
+                    return task.result()
+                last_exc = task.exception()
+        raise last_exc  # both failed
+    finally:
+        for task in pending:
+            task.cancel()
+
+
+async def execute(call_type: str, fn: Callable[[float], Awaitable[Any]]) -> Any:
+    """Run a provider call under breaker, per-type timeout, budgeted retries and hedging.
+
+    fn(timeout) performs one HTTP attempt and raises LLMProviderError on failure.
+    """
+    if not breaker.allow():
+        raise HTTPException(status_code=503, detail="AI service temporarily unavailable.")
+
+    retry_budget.record_request()
+    timeout = timeout_for(call_type)
+    attempt = 0
+
+    while True:
+        started = time.monotonic()
+        try:
+            result = await _attempt_with_hedge(call_type, fn, timeout)
+        except (LLMProviderError, asyncio.TimeoutError) as e:
+            retryable = getattr(e, "retryable", True)
+            if retryable:
+                breaker.record_failure()
+            else:
+                # The provider answered (e.g. 400): it is reachable
+                breaker.record_success()
+
+            can_retry = (
+                retryable
+                and attempt < LLM_MAX_RETRIES
+                and breaker.state == "closed"
+                and retry_budget.try_spend()
+            )
+            if not can_retry:
+                detail = "AI service timed out." if isinstance(e, asyncio.TimeoutError) else f"AI service error: {e}"
+                raise HTTPException(status_code=502, detail=detail) from e
+
+            await asyncio.sleep(_backoff_delay(attempt))
+            attempt += 1
+            continue
+        except Exception:
+            # Unexpected error: count it, which also frees a half-open probe
+            breaker.record_failure()
+            raise
+        except BaseException:
+            # Cancelled (client disconnect, shutdown): no outcome, but never keep the probe slot
+            breaker.release_probe()
+            raise
+
+        latency.record(call_type, time.monotonic() - started)
+        breaker.record_success()
+        return result
+
+
+def resilience_snapshot() -> Dict[str, Any]:
+    return {
+        "breaker": breaker.snapshot(),
+        "retry_budget_tokens": retry_budget.tokens,
+        "p95_seconds": latency.snapshot(),
+        "hedging": LLM_HEDGE_ENABLED,
+    }
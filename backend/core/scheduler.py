@@ -0,0 +1,308 @@
+# backend/core/scheduler.py
+
+from __future__ import annotations
+
+import asyncio
+import os
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional
+
+from sqlalchemy import create_engine, text
+from sqlalchemy.pool import NullPool
+
+from database import SQLALCHEMY_DATABASE_URL
+
+
+# -----------------------------
+# Config
+# -----------------------------
+SCHEDULER_ENABLED = os.getenv("SCHEDULER_ENABLED", "true").lower() == "true"
+
+# Jobs running at once in the leader process
+SCHEDULER_MAX_CONCURRENT_JOBS = int(os.getenv("SCHEDULER_MAX_CONCURRENT_JOBS", "2"))
+
+# How often due jobs are checked and leadership is (re)tried
+SCHEDULER_TICK_SECONDS = float(os.getenv("SCHEDULER_TICK_SECONDS", "20"))
+
+# Arbitrary constant shared by all workers; whoever holds it runs the jobs
+_LEADER_LOCK_ID = 0x7363686564  # "sched"
+
+
+# -----------------------------
+# Cron expressions
+# -----------------------------
+def _parse_field(spec: str, low: int, high: int) -> frozenset:
+    values = set()
+    for part in spec.split(","):
+        step = 1
+        if "/" in part:
+            part, step_text = part.split("/", 1)
+            step = int(step_text)
+        if part == "*":
+            first, last = low, high
+        elif "-" in part:
+            first, last = (int(v) for v in part.split("-", 1))
+        else:
+            first = last = int(part)
+        if step < 1 or first < low or last > high or first > last:
+            raise ValueError(f"Invalid cron field: {spec!r}")
+        values.update(range(first, last + 1, step))
+    return frozenset(values)
+
+
+class CronSchedule:
+    """Five-field cron expression (minute hour day-of-month month day-of-week), in UTC.
+
+    Fields accept *, a, a-b, */n, a-b/n and comma lists. Day of week is 0-6
+    with Sunday 0 (7 is also Sunday). As in cron, when both day fields are
+    restricted a day matches if either does.
+    """
+
+    def __init__(self, expression: str):
+        fields = expression.split()
+        if len(fields) != 5:
+            raise ValueError(f"Cron expression needs 5 fields: {expression!r}")
+        self.expression = expression
+        self.minutes = _parse_field(fields[0], 0, 59)
+        self.hours = _parse_field(fields[1], 0, 23)
+        self.days = _parse_field(fields[2], 1, 31)
+        self.months = _parse_field(fields[3], 1, 12)
+        self.weekdays = frozenset(d % 7 for d in _parse_field(fields[4], 0, 7))
+        self._any_day = fields[2] == "*"
+        self._any_weekday = fields[4] == "*"
+
+    def _day_matches(self, moment: datetime) -> bool:
+        day_ok = moment.day in self.days
+        weekday_ok = (moment.weekday() + 1) % 7 in self.weekdays  # Python: Monday 0
+        if self._any_day or self._any_weekday:
+            return day_ok and weekday_ok
+        return day_ok or weekday_ok
+
+    def next_after(self, moment: datetime) -> datetime:
+        """First matching minute strictly after moment (tz-aware, UTC)."""
+        candidate = moment.astimezone(timezone.utc).replace(second=0, microsecond=0) + timedelta(minutes=1)
+        # Whole days are skipped at once, so even a yearly schedule takes a few hundred steps
+        limit = candidate + timedelta(days=366 * 5)
+        while candidate < limit:
+            if candidate.month not in self.months or not self._day_matches(candidate):
+                candidate = (candidate + timedelta(days=1)).replace(hour=0, minute=0)
+            elif candidate.hour not in self.hours:
+                candidate = (candidate + timedelta(hours=1)).replace(minute=0)
+            elif candidate.minute not in self.minutes:
+                candidate += timedelta(minutes=1)
+            else:
+                return candidate
+        raise ValueError(f"Cron expression never matches: {self.expression!r}")
+
+
+# -----------------------------
+# Jobs
+# -----------------------------
+@dataclass
+class JobMetrics:
+    runs: int = 0
+    failures: int = 0
+    skipped: int = 0  # due while the previous run(s) still held every slot
+    running: int = 0
+    total_seconds: float = 0.0
+    max_seconds: float = 0.0
+    last_seconds: Optional[float] = None
+    last_started_at: Optional[datetime] = None
+    last_error: Optional[str] = None
+    last_result: Any = None
+
+
+@dataclass
+class Job:
+    name: str
+    schedule: CronSchedule
+    fn: Callable[[], Awaitable[Any]]
+    max_instances: int = 1
+    timeout: Optional[float] = None
+    next_run: Optional[datetime] = None
+    metrics: JobMetrics = field(default_factory=JobMetrics)
+
+
+async def run_bounded(items: Iterable[Any], fn: Callable[[Any], Awaitable[Any]], limit: int) -> tuple[List[Any], int]:
+    """Await fn(item) for every item, at most limit at a time.
+
+    Returns (results of the calls that succeeded, number that failed); one
+    failing item does not stop the others.
+    """
+    semaphore = asyncio.Semaphore(max(1, limit))
+    results: List[Any] = []
+    failures = 0
+
+    async def _one(item):
+        nonlocal failures
+        async with semaphore:
+            try:
+                results.append(await fn(item))
+            except Exception as e:
+                failures += 1
+                print(f"[scheduler] item {item!r} failed: {type(e).__name__}: {e}")
+
+    await asyncio.gather(*(_one(item) for item in items))
+    return results, failures
+
+
+class Scheduler:
+    """Runs cron jobs in exactly one worker process.
+
+    Every worker runs the loop, but only the one holding a session-level
+    Postgres advisory lock (on its own connection) starts jobs. If that
+    worker dies its connection closes, the lock is released and another
+    worker takes over on its next tick. A job that is still running when it
+    comes due again is skipped rather than stacked (max_instances).
+    """
+
+    def __init__(self, max_concurrent_jobs: int = SCHEDULER_MAX_CONCURRENT_JOBS):
+        self.jobs: Dict[str, Job] = {}
+        self.is_leader = False
+        self._slots = asyncio.Semaphore(max(1, max_concurrent_jobs))
+        self._running: set = set()
+        self._loop_task: Optional[asyncio.Task] = None
+        self._engine = None
+        self._conn = None
+
+    def job(self, name: str, cron: str, max_instances: int = 1, timeout: Optional[float] = None):
+        """Decorator registering an async function as a job."""
+
+        def _register(fn: Callable[[], Awaitable[Any]]):
+            self.jobs[name] = Job(name, CronSchedule(cron), fn, max_instances, timeout)
+            return fn
+
+        return _register
+
+    # ---- running jobs ----
+    def _launch(self, job: Job) -> Optional[asyncio.Task]:
+        if job.metrics.running >= job.max_instances:
+            job.metrics.skipped += 1
+            print(f"[scheduler] {job.name} skipped: previous run still in progress")
+            return None
+        job.metrics.running += 1
+        task = asyncio.create_task(self._run(job))
+        self._running.add(task)
+        task.add_done_callback(self._running.discard)
+        return task
+
+    async def _run(self, job: Job) -> None:
+        metrics = job.metrics
+        try:
+            async with self._slots:
+                metrics.last_started_at = datetime.now(timezone.utc)
+                started = time.perf_counter()
+                try:
+                    if job.timeout:
+                        metrics.last_result = await asyncio.wait_for(job.fn(), job.timeout)
+                    else:
+                        metrics.last_result = await job.fn()
+                    metrics.last_error = None
+                except Exception as e:
+                    metrics.failures += 1
+                    metrics.last_error = f"{type(e).__name__}: {e}"
+                    print(f"[scheduler] {job.name} failed: {metrics.last_error}")
+                finally:
+                    elapsed = time.perf_counter() - started
+                    metrics.runs += 1
+                    metrics.last_seconds = elapsed
+                    metrics.total_seconds += elapsed
+                    metrics.max_seconds = max(metrics.max_seconds, elapsed)
+        finally:
+            metrics.running -= 1
+
+    async def run_job(self, name: str) -> None:
+        """Run a job now (in this process, leader or not) and wait for it."""
+        task = self._launch(self.jobs[name])
+        if task is not None:
+            await task
+
+    # ---- leader election ----
+    def _hold_leadership(self) -> bool:
+        if self._engine is None:
+            # NullPool: closing the connection ends the session, which releases the lock
+            self._engine = create_engine(SQLALCHEMY_DATABASE_URL, poolclass=NullPool, isolation_level="AUTOCOMMIT")
+        try:
+            if self._conn is not None:
+                self._conn.execute(text("SELECT 1"))
+                return True
+            conn = self._engine.connect()
+            if conn.execute(text("SELECT pg_try_advisory_lock(:k)"), {"k": _LEADER_LOCK_ID}).scalar():
+                self._conn = conn
+                return True
+            conn.close()
+            return False
+        except Exception as e:
+            print(f"[scheduler] leader check failed: {type(e).__name__}: {e}")
+            self._release_leadership()
+            return False
+
+    def _release_leadership(self) -> None:
+        conn, self._conn = self._conn, None
+        if conn is not None:
+            try:
+                conn.close()
+            except Exception:
+                pass
+
+    # ---- loop ----
+    def _tick(self, now: datetime) -> None:
+        for job in self.jobs.values():
+            if job.next_run is None:
+                job.next_run = job.schedule.next_after(now)
+            elif job.next_run <= now:
+                # Followers advance too, so a new leader does not replay missed runs
+                if self.is_leader:
+                    self._launch(job)
+                job.next_run = job.schedule.next_after(now)
+
+    async def _loop(self) -> None:
+        while True:
+            leader = await asyncio.to_thread(self._hold_leadership)
+            if leader != self.is_leader:
+                print(f"[scheduler] {'acquired' if leader else 'lost'} leadership")
+            self.is_leader = leader
+            self._tick(datetime.now(timezone.utc))
+            await asyncio.sleep(SCHEDULER_TICK_SECONDS)
+
+    def start(self) -> None:
+        if self._loop_task is None:
+            self._loop_task = asyncio.create_task(self._loop())
+
+    async def stop(self) -> None:
+        tasks = [t for t in (self._loop_task, *self._running) if t is not None]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._loop_task = None
+        self.is_leader = False
+        await asyncio.to_thread(self._release_leadership)
+
+    def snapshot(self) -> Dict[str, Any]:
+        jobs = {}
+        for job in self.jobs.values():
+            m = job.metrics
+            jobs[job.name] = {
+                "schedule": job.schedule.expression,
+                "next_run": job.next_run.isoformat() if job.next_run else None,
+                "runs": m.runs,
+                "failures": m.failures,
+                "skipped": m.skipped,
+                "running": m.running,
+                "last_started_at": m.last_started_at.isoformat() if m.last_started_at else None,
+                "last_seconds": round(m.last_seconds, 3) if m.last_seconds is not None else None,
+                "avg_seconds": round(m.total_seconds / m.runs, 3) if m.runs else None,
+                "max_seconds": round(m.max_seconds, 3),
+                "last_error": m.last_error,
+                "last_result": m.last_result,
+            }
+        return {"enabled": SCHEDULER_ENABLED, "leader": self.is_leader, "jobs": jobs}
+
+
+scheduler = Scheduler()
+
+
+def scheduler_snapshot() -> Dict[str, Any]:
+    return scheduler.snapshot()
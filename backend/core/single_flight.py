@@ -0,0 +1,133 @@
+# backend/core/single_flight.py
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import os
+import time
+from typing import Any, Awaitable, Callable, Dict
+
+from sqlalchemy import create_engine, text
+
+from database import SQLALCHEMY_DATABASE_URL
+
+# Backend: "local" (one worker process) | "advisory" (Postgres advisory locks, multi-worker)
+SINGLE_FLIGHT_BACKEND = os.getenv("SINGLE_FLIGHT_BACKEND", "local")
+
+# How long a caller waits for another worker's lock before running anyway
+SINGLE_FLIGHT_LOCK_TIMEOUT = float(os.getenv("SINGLE_FLIGHT_LOCK_TIMEOUT", "90"))
+SINGLE_FLIGHT_POLL_INTERVAL = 0.1
+
+
+class _LeaderCancelled(Exception):
+    """Set on the shared future when the leader is cancelled; followers retry."""
+
+
+class LocalSingleFlight:
+    """Coalesce concurrent calls with the same key inside one process.
+
+    The first caller runs fn; callers arriving while it is in flight await the
+    same result (or exception). fn must return session-independent data
+    (ids, strings, dicts), since followers use their own DB sessions.
+    If the leader is cancelled, a waiting follower takes over and runs fn itself.
+    """
+
+    def __init__(self):
+        self._inflight: Dict[str, asyncio.Future] = {}
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[Any]]) -> Any:
+        while True:
+            fut = self._inflight.get(key)
+            if fut is None:
+                break
+            try:
+                return await asyncio.shield(fut)
+            except _LeaderCancelled:
+                # Only the leader was cancelled: lead the next attempt (or follow it)
+                continue
+
+        fut = asyncio.get_running_loop().create_future()
+        self._inflight[key] = fut
+        try:
+            result = await self._run(key, fn)
+        except Exception as e:
+            fut.set_exception(e)
+            # Mark as retrieved so an exception with no followers is not logged
+            fut.exception()
+            raise
+        except BaseException:
+            # Cancellation belongs to the leader; followers must not inherit it
+            fut.set_exception(_LeaderCancelled())
+            fut.exception()
+            raise
+        else:
+            fut.set_result(result)
+            return result
+        finally:
+            if self._inflight.get(key) is fut:
+                del self._inflight[key]
+
+    async def _run(self, key: str, fn: Callable[[], Awaitable[Any]]) -> Any:
+        return await fn()
+
+
+class AdvisoryLockSingleFlight(LocalSingleFlight):
+    """Single-flight across worker processes using Postgres advisory locks.
+
+    Same-process callers are coalesced in memory; the in-process leader then
+    takes a session-level advisory lock on the key. Leaders in other workers
+    wait for that lock and then run fn, which must re-check for a stored
+    result before calling the LLM.
+    """
+
+    def __init__(self):
+        super().__init__()
+        # Dedicated pool: a lock connection is held for the whole generation
+        self._engine = create_engine(
+            SQLALCHEMY_DATABASE_URL,
+            pool_size=int(os.getenv("SINGLE_FLIGHT_LOCK_POOL_SIZE", "10")),
+            max_overflow=int(os.getenv("SINGLE_FLIGHT_LOCK_MAX_OVERFLOW", "20")),
+            isolation_level="AUTOCOMMIT",
+        )
+
+    @staticmethod
+    def lock_id(key: str) -> int:
+        digest = hashlib.sha256(key.encode("utf-8")).digest()
+        return int.from_bytes(digest[:8], "big", signed=True)
+
+    def _try_lock(self, conn, lock_id: int) -> bool:
+        return bool(conn.execute(text("SELECT pg_try_advisory_lock(:k)"), {"k": lock_id}).scalar())
+
+    def _unlock(self, conn, lock_id: int) -> None:
+        conn.execute(text("SELECT pg_advisory_unlock(:k)"), {"k": lock_id})
+
+    async def _run(self, key: str, fn: Callable[[], Awaitable[Any]]) -> Any:
+        lock_id = self.lock_id(key)
+        conn = await asyncio.to_thread(self._engine.connect)
+        locked = False
+        try:
+            # Poll instead of blocking so waiting callers do not pin threads
+            deadline = time.monotonic() + SINGLE_FLIGHT_LOCK_TIMEOUT
+            while True:
+                locked = await asyncio.to_thread(self._try_lock, conn, lock_id)
+                if locked or time.monotonic() >= deadline:
+                    break
+                await asyncio.sleep(SINGLE_FLIGHT_POLL_INTERVAL)
+
+            return await fn()
+        finally:
+            try:
+                if locked:
+                    await asyncio.to_thread(self._unlock, conn, lock_id)
+            finally:
+                await asyncio.to_thread(conn.close)
+
+
+def _build_single_flight() -> LocalSingleFlight:
+    if SINGLE_FLIGHT_BACKEND == "advisory":
+        return AdvisoryLockSingleFlight()
+    return LocalSingleFlight()
+
+
+single_flight = _build_single_flight()
@@ -0,0 +1,48 @@
+# backend/core/text_features.py
+
+from __future__ import annotations
+
+import math
+import re
+import zlib
+from typing import AbstractSet, Dict, List
+
+# Latin words (with apostrophes) and single CJK characters; CJK "words" come from bigrams
+_TOKEN_RE = re.compile(r"[a-z0-9]+(?:'[a-z]+)?|[㐀-鿿]")
+
+
+def tokenize(text: str) -> List[str]:
+    return _TOKEN_RE.findall((text or "").lower())
+
+
+def _hash(feature: str) -> int:
+    # crc32 is stable across processes (built-in hash() is salted per process)
+    return zlib.crc32(feature.encode("utf-8"))
+
+
+def hashed_ngrams(text: str, dim: int, max_n: int = 2, skip: AbstractSet[str] = frozenset()) -> Dict[int, float]:
+    """Sparse, L2-normalized bag of hashed word n-grams (1..max_n).
+
+    Uses sublinear term frequency (1 + log tf) and signed hashing, so bucket
+    collisions tend to cancel out instead of adding up. Tokens in `skip` are
+    dropped before n-grams are formed.
+    """
+    tokens = [t for t in tokenize(text) if t not in skip]
+    counts: Dict[str, int] = {}
+    for n in range(1, max_n + 1):
+        for i in range(len(tokens) - n + 1):
+            gram = " ".join(tokens[i:i + n])
+            counts[gram] = counts.get(gram, 0) + 1
+
+    features: Dict[int, float] = {}
+    for gram, tf in counts.items():
+        h = _hash(gram)
+        sign = 1.0 if (h >> 31) & 1 else -1.0
+        idx = h % dim
+        features[idx] = features.get(idx, 0.0) + sign * (1.0 + math.log(tf))
+
+    norm = math.sqrt(sum(v * v for v in features.values()))
+    if norm > 0:
+        for idx in features:
+            features[idx] /= norm
+    return features
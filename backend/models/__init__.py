@@ -4,3 +4,9 @@ from .companion import AICompanion
 from .comment import JournalComment
 from .ai_reply import AIReply
 from .insights_note_cache import InsightsNoteCache
+from .analysis_job import AnalysisJob
+from .llm_response_cache import LLMResponseCache
+from .daily_rollup import UserDailyRollup, UserPeriodRollup
+from .import_job import ImportJob
+from .entry_embedding import EntryEmbedding
+from .rate_limit import RateLimitBucket, RateLimitLease
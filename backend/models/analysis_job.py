@@ -0,0 +1,44 @@
+from sqlalchemy import Column, DateTime, ForeignKey, Index, Integer, String, Text, func
+from sqlalchemy.orm import relationship
+
+from database import Base
+
+
+class AnalysisJob(Base):
+    __tablename__ = "analysis_jobs"
+
+    id = Column(Integer, primary_key=True, index=True)
+
+    # Entry to analyze (one job per entry write; re-queued on retry)
+    entry_id = Column(Integer, ForeignKey("journal_entries.id"), nullable=False, index=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+
+    # Set when the entry came from a bulk import (for import progress)
+    import_job_id = Column(Integer, ForeignKey("import_jobs.id"), nullable=True, index=True)
+
+    # Job type: "reply" (reply + analysis) | "analysis" (analysis only)
+    job_type = Column(String(20), nullable=False, server_default="analysis")
+
+    # Status: pending | running | done | failed
+    status = Column(String(20), nullable=False, server_default="pending")
+
+    # Number of times a worker has picked this job up
+    attempts = Column(Integer, nullable=False, server_default="0")
+    last_error = Column(Text, nullable=True)
+
+    # Earliest time a worker may (re)try this job (used for retry backoff)
+    run_after = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
+
+    created_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
+    updated_at = Column(
+        DateTime(timezone=True),
+        nullable=False,
+        server_default=func.now(),
+        onupdate=func.now(),
+    )
+
+    entry = relationship("JournalEntry")
+
+    __table_args__ = (
+        Index("ix_analysis_jobs_status_run_after", "status", "run_after"),
+    )
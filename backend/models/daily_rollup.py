@@ -0,0 +1,72 @@
+from sqlalchemy import Column, Date, DateTime, Float, ForeignKey, Integer, Numeric, String, func
+
+from database import Base
+
+
+class RollupTotals:
+    """Additive totals over non-deleted journal entries, shared by every rollup tier."""
+
+    entry_count = Column(Integer, nullable=False, server_default="0")
+    word_count = Column(Integer, nullable=False, server_default="0")
+    char_count = Column(Integer, nullable=False, server_default="0")
+
+    # Entries per emotion (entries without a valid emotion are only in entry_count)
+    emotion_joy = Column(Integer, nullable=False, server_default="0")
+    emotion_calm = Column(Integer, nullable=False, server_default="0")
+    emotion_tired = Column(Integer, nullable=False, server_default="0")
+    emotion_anxiety = Column(Integer, nullable=False, server_default="0")
+    emotion_sadness = Column(Integer, nullable=False, server_default="0")
+    emotion_anger = Column(Integer, nullable=False, server_default="0")
+
+    # Exact sums of the insights valence and the stats pleasure score over all entries
+    valence_sum = Column(Numeric(14, 2), nullable=False, server_default="0")
+    pleasure_sum = Column(Numeric(14, 2), nullable=False, server_default="0")
+
+    # Sums of per-entry normalized theme_scores, over theme_count entries with valid scores
+    theme_count = Column(Integer, nullable=False, server_default="0")
+    theme_work = Column(Float, nullable=False, server_default="0")
+    theme_hobbies = Column(Float, nullable=False, server_default="0")
+    theme_social = Column(Float, nullable=False, server_default="0")
+    theme_other = Column(Float, nullable=False, server_default="0")
+
+
+class UserDailyRollup(RollupTotals, Base):
+    """Per-user, per-day (UTC) totals over non-deleted journal entries.
+
+    Maintained incrementally by services.rollup_service on every entry write;
+    rebuild with scripts/rebuild_rollups.py.
+    """
+
+    __tablename__ = "user_daily_rollup"
+
+    user_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
+    day = Column(Date, primary_key=True)
+
+    updated_at = Column(
+        DateTime(timezone=True),
+        nullable=False,
+        server_default=func.now(),
+        onupdate=func.now(),
+    )
+
+
+class UserPeriodRollup(RollupTotals, Base):
+    """Per-user totals per UTC week (starting Monday) and calendar month: the
+    sums of the daily rows, maintained in the same upsert as them.
+    """
+
+    __tablename__ = "user_period_rollup"
+
+    user_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
+    period = Column(String(5), primary_key=True)  # week | month
+    start = Column(Date, primary_key=True)
+
+    # Days in the period with at least one entry
+    active_days = Column(Integer, nullable=False, server_default="0")
+
+    updated_at = Column(
+        DateTime(timezone=True),
+        nullable=False,
+        server_default=func.now(),
+        onupdate=func.now(),
+    )
@@ -7,12 +7,19 @@ from sqlalchemy import (
     Boolean,
     ForeignKey,
     JSON,
+    Index,
+    text,
+    Computed,
 )
-from sqlalchemy.orm import relationship
+from sqlalchemy.dialects.postgresql import TSVECTOR
+from sqlalchemy.orm import deferred, relationship
 from sqlalchemy import DateTime
 
 from database import Base
 
+# Text search configuration of content_tsv (stemming for English; CJK runs are kept as whole tokens)
+SEARCH_CONFIG = "english"
+
 
 class JournalEntry(Base):
     __tablename__ = "journal_entries"
@@ -46,6 +53,10 @@ class JournalEntry(Base):
     # Example: {"work":0.2,"hobbies":0.5,"social":0.1,"other":0.2}
     theme_scores = Column(JSON, nullable=True)
 
+    # Analysis pipeline state: pending | done | failed
+    # New entries start as pending and are filled in by the analysis worker
+    analysis_status = Column(String(20), nullable=False, default="done", server_default="done")
+
     # No longer store reply text directly; access via AIReply relationship
     ai_reply = relationship(
         "AIReply",
@@ -57,6 +68,16 @@ class JournalEntry(Base):
     # Soft-delete flag
     deleted = Column(Boolean, default=False, nullable=False)
 
+    # Full-text search vector over content (generated by Postgres; see services/search_service.py).
+    # Deferred: only the search query reads it
+    content_tsv = deferred(
+        Column(
+            TSVECTOR,
+            Computed(f"to_tsvector('{SEARCH_CONFIG}'::regconfig, content)", persisted=True),
+            nullable=True,
+        )
+    )
+
     # JournalEntry reverse relationship: comments
     comments = relationship(
         "JournalComment",
@@ -64,25 +85,55 @@ class JournalEntry(Base):
         cascade="all, delete-orphan",
     )
 
+    __table_args__ = (
+        # Hot read shape: user_id = ? AND deleted = false AND created_at in [start, end), newest first
+        Index(
+            "ix_journal_entries_user_created_live",
+            user_id,
+            created_at.desc(),
+            postgresql_where=text("deleted = false"),
+        ),
+        # Covering variant for the list view and keyset pages on (created_at, id): index-only scans
+        Index(
+            "ix_journal_entries_user_created_list",
+            user_id,
+            created_at.desc(),
+            id.desc(),
+            postgresql_include=["summary", "emotion", "primary_theme"],
+            postgresql_where=text("deleted = false"),
+        ),
+        # GET /entries/search
+        Index("ix_journal_entries_content_tsv", content_tsv, postgresql_using="gin"),
+    )
+
     # Dynamically computed pleasure score (not stored)
     @property
     def pleasure(self):
-        base_scores = {
-            "joy": 6,
-            "calm": 5,
-            "tired": 2,
-            "anxiety": 1,
-            "sadness": 2,
-            "anger": 0,
-        }
-
-        base = base_scores.get(self.emotion, 0)
-
-        intensity_weight = {
-            1: 1.0,
-            2: 1.2,
-            3: 1.5,
-        }
-
-        weight = intensity_weight.get(self.emotion_intensity, 1.0)
-        return round(base * weight, 2)
+        return pleasure_score(self.emotion, self.emotion_intensity)
+
+
+PLEASURE_BASE_SCORES = {
+    "joy": 6,
+    "calm": 5,
+    "tired": 2,
+    "anxiety": 1,
+    "sadness": 2,
+    "anger": 0,
+}
+
+PLEASURE_INTENSITY_WEIGHT = {
+    1: 1.0,
+    2: 1.2,
+    3: 1.5,
+}
+
+
+def pleasure_score(emotion, emotion_intensity):
+    base = PLEASURE_BASE_SCORES.get(emotion, 0)
+    weight = PLEASURE_INTENSITY_WEIGHT.get(emotion_intensity, 1.0)
+    return round(base * weight, 2)
+
+
+# Summary shown on the list page (first 200 chars)
+def generate_summary(content: str) -> str:
+    return content[:200].strip()
@@ -0,0 +1,21 @@
+from sqlalchemy import Column, DateTime, ForeignKey, Integer, LargeBinary, SmallInteger, func
+
+from database import Base
+
+
+class EntryEmbedding(Base):
+    """Embedding of one entry's content (core/embeddings.py), int8 bytes.
+
+    Filled lazily by services.embedding_service the first time a user's
+    similarity index is needed; recomputed when EMBEDDING_VERSION changes.
+    """
+
+    __tablename__ = "entry_embeddings"
+
+    entry_id = Column(Integer, ForeignKey("journal_entries.id", ondelete="CASCADE"), primary_key=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
+
+    version = Column(SmallInteger, nullable=False)
+    vector = Column(LargeBinary, nullable=False)
+
+    created_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
@@ -0,0 +1,35 @@
+from sqlalchemy import JSON, Column, DateTime, ForeignKey, Integer, String, func
+
+from database import Base
+
+
+class ImportJob(Base):
+    """One bulk upload of historical entries (POST /entries/import).
+
+    Analysis progress is read from the analysis_jobs rows that point here.
+    """
+
+    __tablename__ = "import_jobs"
+
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
+
+    # Upload format: jsonl | csv
+    format = Column(String(10), nullable=False)
+
+    # Ingest state: ingesting | ingested | failed
+    status = Column(String(20), nullable=False, server_default="ingesting")
+
+    rows_ingested = Column(Integer, nullable=False, server_default="0")
+    rows_failed = Column(Integer, nullable=False, server_default="0")
+
+    # First few rejected rows: [{"row": 12, "error": "..."}]
+    errors = Column(JSON, nullable=True)
+
+    created_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
+    updated_at = Column(
+        DateTime(timezone=True),
+        nullable=False,
+        server_default=func.now(),
+        onupdate=func.now(),
+    )
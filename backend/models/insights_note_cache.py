@@ -9,7 +9,7 @@ class InsightsNoteCache(Base):
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
 
-    range_type = Column(String(10), nullable=False)  # week | month
+    range_type = Column(String(10), nullable=False)  # week | month | quarter | year | custom
     start_date = Column(Date, nullable=False)
     end_date = Column(Date, nullable=False)
 
@@ -0,0 +1,21 @@
+from sqlalchemy import Column, DateTime, Integer, String, Text, func
+
+from database import Base
+
+
+class LLMResponseCache(Base):
+    __tablename__ = "llm_response_cache"
+
+    id = Column(Integer, primary_key=True, index=True)
+
+    # sha256 of (model, system message, prompt, temperature)
+    cache_key = Column(String(64), nullable=False, unique=True, index=True)
+
+    model_name = Column(String(100), nullable=True)
+    response = Column(Text, nullable=False)
+
+    hit_count = Column(Integer, nullable=False, server_default="0")
+
+    created_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
+    last_hit_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now(), index=True)
+    expires_at = Column(DateTime(timezone=True), nullable=False, index=True)
@@ -0,0 +1,30 @@
+from sqlalchemy import Column, DateTime, Float, Integer, String, func
+
+from database import Base
+
+
+class RateLimitBucket(Base):
+    """Token bucket shared by all workers (RATE_LIMIT_BACKEND=postgres)."""
+
+    __tablename__ = "rate_limit_buckets"
+
+    # e.g. "user:42:reply" or "global"
+    key = Column(String(100), primary_key=True)
+
+    tokens = Column(Float, nullable=False)
+    updated_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
+
+
+class RateLimitLease(Base):
+    """One in-flight LLM-backed request of a user (RATE_LIMIT_BACKEND=postgres).
+
+    Released when the request ends; expires_at frees the slot if the worker died.
+    """
+
+    __tablename__ = "rate_limit_leases"
+
+    key = Column(String(100), primary_key=True)
+    slot = Column(Integer, primary_key=True)
+
+    holder = Column(String(32), nullable=False)
+    expires_at = Column(DateTime(timezone=True), nullable=False)
@@ -1,13 +1,49 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
+from sqlalchemy import tuple_
 from sqlalchemy.orm import Session
 from datetime import datetime, timezone, timedelta
+import asyncio
+import base64
+import json
+import tempfile
+from typing import Literal
 
 from database import get_db
 from core.auth import get_current_user
+from core.rate_limit import llm_rate_limit
 
 from models import JournalEntry, User
-from schemas import EntryCreate, EntryOut, EntrySummary, AIReplyOut
-from services.ai_reply_service import generate_ai_reply_for_entry, analyze_entry_for_entry
+from models.entry import generate_summary
+from schemas import (
+    EntryCreate,
+    EntryOut,
+    EntryPage,
+    EntrySearchHit,
+    EntrySearchPage,
+    EntrySummary,
+    EntryTheme,
+    AIReplyOut,
+    AnalysisStatusOut,
+    ImportJobOut,
+    SimilarEntryOut,
+)
+from services.ai_reply_service import (
+    generate_ai_reply_for_entry,
+    get_owned_entry,
+    stream_ai_reply_for_entry,
+)
+from services.analysis_queue import (
+    enqueue_entry_analysis,
+    get_latest_job,
+    is_local_mode,
+    process_job_by_id,
+)
+from services.embedding_service import similar_entries
+from services.export_service import EXPORT_FORMATS, iter_export
+from services.import_service import IMPORT_MAX_BYTES, get_import_job, import_progress, run_import
+from services.rollup_service import rollup_months
+from services.search_service import search_entries
 
 
 router = APIRouter(
@@ -16,13 +52,6 @@ router = APIRouter(
 )
 
 
-# ------------------------------------------------
-# Helper: generate summary (first 200 chars)
-# ------------------------------------------------
-def generate_summary(content: str) -> str:
-    return content[:200].strip()
-
-
 def _parse_date_ymd_to_utc_start(date_str: str) -> datetime:
     """Parse YYYY-MM-DD and return UTC start of that day (00:00:00Z)."""
     try:
@@ -52,16 +81,60 @@ def _parse_month_ym_to_utc_range(month_str: str) -> tuple[datetime, datetime]:
     return start, end
 
 
+def _created_at_filters(date: str | None, from_date: str | None, to_date: str | None) -> list:
+    """created_at conditions for the list/search date query parameters."""
+    filters = []
+
+    # ----------------------------
+    # Filter by year/month or date
+    # ----------------------------
+    if date:
+        if len(date) == 7:  # YYYY-MM
+            start, end = _parse_month_ym_to_utc_range(date)
+        else:  # YYYY-MM-DD
+            start = _parse_date_ymd_to_utc_start(date)
+            end = start + timedelta(days=1)
+
+        filters += [
+            JournalEntry.created_at >= start,
+            JournalEntry.created_at < end,
+        ]
+
+    # ----------------------------
+    # Time range filter (UTC-aware, half-open interval)
+    # Conventions:
+    # - from_date: YYYY-MM-DD (inclusive)
+    # - to_date:   YYYY-MM-DD (inclusive)
+    # Filter [from_date 00:00Z, to_date+1day 00:00Z)
+    # ----------------------------
+    if from_date or to_date:
+        start = _parse_date_ymd_to_utc_start(from_date) if from_date else None
+        end = (_parse_date_ymd_to_utc_start(to_date) + timedelta(days=1)) if to_date else None
+
+        if start and end and start >= end:
+            raise HTTPException(status_code=400, detail="Invalid date range")
+
+        if start is not None:
+            filters.append(JournalEntry.created_at >= start)
+        if end is not None:
+            filters.append(JournalEntry.created_at < end)
+
+    return filters
+
+
 # ------------------------------------------------
 # POST /entries - create journal entry
 # Rules:
-# - Always generate analysis fields (emotion/theme saved to DB) regardless of need_ai_reply
+# - Entry is committed immediately with analysis_status="pending"
+# - Analysis (emotion/theme) is always queued regardless of need_ai_reply
 # - Only create AIReply when need_ai_reply=True
+# - Poll GET /entries/{id}/analysis for progress
 # - created_at is set by DB server_default (UTC + tz-aware)
 # ------------------------------------------------
 @router.post("/", response_model=EntryOut)
 def create_entry(
     entry: EntryCreate,
+    background_tasks: BackgroundTasks,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
@@ -80,88 +153,226 @@ def create_entry(
     )
 
     db.add(new_entry)
-    db.flush()  # Get new_entry.id first (same Session for later service queries)
-
-    try:
-        # Do analysis even without AI reply; if selected, generate reply + analysis
-        if entry.need_ai_reply:
-            generate_ai_reply_for_entry(
-                db=db,
-                entry_id=new_entry.id,
-                current_user=current_user,
-                force_regenerate=False,
-            )
-        else:
-            analyze_entry_for_entry(
-                db=db,
-                entry_id=new_entry.id,
-                current_user=current_user,
-                force_regenerate=False,
-            )
+    db.flush()  # Get new_entry.id for the job row (same transaction)
 
-        # Commit here regardless of service commit; safe to commit again
-        db.commit()
+    job_id = enqueue_entry_analysis(db, new_entry, need_ai_reply=entry.need_ai_reply).id
+    db.commit()
 
-    except Exception:
-        db.rollback()
-        raise
+    if is_local_mode():
+        background_tasks.add_task(process_job_by_id, job_id)
 
     db.refresh(new_entry)
     return EntryOut.model_validate(new_entry, from_attributes=True)
 
 
 # ------------------------------------------------
-# GET /entries - list journal entries (summary)
+# GET /entries - list journal entries (summary), newest first
+# Keyset pagination on (created_at, id):
+# - limit: page size
+# - cursor: next_cursor from the previous page (opaque)
+# Only the summary columns are loaded (served from the covering index)
 # ------------------------------------------------
-@router.get("/", response_model=list[EntrySummary])
+def _pack_cursor(values: list) -> str:
+    raw = json.dumps(values).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def _unpack_cursor(cursor: str) -> list:
+    raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+    values = json.loads(raw)
+    if not isinstance(values, list):
+        raise ValueError
+    return values
+
+
+def _encode_cursor(created_at: datetime, entry_id: int) -> str:
+    return _pack_cursor([created_at.isoformat(), entry_id])
+
+
+def _decode_cursor(cursor: str) -> tuple[datetime, int]:
+    try:
+        created_at_str, entry_id = _unpack_cursor(cursor)
+        created_at = datetime.fromisoformat(created_at_str)
+        if created_at.tzinfo is None or not isinstance(entry_id, int):
+            raise ValueError
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return created_at, entry_id
+
+
+@router.get("/", response_model=EntryPage)
 def get_entries(
     date: str | None = Query(None),
     from_date: str | None = Query(None),
     to_date: str | None = Query(None),
+    limit: int = Query(50, ge=1, le=200),
+    cursor: str | None = Query(None),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
-    query = db.query(JournalEntry).filter(
+    query = db.query(
+        JournalEntry.id,
+        JournalEntry.summary,
+        JournalEntry.created_at,
+        JournalEntry.emotion,
+        JournalEntry.primary_theme,
+    ).filter(
         JournalEntry.user_id == current_user.id,
         JournalEntry.deleted == False,
     )
 
+    query = query.filter(*_created_at_filters(date, from_date, to_date))
+
     # ----------------------------
-    # Filter by year/month or date
+    # Keyset: strictly after the last row of the previous page
     # ----------------------------
-    if date:
-        if len(date) == 7:  # YYYY-MM
-            start, end = _parse_month_ym_to_utc_range(date)
-        else:  # YYYY-MM-DD
-            start = _parse_date_ymd_to_utc_start(date)
-            end = start + timedelta(days=1)
-
+    if cursor:
         query = query.filter(
-            JournalEntry.created_at >= start,
-            JournalEntry.created_at < end,
+            tuple_(JournalEntry.created_at, JournalEntry.id) < tuple_(*_decode_cursor(cursor))
         )
 
-    # ----------------------------
-    # Time range filter (UTC-aware, half-open interval)
-    # Conventions:
-    # - from_date: YYYY-MM-DD (inclusive)
-    # - to_date:   YYYY-MM-DD (inclusive)
-    # Filter [from_date 00:00Z, to_date+1day 00:00Z)
-    # ----------------------------
-    if from_date or to_date:
-        start = _parse_date_ymd_to_utc_start(from_date) if from_date else None
-        end = (_parse_date_ymd_to_utc_start(to_date) + timedelta(days=1)) if to_date else None
+    rows = (
+        query.order_by(JournalEntry.created_at.desc(), JournalEntry.id.desc())
+        .limit(limit + 1)
+        .all()
+    )
 
-        if start and end and start >= end:
-            raise HTTPException(status_code=400, detail="Invalid date range")
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = _encode_cursor(rows[-1].created_at, rows[-1].id)
 
-        if start is not None:
-            query = query.filter(JournalEntry.created_at >= start)
-        if end is not None:
-            query = query.filter(JournalEntry.created_at < end)
+    return EntryPage(
+        items=[EntrySummary.model_validate(r, from_attributes=True) for r in rows],
+        next_cursor=next_cursor,
+    )
 
-    entries = query.order_by(JournalEntry.created_at.desc()).all()
-    return [EntrySummary.model_validate(e, from_attributes=True) for e in entries]
+
+# ------------------------------------------------
+# GET /entries/search?q= - full-text search, best match first
+# - q: words, "quoted phrases", -excluded, OR (web search syntax)
+# - Combines with emotion / theme / date filters (same date params as the list)
+# - snippet: matching passages with hits wrapped in <mark></mark>
+# - Keyset pagination on (rank, id) via next_cursor
+# ------------------------------------------------
+@router.get("/search", response_model=EntrySearchPage)
+def search_journal_entries(
+    q: str = Query(..., min_length=1, max_length=200),
+    emotion: str | None = Query(None),
+    theme: EntryTheme | None = Query(None),
+    date: str | None = Query(None),
+    from_date: str | None = Query(None),
+    to_date: str | None = Query(None),
+    limit: int = Query(20, ge=1, le=100),
+    cursor: str | None = Query(None),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    after = None
+    if cursor:
+        try:
+            rank, entry_id = _unpack_cursor(cursor)
+            if not isinstance(rank, (int, float)) or not isinstance(entry_id, int):
+                raise ValueError
+        except Exception:
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+        after = (float(rank), entry_id)
+
+    rows = search_entries(
+        db,
+        current_user.id,
+        q,
+        limit=limit + 1,
+        after=after,
+        emotion=emotion,
+        theme=theme,
+        filters=_created_at_filters(date, from_date, to_date),
+    )
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = _pack_cursor([rows[-1].rank, rows[-1].id])
+
+    return EntrySearchPage(
+        items=[EntrySearchHit.model_validate(r, from_attributes=True) for r in rows],
+        next_cursor=next_cursor,
+    )
+
+
+# ------------------------------------------------
+# GET /entries/months - months ("YYYY-MM", UTC) that have entries, newest first
+# ------------------------------------------------
+@router.get("/months", response_model=list[str])
+def get_entry_months(
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    return rollup_months(db, current_user.id)
+
+
+# ------------------------------------------------
+# GET /entries/export - full history as NDJSON or CSV (streamed)
+# - Oldest id first; resume an interrupted export with after_id=<last id received>
+# - Includes the AI reply and self-notes of each entry
+# ------------------------------------------------
+@router.get("/export")
+def export_entries(
+    format: Literal["ndjson", "csv"] = Query("ndjson"),
+    after_id: int | None = Query(None, ge=0),
+    current_user: User = Depends(get_current_user),
+):
+    filename = f"journal-export.{format}"
+    return StreamingResponse(
+        iter_export(current_user.id, format, after_id),
+        media_type=EXPORT_FORMATS[format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
+
+# ------------------------------------------------
+# POST /entries/import - bulk import of historical entries
+# - Body: raw JSONL (one {"content", "created_at"} object per line) or CSV
+#   with content,created_at columns; GET /entries/export output works as-is
+# - created_at: ISO 8601, UTC when no offset is given
+# - Analysis is queued for the worker at a throttled rate
+# - Poll GET /entries/import/{id} for progress
+# ------------------------------------------------
+@router.post("/import", response_model=ImportJobOut)
+async def import_entries(
+    request: Request,
+    format: Literal["jsonl", "csv"] = Query("jsonl"),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    # Spool the upload (memory first, then disk) and parse it row by row
+    with tempfile.SpooledTemporaryFile(max_size=1024 * 1024) as upload:
+        received = 0
+        async for chunk in request.stream():
+            received += len(chunk)
+            if received > IMPORT_MAX_BYTES:
+                raise HTTPException(status_code=413, detail="Import file too large")
+            upload.write(chunk)
+        upload.seek(0)
+
+        job = await asyncio.to_thread(run_import, db, current_user.id, format, upload)
+
+    return await asyncio.to_thread(import_progress, db, job)
+
+
+# ------------------------------------------------
+# GET /entries/import/{id} - bulk import progress
+# ------------------------------------------------
+@router.get("/import/{import_id}", response_model=ImportJobOut)
+def get_import_status(
+    import_id: int,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    job = get_import_job(db, current_user.id, import_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Import not found")
+    return import_progress(db, job)
 
 
 # ------------------------------------------------
@@ -189,17 +400,85 @@ def get_entry(
     return EntryOut.model_validate(entry, from_attributes=True)
 
 
+# ------------------------------------------------
+# GET /entries/{id}/similar - most similar other entries (offline embeddings)
+# ------------------------------------------------
+@router.get("/{entry_id}/similar", response_model=list[SimilarEntryOut])
+def get_similar_entries(
+    entry_id: int,
+    limit: int = Query(5, ge=1, le=50),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    get_owned_entry(db, entry_id, current_user)
+
+    matches = similar_entries(db, current_user.id, entry_id, limit=limit)
+    if not matches:
+        return []
+
+    rows = {
+        r.id: r
+        for r in db.query(
+            JournalEntry.id,
+            JournalEntry.summary,
+            JournalEntry.created_at,
+            JournalEntry.emotion,
+            JournalEntry.primary_theme,
+        ).filter(JournalEntry.id.in_([m[0] for m in matches]), JournalEntry.deleted == False)
+    }
+    return [
+        SimilarEntryOut(**EntrySummary.model_validate(rows[i], from_attributes=True).model_dump(), score=round(score, 4))
+        for i, score in matches
+        if i in rows
+    ]
+
+
+# ------------------------------------------------
+# GET /entries/{id}/analysis - analysis pipeline status (polling)
+# ------------------------------------------------
+@router.get("/{entry_id}/analysis", response_model=AnalysisStatusOut)
+def get_entry_analysis_status(
+    entry_id: int,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    entry = (
+        db.query(JournalEntry)
+        .filter(
+            JournalEntry.id == entry_id,
+            JournalEntry.user_id == current_user.id,
+            JournalEntry.deleted == False,
+        )
+        .first()
+    )
+
+    if not entry:
+        raise HTTPException(status_code=404, detail="Entry not found")
+
+    job = get_latest_job(db, entry.id)
+
+    return AnalysisStatusOut(
+        entry_id=entry.id,
+        analysis_status=entry.analysis_status,
+        job_type=job.job_type if job else None,
+        job_status=job.status if job else None,
+        attempts=job.attempts if job else 0,
+        last_error=job.last_error if job else None,
+        ai_reply_ready=entry.ai_reply is not None,
+    )
+
+
 # ------------------------------------------------
 # POST /entries/{id}/ai_reply - generate/regenerate AI reply
 # ------------------------------------------------
-@router.post("/{entry_id}/ai_reply", response_model=AIReplyOut)
-def create_ai_reply_for_entry_endpoint(
+@router.post("/{entry_id}/ai_reply", response_model=AIReplyOut, dependencies=[Depends(llm_rate_limit("reply"))])
+async def create_ai_reply_for_entry_endpoint(
     entry_id: int,
     force_regenerate: bool = False,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
-    ai_reply = generate_ai_reply_for_entry(
+    ai_reply = await generate_ai_reply_for_entry(
         db=db,
         entry_id=entry_id,
         current_user=current_user,
@@ -207,12 +486,68 @@ def create_ai_reply_for_entry_endpoint(
     )
 
     # Commit here to avoid uncertainty about service commit
-    db.commit()
-    db.refresh(ai_reply)
+    def _finalize():
+        db.commit()
+        db.refresh(ai_reply)
+
+    await asyncio.to_thread(_finalize)
 
     return AIReplyOut.model_validate(ai_reply, from_attributes=True)
 
 
+# ------------------------------------------------
+# POST /entries/{id}/ai_reply/stream - AI reply over Server-Sent Events
+# Events:
+# - delta: {"text": "..."}                       reply text as it is generated
+# - done:  {"ai_reply": AIReplyOut, "emotion": ...} after analysis is saved
+# - error: {"detail": "..."}
+# ------------------------------------------------
+def _sse(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+@router.post("/{entry_id}/ai_reply/stream", dependencies=[Depends(llm_rate_limit("reply"))])
+async def stream_ai_reply_for_entry_endpoint(
+    entry_id: int,
+    force_regenerate: bool = False,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    # Resolve 404 before the stream starts
+    entry = await asyncio.to_thread(get_owned_entry, db, entry_id, current_user)
+
+    async def event_stream():
+        try:
+            async for event, payload in stream_ai_reply_for_entry(
+                db=db,
+                entry=entry,
+                current_user=current_user,
+                force_regenerate=force_regenerate,
+            ):
+                if event == "delta":
+                    yield _sse("delta", {"text": payload})
+                else:
+                    yield _sse("done", {
+                        "ai_reply": AIReplyOut.model_validate(payload, from_attributes=True).model_dump(mode="json"),
+                        "emotion": entry.emotion,
+                        "emotion_intensity": entry.emotion_intensity,
+                        "primary_theme": entry.primary_theme,
+                        "theme_scores": entry.theme_scores,
+                    })
+        except HTTPException as e:
+            await asyncio.to_thread(db.rollback)
+            yield _sse("error", {"detail": e.detail})
+        except Exception:
+            await asyncio.to_thread(db.rollback)
+            yield _sse("error", {"detail": "AI service unavailable."})
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
 # ------------------------------------------------
 # DELETE /entries/{id} - soft delete
 # ------------------------------------------------
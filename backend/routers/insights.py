@@ -1,23 +1,38 @@
 # backend/routers/insights.py
 
-from fastapi import APIRouter, Depends, HTTPException
+from datetime import date
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
 from database import get_db
 from core.auth import get_current_user
+from core.rate_limit import llm_rate_limit
 
-from services.insights_service import aggregate_insights
+from services.insights_service import RANGE_TYPES, aggregate_insights
 
 router = APIRouter(prefix="/insights", tags=["Insights"])
 
 
-@router.get("/")
-def get_insights(
+@router.get("/", dependencies=[Depends(llm_rate_limit("insights"))])
+async def get_insights(
     range: str = "week",
+    anchor: Optional[date] = Query(None, alias="date", description="Any day of the week/month/quarter/year to show (default: today)"),
+    start: Optional[date] = Query(None, description="range=custom: first day (inclusive)"),
+    end: Optional[date] = Query(None, description="range=custom: last day (inclusive)"),
     db: Session = Depends(get_db),
     current_user=Depends(get_current_user),
 ):
-    if range not in ("week", "month"):
+    if range not in RANGE_TYPES:
         raise HTTPException(status_code=400, detail="Invalid range")
 
-    result = aggregate_insights(db, current_user, range)
+    custom = None
+    if range == "custom":
+        if start is None or end is None:
+            raise HTTPException(status_code=400, detail="start and end are required for range=custom")
+        if start > end:
+            raise HTTPException(status_code=400, detail="start must be on or before end")
+        custom = (start, end)
+
+    result = await aggregate_insights(db, current_user, range, anchor=anchor, custom=custom)
     return result
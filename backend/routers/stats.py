@@ -2,11 +2,11 @@ from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
 from datetime import datetime, timedelta
 from calendar import monthrange
-from statistics import mean
 
 from database import get_db
 from core.auth import get_current_user
-from models import JournalEntry, User
+from models import User
+from services.rollup_service import EMOTION_COLUMNS, daily_rollups
 
 
 router = APIRouter(
@@ -49,21 +49,18 @@ def get_stats(
         time_units = ["Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun"]
 
 
-    # ============ 2. Query entries ============
+    # ============ 2. Daily rollups (one row per active day) ============
 
-    entries = db.query(JournalEntry).filter(
-        JournalEntry.user_id == current_user.id,
-        JournalEntry.deleted == False,
-        JournalEntry.created_at >= start,
-        JournalEntry.created_at <= end
-    ).all()
+    start_day = start.date()
+    rows = daily_rollups(db, current_user.id, start_day, end.date() + timedelta(days=1))
+    by_day = {r.day: r for r in rows}
 
 
     # ============ 3. Basic stats ============
 
-    total_entries = len(entries)
-    total_words = sum(len(e.content) for e in entries)
-    active_days = len(set(e.created_at.date() for e in entries))
+    total_entries = sum(r.entry_count for r in rows)
+    total_words = sum(r.char_count for r in rows)  # characters, as before
+    active_days = len(rows)
 
     basic_stats = {
         "total_entries": total_entries,
@@ -76,64 +73,51 @@ def get_stats(
 
     # ============ 4. Emotion pie chart ============
 
-    emotions = ["joy", "calm", "tired", "anxiety", "sadness", "anger"]
-    emotion_counts = {emotion: 0 for emotion in emotions}
-
-    for e in entries:
-        if e.emotion in emotion_counts:
-            emotion_counts[e.emotion] += 1
+    emotion_counts = {
+        emotion: sum(getattr(r, column) for r in rows)
+        for emotion, column in EMOTION_COLUMNS.items()
+    }
 
 
     # ============ 5. Pleasure line chart + check-ins ============
 
-    if stats_range == "month":
-
-        # Initialize day map: 1..days_in_month
-        day_map = {day: [] for day in time_units}
+    def day_pleasure(d):
+        r = by_day.get(d)
+        # Mean pleasure of the day's entries
+        return float(r.pleasure_sum) / r.entry_count if r else None
 
-        for e in entries:
-            day = e.created_at.day
-            if day in day_map:
-                day_map[day].append(e.pleasure)
+    if stats_range == "month":
 
         # Build month curve
         pleasure_curve = [
             {
                 "day": day,
-                "pleasure": mean(scores) if scores else None
+                "pleasure": day_pleasure(start_day.replace(day=day))
             }
-            for day, scores in day_map.items()
+            for day in time_units
         ]
 
         # Build calendar
         activity_calendar = {
-            f"{year}-{month_num:02d}-{day:02d}": (len(day_map[day]) > 0)
+            f"{year}-{month_num:02d}-{day:02d}": start_day.replace(day=day) in by_day
             for day in time_units
         }
 
     else:  # week
 
-        # Correct: range(7), not stats_range(7)
-        week_map = {i: [] for i in range(7)}
-
-        for e in entries:
-            wd = e.created_at.weekday()
-            week_map[wd].append(e.pleasure)
-
         # Weekly curve
         pleasure_curve = []
         for i, label in enumerate(time_units):
-            scores = week_map[i]
             pleasure_curve.append({
                 "day": label,
-                "pleasure": mean(scores) if scores else None
+                "pleasure": day_pleasure(start_day + timedelta(days=i))
             })
 
         # Weekly check-ins
         activity_calendar = {}
         for i, label in enumerate(time_units):
-            day_date = (start + timedelta(days=i)).date()
-            activity_calendar[str(day_date)] = (len(week_map[i]) > 0)
+            day_date = start_day + timedelta(days=i)
+            activity_calendar[str(day_date)] = day_date in by_day
 
 
     # ============ 6. Theme chart (not yet) ============
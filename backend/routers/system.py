@@ -4,6 +4,12 @@ from fastapi import APIRouter
 from datetime import datetime
 from sqlalchemy import text
 from database import engine
+from core.llm_cache import llm_cache
+from core.llm_dispatch import llm_dispatch_snapshot
+from core.resilience import resilience_snapshot
+from core.local_classifier import local_classifier_snapshot
+from core.rate_limit import rate_limit_snapshot
+from core.scheduler import scheduler_snapshot
 from dotenv import load_dotenv
 import os
 import requests
@@ -56,4 +62,10 @@ def health_check():
         "server_time": datetime.utcnow().isoformat(),
         "database": db_status,
         "ai_service": ai_status,
+        "llm_cache": llm_cache.stats(),
+        "llm_resilience": resilience_snapshot(),
+        "llm_dispatch": llm_dispatch_snapshot(),
+        "local_classifier": local_classifier_snapshot(),
+        "scheduler": scheduler_snapshot(),
+        "rate_limit": rate_limit_snapshot(),
     }
@@ -3,6 +3,7 @@ from sqlalchemy.orm import Session
 
 from database import get_db
 from core.auth import get_current_user
+from core.rate_limit import llm_rate_limit
 from schemas import TimeCapsuleOut
 from services.time_capsule_service import get_time_capsule
 
@@ -10,9 +11,9 @@ from services.time_capsule_service import get_time_capsule
 router = APIRouter(prefix="/time-capsule", tags=["Time Capsule"])
 
 
-@router.get("/", response_model=TimeCapsuleOut)
-def get_time_capsule_endpoint(
+@router.get("/", response_model=TimeCapsuleOut, dependencies=[Depends(llm_rate_limit("time_capsule"))])
+async def get_time_capsule_endpoint(
     db: Session = Depends(get_db),
     current_user=Depends(get_current_user),
 ):
-    return get_time_capsule(db, current_user)
+    return await get_time_capsule(db, current_user)
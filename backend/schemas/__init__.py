@@ -18,7 +18,14 @@ from .entry import (
     EntryCreate,
     EntryOut,
     EntrySummary,
+    EntryPage,
+    EntrySearchHit,
+    EntrySearchPage,
+    EntryTheme,
     AIReplyOut,      # New: AI reply output
+    AnalysisStatusOut,
+    ImportJobOut,
+    SimilarEntryOut,
 )
 
 # -------------------------------
@@ -1,6 +1,6 @@
 from pydantic import BaseModel
 from datetime import datetime
-from typing import Optional, Literal, Dict
+from typing import Optional, Literal, Dict, List
 
 
 # -------------------------------
@@ -51,6 +51,37 @@ class EntrySummary(BaseModel):
         from_attributes = True
 
 
+# -------------------------------
+# One page of the list (keyset pagination)
+# next_cursor: pass back as ?cursor= for the next page; None on the last page
+# -------------------------------
+class EntryPage(BaseModel):
+    items: List[EntrySummary]
+    next_cursor: Optional[str] = None
+
+
+# -------------------------------
+# Search results (GET /entries/search)
+# snippet: matching passages, hits wrapped in <mark></mark>
+# -------------------------------
+class EntrySearchHit(EntrySummary):
+    rank: float
+    snippet: str
+
+
+class EntrySearchPage(BaseModel):
+    items: List[EntrySearchHit]
+    next_cursor: Optional[str] = None
+
+
+# -------------------------------
+# Similar entries (GET /entries/{id}/similar)
+# score: cosine similarity of the content embeddings (higher is closer)
+# -------------------------------
+class SimilarEntryOut(EntrySummary):
+    score: float
+
+
 # -------------------------------
 # Detail page (full output)
 # -------------------------------
@@ -74,8 +105,47 @@ class EntryOut(BaseModel):
     # Now an object, not a string
     ai_reply: Optional[AIReplyOut] = None
 
+    # Analysis pipeline state: pending | done | failed
+    analysis_status: Optional[str] = None
+
     # Pleasure score (computed dynamically)
     pleasure: float
 
     class Config:
         from_attributes = True
+
+
+# -------------------------------
+# Analysis pipeline status (polling)
+# -------------------------------
+class AnalysisStatusOut(BaseModel):
+    entry_id: int
+    analysis_status: str            # pending | done | failed
+    job_type: Optional[str] = None  # reply | analysis
+    job_status: Optional[str] = None
+    attempts: int = 0
+    last_error: Optional[str] = None
+    ai_reply_ready: bool = False
+
+
+# -------------------------------
+# Bulk import progress
+# status: ingesting | analyzing | done | failed
+# -------------------------------
+class ImportRowError(BaseModel):
+    row: Optional[int] = None
+    error: str
+
+
+class ImportJobOut(BaseModel):
+    id: int
+    format: str
+    status: str
+    rows_ingested: int = 0
+    rows_failed: int = 0
+    rows_analyzed: int = 0
+    analysis_failed: int = 0
+    analysis_pending: int = 0
+    errors: List[ImportRowError] = []
+    created_at: datetime
+    updated_at: datetime
@@ -7,7 +7,8 @@ from pydantic import BaseModel
 class TimeCapsuleOut(BaseModel):
     found: bool
     source_date: Optional[date] = None
-    source_level: Optional[Literal["year", "month", "week"]] = None
+    # similar: no entry on those days; the most similar older entry instead
+    source_level: Optional[Literal["year", "month", "week", "similar"]] = None
     quote: Optional[str] = None
     entry_id: Optional[int] = None
 
@@ -0,0 +1,33 @@
+# backend/scripts/analysis_worker.py
+
+import os
+import sys
+
+# Let Python know backend root path
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+
+import asyncio
+
+from database import Base, engine
+import models  # noqa: F401  (register tables)
+from startup.schema_upgrades import apply_schema_upgrades
+from services.analysis_queue import run_worker
+from core.ai_client import close_client
+
+BATCH_SIZE = int(os.getenv("ANALYSIS_WORKER_BATCH_SIZE", "20"))
+CONCURRENCY = int(os.getenv("ANALYSIS_WORKER_CONCURRENCY", "20"))
+POLL_INTERVAL = float(os.getenv("ANALYSIS_WORKER_POLL_INTERVAL", "1.0"))
+
+
+async def main() -> None:
+    try:
+        await run_worker(batch_size=BATCH_SIZE, poll_interval=POLL_INTERVAL, concurrency=CONCURRENCY)
+    finally:
+        await close_client()
+
+
+if __name__ == "__main__":
+    Base.metadata.create_all(bind=engine)
+    apply_schema_upgrades()
+    print(f"Analysis worker started (batch={BATCH_SIZE}, concurrency={CONCURRENCY})")
+    asyncio.run(main())
@@ -0,0 +1,109 @@
+# backend/scripts/bench_aggregates.py
+#
+# Benchmark of rollup aggregation over many entries: the per-entry loop
+# (entry_contribution() + dict accumulation, then the rollup reads) against
+# the NumPy path in services/entry_aggregates.py. Synthetic entries, no
+# database; results are checked to be identical.
+#
+#   python scripts/bench_aggregates.py                 # 10k and 1M entries
+#   python scripts/bench_aggregates.py --sizes 100000
+
+import os
+import sys
+
+# Let Python know backend root path
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+
+import argparse
+import random
+import time
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+
+from services.entry_aggregates import daily_sums, emotion_counts, entry_arrays, theme_distribution, valence_means
+from services.entry_metrics import EMOTIONS, THEME_KEYS
+from services.rollup_service import (
+    SUM_COLUMNS,
+    _add,
+    entry_contribution,
+    rollup_emotion_counts,
+    rollup_theme_distribution,
+)
+
+# Shared content strings keep 1M entries within memory
+CONTENTS = [" ".join(["word"] * n) for n in range(0, 60, 3)]
+
+
+def make_entries(n: int, seed: int = 1):
+    rng = random.Random(seed)
+    start = datetime(2020, 1, 1, tzinfo=timezone.utc)
+    span_minutes = 60 * 24 * 365 * 3
+    entries = []
+    for _ in range(n):
+        entries.append({
+            "user_id": 1,
+            "created_at": start + timedelta(minutes=rng.randrange(span_minutes)),
+            "content": rng.choice(CONTENTS),
+            "emotion": rng.choice([*EMOTIONS, None]),
+            "emotion_intensity": rng.choice([1, 2, 3, None]),
+            "theme_scores": None if rng.random() < 0.1 else {k: rng.random() for k in THEME_KEYS},
+            "deleted": False,
+        })
+    return entries
+
+
+def loop_aggregate(entries):
+    changes = {}
+    for entry in entries:
+        _add(changes, entry_contribution(entry), +1)
+    rows = [
+        SimpleNamespace(day=day, **{col: deltas.get(col, 0) for col in SUM_COLUMNS})
+        for (_, day), deltas in sorted(changes.items())
+    ]
+    return rows, rollup_theme_distribution(rows), rollup_emotion_counts(rows), [r.valence_sum / r.entry_count for r in rows]
+
+
+def vector_aggregate(arrays):
+    sums = daily_sums(arrays)
+    return sums, theme_distribution(sums), emotion_counts(sums), valence_means(sums).tolist()
+
+
+def run(n: int) -> None:
+    entries = make_entries(n)
+
+    started = time.perf_counter()
+    rows, themes, emotions, valence = loop_aggregate(entries)
+    loop_s = time.perf_counter() - started
+
+    started = time.perf_counter()
+    arrays = entry_arrays(entries)
+    arrays_s = time.perf_counter() - started
+
+    started = time.perf_counter()
+    sums, v_themes, v_emotions, v_valence = vector_aggregate(arrays)
+    vector_s = time.perf_counter() - started
+
+    identical = (
+        themes == v_themes
+        and emotions == v_emotions
+        and valence == v_valence
+        and all(
+            getattr(row, col) == sums.columns[col][i]
+            for i, row in enumerate(rows)
+            for col in SUM_COLUMNS
+        )
+    )
+    print(
+        f"{n:>9} entries  {len(rows):>5} days  loop {loop_s:8.3f}s  "
+        f"arrays from dicts {arrays_s:7.3f}s  numpy {vector_s:7.4f}s  "
+        f"speedup {loop_s / vector_s:7.0f}x  identical={identical}"
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark per-entry vs vectorized rollup aggregation")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 1_000_000])
+    args = parser.parse_args()
+
+    for size in args.sizes:
+        run(size)
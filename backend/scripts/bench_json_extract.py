@@ -0,0 +1,138 @@
+# backend/scripts/bench_json_extract.py
+#
+# Micro-benchmark of JSON extraction from LLM completions: the single-pass
+# scanner (core/json_extract.py) against the previous regex chain
+# (direct parse -> fenced block -> greedy {...} / [...] match), over
+# realistic completions and adversarial ones.
+#
+#   python scripts/bench_json_extract.py
+#   python scripts/bench_json_extract.py --repeat 2000
+
+import os
+import sys
+
+# Let Python know backend root path
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+
+import argparse
+import json
+import re
+import time
+
+from core.json_extract import extract_json_array, extract_json_object
+
+
+# -----------------------------
+# Previous implementation (baseline)
+# -----------------------------
+def legacy_extract_json(text):
+    text = text.strip()
+    try:
+        return json.loads(text)
+    except Exception:
+        pass
+    m = re.search(r"```json(.*?)```", text, re.DOTALL | re.IGNORECASE)
+    if m:
+        try:
+            return json.loads(m.group(1).strip())
+        except Exception:
+            pass
+    m2 = re.search(r"\{.*\}", text, re.DOTALL)
+    if m2:
+        try:
+            return json.loads(m2.group(0))
+        except Exception:
+            pass
+    return None
+
+
+def legacy_extract_json_array(text):
+    text = text.strip()
+    candidates = [text]
+    m = re.search(r"```(?:json)?(.*?)```", text, re.DOTALL | re.IGNORECASE)
+    if m:
+        candidates.append(m.group(1).strip())
+    m2 = re.search(r"\[.*\]", text, re.DOTALL)
+    if m2:
+        candidates.append(m2.group(0))
+    for candidate in candidates:
+        try:
+            data = json.loads(candidate)
+        except Exception:
+            continue
+        if isinstance(data, dict):
+            data = data.get("results") or data.get("entries")
+        if isinstance(data, list):
+            return data
+    return None
+
+
+# -----------------------------
+# Corpus
+# -----------------------------
+REPLY = json.dumps({
+    "reply": "It sounds like today asked a lot of you. The meeting ran long, and you still "
+             "made time for a walk — that matters. What would make tomorrow morning a little lighter?",
+    "emotion": "tired",
+    "intensity": 3,
+    "theme_scores": {"work": 0.6, "hobbies": 0.1, "social": 0.2, "other": 0.1},
+    "primary_theme": "work",
+}, ensure_ascii=False)
+
+BATCH = json.dumps([
+    {"index": i, "emotion": "calm", "intensity": 2,
+     "theme_scores": {"work": 0.25, "hobbies": 0.25, "social": 0.25, "other": 0.25}, "primary_theme": "other"}
+    for i in range(20)
+])
+
+OBJECT_CASES = {
+    "plain": REPLY,
+    "fenced": f"```json\n{REPLY}\n```",
+    "prose + fence + trailer": f"Sure! Here is my answer:\n```json\n{REPLY}\n```\nHope this helps {{user}}.",
+    "truncated": REPLY[: len(REPLY) * 2 // 3],
+    "no json": "I'm here with you. " * 40,
+    "adv: unclosed braces": "{" * 20_000,
+    "adv: many brace pairs": "{a} " * 5_000,
+    "adv: prose, no closer": "{ " + "word " * 20_000,
+}
+
+ARRAY_CASES = {
+    "plain": BATCH,
+    "wrapped": json.dumps({"results": json.loads(BATCH)}),
+    "prose + fence": f"Results for [20] entries:\n```\n{BATCH}\n```",
+    "truncated": BATCH[: len(BATCH) * 2 // 3],
+    "adv: unclosed brackets": "[" * 20_000,
+    "adv: many bracket pairs": "[a] " * 5_000,
+}
+
+
+def _time(fn, text: str, repeat: int) -> float:
+    started = time.perf_counter()
+    for _ in range(repeat):
+        fn(text)
+    return (time.perf_counter() - started) / repeat * 1e6
+
+
+def _run(title: str, cases: dict, new_fn, old_fn, repeat: int) -> None:
+    print(f"\n{title}")
+    print(f"{'case':<26}{'chars':>8}{'legacy us':>12}{'new us':>10}  legacy/new result")
+    for name, text in cases.items():
+        n = max(1, repeat // 50) if name.startswith("adv") else repeat
+        old_us = _time(old_fn, text, n)
+        new_us = _time(new_fn, text, n)
+        old_ok = "ok" if old_fn(text) is not None else "-"
+        new_ok = "ok" if new_fn(text) is not None else "-"
+        print(f"{name:<26}{len(text):>8}{old_us:>12.1f}{new_us:>10.1f}  {old_ok}/{new_ok}")
+
+
+def main(repeat: int) -> None:
+    _run("Object (reply/analysis completions)", OBJECT_CASES, extract_json_object, legacy_extract_json, repeat)
+    _run("Array (batch analysis completions)", ARRAY_CASES, extract_json_array, legacy_extract_json_array, repeat)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark JSON extraction from LLM completions")
+    parser.add_argument("--repeat", type=int, default=500, help="iterations per case")
+    args = parser.parse_args()
+
+    main(args.repeat)
@@ -0,0 +1,49 @@
+# backend/scripts/build_embeddings.py
+#
+# Compute missing entry embeddings ahead of time (after a bulk import, a first
+# deploy, or an EMBEDDING_VERSION change). Otherwise they are computed on the
+# first similar-entries / time-capsule request of each user.
+#
+#   python scripts/build_embeddings.py --email test@example.com
+#   python scripts/build_embeddings.py --all
+
+import os
+import sys
+
+# Let Python know backend root path
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+
+import argparse
+import time
+
+from database import SessionLocal
+from models import User
+from services.embedding_service import sync_user_embeddings
+
+
+def main(email: str | None, all_users: bool) -> None:
+    db = SessionLocal()
+    try:
+        if all_users:
+            user_ids = [row[0] for row in db.query(User.id).order_by(User.id.asc()).all()]
+        else:
+            user = db.query(User).filter(User.email == email).first()
+            if not user:
+                print(f"User not found: {email}")
+                return
+            user_ids = [user.id]
+
+        started = time.perf_counter()
+        total = sum(sync_user_embeddings(db, user_id) for user_id in user_ids)
+        print(f"Embedded {total} entries for {len(user_ids)} user(s) in {time.perf_counter() - started:.1f}s")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compute missing entry embeddings")
+    group = parser.add_mutually_exclusive_group(required=True)
+    group.add_argument("--email", help="A single user")
+    group.add_argument("--all", action="store_true", help="Every user")
+    args = parser.parse_args()
+    main(args.email, args.all)
@@ -0,0 +1,75 @@
+# backend/scripts/create_indexes_concurrently.py
+#
+# Create the indexes declared on the models without blocking writes on a live
+# database. Base.metadata.create_all only adds indexes together with new tables,
+# so indexes added to an existing table (e.g. journal_entries) are applied here.
+#
+#   python scripts/create_indexes_concurrently.py            # all tables
+#   python scripts/create_indexes_concurrently.py --table journal_entries --dry-run
+
+import os
+import sys
+
+# Let Python know backend root path
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+
+import argparse
+import time
+
+from sqlalchemy import text
+from sqlalchemy.schema import CreateIndex
+
+import models  # noqa: F401  (registers every table on Base.metadata)
+from database import Base, engine
+
+
+def _index_state(conn, name: str):
+    """None if missing, else True/False for valid/invalid (a failed CONCURRENTLY build leaves it invalid)."""
+    row = conn.execute(
+        text(
+            "SELECT i.indisvalid FROM pg_index i JOIN pg_class c ON c.oid = i.indexrelid "
+            "WHERE c.relname = :name AND pg_table_is_visible(c.oid)"
+        ),
+        {"name": name},
+    ).first()
+    return None if row is None else bool(row[0])
+
+
+def create_indexes(table_names=None, dry_run: bool = False) -> None:
+    tables = [t for t in Base.metadata.sorted_tables if not table_names or t.name in table_names]
+
+    # CONCURRENTLY cannot run inside a transaction block
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        for table in tables:
+            for index in sorted(table.indexes, key=lambda i: i.name):
+                state = _index_state(conn, index.name)
+                if state is True:
+                    print(f"ok       {index.name}")
+                    continue
+
+                ddl = str(CreateIndex(index, if_not_exists=True).compile(engine))
+                ddl = ddl.replace("CREATE INDEX", "CREATE INDEX CONCURRENTLY", 1)
+                ddl = ddl.replace("CREATE UNIQUE INDEX", "CREATE UNIQUE INDEX CONCURRENTLY", 1)
+
+                if dry_run:
+                    if state is False:
+                        print(f"DROP INDEX CONCURRENTLY {index.name};")
+                    print(f"{ddl};")
+                    continue
+
+                if state is False:
+                    print(f"drop     {index.name} (invalid, left by an interrupted build)")
+                    conn.execute(text(f'DROP INDEX CONCURRENTLY IF EXISTS "{index.name}"'))
+
+                started = time.perf_counter()
+                print(f"create   {index.name} ...", flush=True)
+                conn.execute(text(ddl))
+                print(f"created  {index.name} in {time.perf_counter() - started:.1f}s")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Create missing model indexes with CREATE INDEX CONCURRENTLY")
+    parser.add_argument("--table", action="append", help="Limit to this table (repeatable)")
+    parser.add_argument("--dry-run", action="store_true", help="Print the DDL instead of running it")
+    args = parser.parse_args()
+    create_indexes(args.table, args.dry_run)
@@ -0,0 +1,218 @@
+# backend/scripts/llm_stub_server.py
+#
+# Deterministic, OpenAI-compatible stand-in for the LLM provider (load tests / local dev).
+#
+# Run:
+#   python scripts/llm_stub_server.py --port 8100 --latency-dist lognormal --latency-ms 800 --error-rate 0.02
+# Point the backend at it:
+#   SILICONFLOW_API_URL=http://localhost:8100/v1/chat/completions
+
+import argparse
+import asyncio
+import hashlib
+import json
+import math
+import random
+import re
+import time
+from typing import Any, Dict, List
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+EMOTIONS = ["joy", "calm", "tired", "anxiety", "sadness", "anger"]
+THEMES = ["work", "hobbies", "social", "other"]
+
+# Small keyword hints so the stub output is plausible for seeded text
+EMOTION_HINTS = {
+    "joy": ["happy", "joy", "laugh", "bright", "proud", "delicious", "win"],
+    "calm": ["calm", "quiet", "peaceful", "tea", "stillness", "gentle"],
+    "tired": ["tired", "drained", "exhaust", "sleep", "yawn", "sluggish"],
+    "anxiety": ["anxious", "worry", "worried", "tight", "pressure", "on edge"],
+    "sadness": ["sad", "lonely", "gray", "missed", "heavy", "nostalgic"],
+    "anger": ["angry", "irritat", "frustrat", "annoy", "snapped", "argued"],
+}
+
+REPLIES = [
+    "Thank you for sharing this. It sounds like today asked a lot of you, and noticing that is already a kind step.",
+    "I hear you. Let yourself take this one moment at a time; you do not have to carry it all at once.",
+    "That sounds meaningful. I hope you can hold onto a little of that feeling for the rest of the week.",
+]
+
+# Filled from CLI args in main()
+CONFIG: Dict[str, Any] = {
+    "latency_dist": "lognormal",
+    "latency_ms": 500.0,
+    "latency_sigma": 0.5,
+    "error_rate": 0.0,
+    "timeout_rate": 0.0,
+    "timeout_ms": 120000.0,
+    "stream_chunk_chars": 6,
+    "stream_chunk_ms": 20.0,
+}
+
+STATS = {"requests": 0, "errors": 0, "timeouts": 0, "streams": 0}
+
+app = FastAPI(title="LLM stub")
+
+
+def _rng(prompt: str) -> random.Random:
+    seed = int.from_bytes(hashlib.sha256(prompt.encode("utf-8")).digest()[:8], "big")
+    return random.Random(seed)
+
+
+def _sample_latency() -> float:
+    mean = CONFIG["latency_ms"] / 1000.0
+    dist = CONFIG["latency_dist"]
+    if dist == "fixed":
+        return mean
+    if dist == "uniform":
+        return random.uniform(0, 2 * mean)
+    if dist == "exponential":
+        return random.expovariate(1.0 / mean) if mean > 0 else 0.0
+    # lognormal with the given median and sigma (heavy tail)
+    return mean * math.exp(random.gauss(0, CONFIG["latency_sigma"]))
+
+
+def _guess_emotion(text: str, rng: random.Random) -> str:
+    lowered = text.lower()
+    scores = {e: sum(lowered.count(w) for w in words) for e, words in EMOTION_HINTS.items()}
+    best = max(scores, key=lambda e: scores[e])
+    return best if scores[best] > 0 else rng.choice(EMOTIONS)
+
+
+def _theme_scores(rng: random.Random) -> Dict[str, float]:
+    raw = [rng.random() for _ in THEMES]
+    total = sum(raw)
+    return {k: round(v / total, 3) for k, v in zip(THEMES, raw)}
+
+
+def _analysis(text: str, rng: random.Random) -> Dict[str, Any]:
+    scores = _theme_scores(rng)
+    return {
+        "emotion": _guess_emotion(text, rng),
+        "intensity": rng.randint(1, 3),
+        "theme_scores": scores,
+        "primary_theme": max(scores, key=lambda k: scores[k]),
+    }
+
+
+def _journal_text(prompt: str) -> str:
+    m = re.search(r'"""(.*?)"""', prompt, re.DOTALL)
+    return m.group(1).strip() if m else prompt
+
+
+def build_completion(prompt: str) -> str:
+    """Return a completion shaped like what the backend's prompt asks for."""
+    rng = _rng(prompt)
+
+    # Batch analysis: JSON array, one object per <<<ENTRY n>>> block
+    blocks = re.findall(r"<<<ENTRY (\d+)>>>\n(.*?)\n<<<END ENTRY \1>>>", prompt, re.DOTALL)
+    if blocks:
+        items: List[Dict[str, Any]] = []
+        for idx, text in blocks:
+            items.append({"index": int(idx), **_analysis(text, rng)})
+        return json.dumps(items)
+
+    # Time capsule: one verbatim sentence
+    if "Time Capsule" in prompt:
+        content = _journal_text(prompt)
+        sentences = [s.strip() for s in re.split(r"(?<=[.!?])\s+", content) if s.strip()]
+        return rng.choice(sentences) if sentences else content[:120]
+
+    # Reply / analysis JSON
+    if '"theme_scores"' in prompt:
+        analysis_only = "You will ONLY analyze the entry" in prompt
+        data = {"reply": "" if analysis_only else rng.choice(REPLIES), **_analysis(_journal_text(prompt), rng)}
+        return json.dumps(data)
+
+    # Insights note: plain text
+    return "Your entries this period feel steady, with a few brighter days worth noticing."
+
+
+def _chat_response(content: str, model: str) -> Dict[str, Any]:
+    return {
+        "id": f"stub-{int(time.time() * 1000)}",
+        "object": "chat.completion",
+        "model": model,
+        "choices": [{"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": "stop"}],
+    }
+
+
+@app.post("/v1/chat/completions")
+async def chat_completions(request: Request):
+    body = await request.json()
+    STATS["requests"] += 1
+
+    messages = body.get("messages") or []
+    prompt = messages[-1].get("content", "") if messages else ""
+    model = body.get("model", "stub")
+
+    roll = random.random()
+    if roll < CONFIG["timeout_rate"]:
+        STATS["timeouts"] += 1
+        await asyncio.sleep(CONFIG["timeout_ms"] / 1000.0)
+    elif roll < CONFIG["timeout_rate"] + CONFIG["error_rate"]:
+        STATS["errors"] += 1
+        await asyncio.sleep(_sample_latency() / 4)
+        return JSONResponse(status_code=503, content={"error": "stub injected error"})
+
+    content = build_completion(prompt)
+
+    if not body.get("stream"):
+        await asyncio.sleep(_sample_latency())
+        return _chat_response(content, model)
+
+    STATS["streams"] += 1
+    first_token_delay = _sample_latency() / 4
+    step = max(1, int(CONFIG["stream_chunk_chars"]))
+    chunk_delay = CONFIG["stream_chunk_ms"] / 1000.0
+
+    async def event_stream():
+        await asyncio.sleep(first_token_delay)
+        for i in range(0, len(content), step):
+            delta = {"choices": [{"index": 0, "delta": {"content": content[i:i + step]}}]}
+            yield f"data: {json.dumps(delta)}\n\n"
+            await asyncio.sleep(chunk_delay)
+        yield "data: [DONE]\n\n"
+
+    return StreamingResponse(event_stream(), media_type="text/event-stream")
+
+
+@app.get("/stats")
+def stub_stats():
+    return {"config": CONFIG, **STATS}
+
+
+def main() -> None:
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description="Deterministic OpenAI-compatible LLM stub")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=8100)
+    parser.add_argument("--latency-dist", choices=["fixed", "uniform", "exponential", "lognormal"], default="lognormal")
+    parser.add_argument("--latency-ms", type=float, default=500.0, help="Mean (median for lognormal) latency")
+    parser.add_argument("--latency-sigma", type=float, default=0.5, help="Lognormal sigma (tail heaviness)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of requests answered with 503")
+    parser.add_argument("--timeout-rate", type=float, default=0.0, help="Fraction of requests that hang")
+    parser.add_argument("--timeout-ms", type=float, default=120000.0)
+    parser.add_argument("--stream-chunk-chars", type=int, default=6)
+    parser.add_argument("--stream-chunk-ms", type=float, default=20.0)
+    args = parser.parse_args()
+
+    CONFIG.update({
+        "latency_dist": args.latency_dist,
+        "latency_ms": args.latency_ms,
+        "latency_sigma": args.latency_sigma,
+        "error_rate": args.error_rate,
+        "timeout_rate": args.timeout_rate,
+        "timeout_ms": args.timeout_ms,
+        "stream_chunk_chars": args.stream_chunk_chars,
+        "stream_chunk_ms": args.stream_chunk_ms,
+    })
+
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
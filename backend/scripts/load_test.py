@@ -0,0 +1,195 @@
+# backend/scripts/load_test.py
+#
+# Open-loop load generator for the backend API.
+#
+# Example (backend pointed at scripts/llm_stub_server.py):
+#   python scripts/load_test.py --base-url http://localhost:9000 --rps 50 --duration 60 --users 20
+
+import argparse
+import asyncio
+import random
+import time
+import uuid
+from collections import defaultdict
+from datetime import date, datetime, timezone
+from typing import Dict, List, Tuple
+
+import httpx
+
+SAMPLE_TEXTS = [
+    "Today felt unexpectedly bright. I finished my tasks early and walked around campus.",
+    "I kept checking my email, afraid I was missing something important at work.",
+    "Quiet evening with tea and a book. My mind felt clear for once.",
+    "I woke up tired and it never really went away. I need a proper break.",
+    "Had dinner with friends and laughed a lot. It made the whole week lighter.",
+    "A small inconvenience set me off and I hated how quickly I snapped.",
+]
+
+# Default traffic mix: route name -> weight
+DEFAULT_MIX = {
+    "create_entry": 3,
+    "create_entry_ai_reply": 1,
+    "list_entries": 3,
+    "insights_week": 2,
+    "insights_month": 1,
+    "stats_week": 2,
+    "calendar_week": 2,
+    "calendar_month": 1,
+}
+
+
+class Recorder:
+    def __init__(self):
+        self.latencies: Dict[str, List[float]] = defaultdict(list)
+        self.errors: Dict[str, int] = defaultdict(int)
+        self.status: Dict[str, Dict[int, int]] = defaultdict(lambda: defaultdict(int))
+
+    def record(self, route: str, seconds: float, status: int) -> None:
+        self.latencies[route].append(seconds)
+        self.status[route][status] += 1
+        if status >= 400 or status == 0:
+            self.errors[route] += 1
+
+
+def percentile(sorted_values: List[float], p: float) -> float:
+    if not sorted_values:
+        return 0.0
+    k = min(len(sorted_values) - 1, max(0, int(round(p / 100.0 * (len(sorted_values) - 1)))))
+    return sorted_values[k]
+
+
+async def _timed_post(client: httpx.AsyncClient, recorder: "Recorder", route: str, path: str, body: dict):
+    started = time.perf_counter()
+    r = await client.post(path, json=body)
+    recorder.record(route, time.perf_counter() - started, r.status_code)
+    r.raise_for_status()
+    return r
+
+
+async def setup_users(client: httpx.AsyncClient, recorder: "Recorder", count: int) -> List[Dict[str, str]]:
+    """Register fresh users, then log each in (exercises both auth routes)."""
+    async def one() -> Dict[str, str]:
+        body = {"email": f"load_{uuid.uuid4().hex[:10]}@example.com", "password": "loadtest123"}
+        await _timed_post(client, recorder, "register", "/users/register", body)
+        r = await _timed_post(client, recorder, "login", "/users/login", body)
+        return {"Authorization": f"Bearer {r.json()['access_token']}"}
+
+    return list(await asyncio.gather(*(one() for _ in range(count))))
+
+
+def build_request(route: str) -> Tuple[str, str, dict]:
+    today = date.today()
+    if route == "create_entry":
+        return "POST", "/entries/", {"json": {"content": random.choice(SAMPLE_TEXTS), "need_ai_reply": False}}
+    if route == "create_entry_ai_reply":
+        return "POST", "/entries/", {"json": {"content": random.choice(SAMPLE_TEXTS), "need_ai_reply": True}}
+    if route == "list_entries":
+        return "GET", "/entries/", {}
+    if route == "insights_week":
+        return "GET", "/insights/?range=week", {}
+    if route == "insights_month":
+        return "GET", "/insights/?range=month", {}
+    if route == "stats_week":
+        return "GET", f"/stats/?stats_range=week&date={today.isoformat()}", {}
+    if route == "calendar_week":
+        return "GET", "/journals/calendar/week", {}
+    if route == "calendar_month":
+        return "GET", f"/journals/calendar/month?month={today.strftime('%Y-%m')}", {}
+    raise ValueError(f"Unknown route {route}")
+
+
+async def fire(client: httpx.AsyncClient, recorder: Recorder, route: str, headers: Dict[str, str]) -> None:
+    method, path, kwargs = build_request(route)
+    started = time.perf_counter()
+    try:
+        resp = await client.request(method, path, headers=headers, **kwargs)
+        status = resp.status_code
+    except httpx.HTTPError:
+        status = 0
+    recorder.record(route, time.perf_counter() - started, status)
+
+
+async def run(args) -> None:
+    mix = dict(DEFAULT_MIX)
+    if args.mix:
+        mix = {}
+        for part in args.mix.split(","):
+            name, weight = part.split("=")
+            mix[name.strip()] = float(weight)
+    routes, weights = list(mix.keys()), list(mix.values())
+
+    limits = httpx.Limits(max_connections=args.max_connections, max_keepalive_connections=args.max_connections)
+    async with httpx.AsyncClient(base_url=args.base_url, timeout=args.timeout, limits=limits) as client:
+        recorder = Recorder()
+        print(f"Setting up {args.users} users ...")
+        users = await setup_users(client, recorder, args.users)
+
+        tasks = set()
+        interval = 1.0 / args.rps
+        started = time.perf_counter()
+        next_at = started
+        sent = 0
+
+        print(f"Driving {args.rps} req/s for {args.duration}s ...")
+        # Open loop: requests are issued on schedule even if earlier ones are slow
+        while time.perf_counter() - started < args.duration:
+            now = time.perf_counter()
+            if now < next_at:
+                await asyncio.sleep(next_at - now)
+            route = random.choices(routes, weights=weights)[0]
+            task = asyncio.create_task(fire(client, recorder, route, random.choice(users)))
+            tasks.add(task)
+            task.add_done_callback(tasks.discard)
+            sent += 1
+            next_at += interval
+
+        if tasks:
+            await asyncio.wait(tasks)
+        elapsed = time.perf_counter() - started
+
+    report(recorder, sent, elapsed)
+
+
+def report(recorder: Recorder, sent: int, elapsed: float) -> None:
+    print()
+    print(f"Sent {sent} requests in {elapsed:.1f}s -> {sent / elapsed:.1f} req/s")
+    header = f"{'route':<24}{'count':>7}{'rps':>8}{'err':>6}{'p50':>9}{'p90':>9}{'p95':>9}{'p99':>9}{'max':>9}"
+    print(header)
+    print("-" * len(header))
+
+    all_latencies: List[float] = []
+    for route in sorted(recorder.latencies):
+        values = sorted(recorder.latencies[route])
+        all_latencies.extend(values)
+        print(
+            f"{route:<24}{len(values):>7}{len(values) / elapsed:>8.1f}{recorder.errors[route]:>6}"
+            + "".join(f"{percentile(values, p) * 1000:>8.0f}ms"[-9:] for p in (50, 90, 95, 99))
+            + f"{values[-1] * 1000:>7.0f}ms"
+        )
+
+    all_latencies.sort()
+    total_errors = sum(recorder.errors.values())
+    print("-" * len(header))
+    print(
+        f"{'ALL':<24}{len(all_latencies):>7}{len(all_latencies) / elapsed:>8.1f}{total_errors:>6}"
+        + "".join(f"{percentile(all_latencies, p) * 1000:>8.0f}ms"[-9:] for p in (50, 90, 95, 99))
+        + (f"{all_latencies[-1] * 1000:>7.0f}ms" if all_latencies else "")
+    )
+
+    for route in sorted(recorder.status):
+        codes = ", ".join(f"{code}:{n}" for code, n in sorted(recorder.status[route].items()))
+        print(f"  {route}: {codes}")
+
+    print(f"\nFinished at {datetime.now(timezone.utc).isoformat()}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Load generator for the journal API")
+    parser.add_argument("--base-url", default="http://localhost:9000")
+    parser.add_argument("--rps", type=float, default=20.0, help="Target request rate")
+    parser.add_argument("--duration", type=float, default=30.0, help="Seconds of load")
+    parser.add_argument("--users", type=int, default=10, help="Users registered before the run")
+    parser.add_argument("--timeout", type=float, default=60.0)
+    parser.add_argument("--max-connections", type=int, default=200)
+    parser.add_argument("--mix", help="Override mix, e.g. create_entry=5,insights_week=1")
+    asyncio.run(run(parser.parse_args()))
@@ -0,0 +1,81 @@
+# backend/scripts/reanalyze_entries.py
+
+import os
+import sys
+
+# Let Python know backend root path
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+
+import argparse
+import asyncio
+import time
+
+from sqlalchemy import or_
+from sqlalchemy.orm import Session
+
+from database import SessionLocal
+from models import JournalEntry, User
+from services.ai_reply_service import analyze_entries_batch, BATCH_ANALYSIS_SIZE, BATCH_OK
+from core.ai_client import close_client
+
+# How many entry ids are loaded and handed to the batch analyzer at once
+PAGE_SIZE = 200
+
+
+def _pending_entry_ids(db: Session, user_id: int, force: bool, after_id: int) -> list[int]:
+    query = db.query(JournalEntry.id).filter(
+        JournalEntry.user_id == user_id,
+        JournalEntry.deleted == False,
+        JournalEntry.id > after_id,
+    )
+    if not force:
+        query = query.filter(or_(JournalEntry.emotion.is_(None), JournalEntry.theme_scores.is_(None)))
+
+    rows = query.order_by(JournalEntry.id.asc()).limit(PAGE_SIZE).all()
+    return [row[0] for row in rows]
+
+
+async def reanalyze(email: str | None, force: bool, batch_size: int) -> None:
+    """Backfill/re-run emotion + theme analysis using batched LLM calls."""
+    db: Session = SessionLocal()
+    started = time.perf_counter()
+    total = ok = 0
+
+    try:
+        user_query = db.query(User)
+        if email:
+            user_query = user_query.filter(User.email == email)
+
+        for user in user_query.order_by(User.id.asc()).all():
+            after_id = 0
+            while True:
+                entry_ids = _pending_entry_ids(db, user.id, force, after_id)
+                if not entry_ids:
+                    break
+                after_id = entry_ids[-1]
+
+                results = await analyze_entries_batch(
+                    db=db,
+                    entry_ids=entry_ids,
+                    current_user=user,
+                    force_regenerate=force,
+                    batch_size=batch_size,
+                )
+                total += len(results)
+                ok += sum(1 for v in results.values() if v == BATCH_OK)
+                print(f"user_id={user.id}: analyzed {ok}/{total} entries so far")
+    finally:
+        db.close()
+        await close_client()
+
+    print(f"Done. {ok}/{total} entries analyzed in {time.perf_counter() - started:.1f}s")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Batch re-analysis of journal entries")
+    parser.add_argument("--email", help="Only this user (default: all users)")
+    parser.add_argument("--force", action="store_true", help="Re-analyze entries that already have analysis")
+    parser.add_argument("--batch-size", type=int, default=BATCH_ANALYSIS_SIZE)
+    args = parser.parse_args()
+
+    asyncio.run(reanalyze(args.email, args.force, args.batch_size))
@@ -0,0 +1,65 @@
+# backend/scripts/rebuild_rollups.py
+#
+# Recompute user_daily_rollup from journal_entries (repairs after manual SQL,
+# bulk imports that bypassed the ORM, or a bug in the incremental updates).
+#
+#   python scripts/rebuild_rollups.py --email test@example.com
+#   python scripts/rebuild_rollups.py --all
+#   python scripts/rebuild_rollups.py --all --verify   # report drifted days, write nothing
+
+import os
+import sys
+
+# Let Python know backend root path
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+
+import argparse
+import time
+
+from database import SessionLocal
+from models import User
+from services.entry_aggregates import rollup_mismatches
+from services.rollup_service import rebuild_rollups
+
+
+def main(email: str | None, all_users: bool, verify: bool) -> None:
+    db = SessionLocal()
+    try:
+        if all_users:
+            user_ids = [row[0] for row in db.query(User.id).order_by(User.id.asc()).all()]
+        else:
+            user = db.query(User).filter(User.email == email).first()
+            if not user:
+                print(f"User not found: {email}")
+                return
+            user_ids = [user.id]
+
+        started = time.perf_counter()
+        if verify:
+            drifted = 0
+            for user_id in user_ids:
+                days = rollup_mismatches(db, user_id)
+                if days:
+                    drifted += 1
+                    print(f"User {user_id}: {len(days)} day(s) differ, first {days[0]}, last {days[-1]}")
+            print(f"Checked {len(user_ids)} user(s) in {time.perf_counter() - started:.1f}s; {drifted} need a rebuild")
+            return
+
+        total = 0
+        # One transaction per user keeps row locks short on a live database
+        for user_id in user_ids:
+            total += rebuild_rollups(db, user_id)
+            db.commit()
+        print(f"Rebuilt {total} rollup rows for {len(user_ids)} user(s) in {time.perf_counter() - started:.1f}s")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Rebuild per-user daily rollups from journal entries")
+    group = parser.add_mutually_exclusive_group(required=True)
+    group.add_argument("--email", help="Rebuild a single user")
+    group.add_argument("--all", action="store_true", help="Rebuild every user")
+    parser.add_argument("--verify", action="store_true", help="Only compare rollups with the entries")
+    args = parser.parse_args()
+    main(args.email, args.all, args.verify)
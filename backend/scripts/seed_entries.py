@@ -6,6 +6,7 @@ import sys
 # Let Python know backend root path
 sys.path.append(os.path.dirname(os.path.dirname(__file__)))
 
+import asyncio
 import random
 from datetime import datetime, timedelta
 import calendar
@@ -15,7 +16,8 @@ from sqlalchemy.orm import Session
 from database import SessionLocal
 from models import JournalEntry, User
 from routers.user import hash_password
-from services.ai_reply_service import generate_ai_reply_for_entry
+from services.ai_reply_service import generate_ai_reply_for_entry, analyze_entries_batch, BATCH_OK
+from core.ai_client import close_client
 
 # Set the target user's email (User.email)
 TARGET_EMAIL = "test@example.com"
@@ -117,7 +119,7 @@ def random_time_on_date(day_dt: datetime) -> datetime:
     )
 
 
-def create_entry_with_ai(db: Session, user: User, created_at: datetime) -> None:
+async def create_entry_with_ai(db: Session, user: User, created_at: datetime) -> None:
     """Create one JournalEntry, then call AI service to generate reply + emotion/intensity."""
     emotion = random.choice(EMOTIONS)
     content = random.choice(EMOTION_SENTENCES[emotion])
@@ -134,7 +136,7 @@ def create_entry_with_ai(db: Session, user: User, created_at: datetime) -> None:
     db.flush()  # get entry.id
 
     try:
-        ai_reply = generate_ai_reply_for_entry(
+        ai_reply = await generate_ai_reply_for_entry(
             db=db,
             entry_id=entry.id,
             current_user=user,
@@ -145,7 +147,26 @@ def create_entry_with_ai(db: Session, user: User, created_at: datetime) -> None:
         print(f"Created entry_id={entry.id}; AI reply failed: {e}")
 
 
-def seed_entries_for_user(total_entries: int = 18) -> None:
+def create_entry_without_ai(db: Session, user: User, created_at: datetime) -> int:
+    """Create one JournalEntry only; analysis is done afterwards in batches."""
+    emotion = random.choice(EMOTIONS)
+    content = random.choice(EMOTION_SENTENCES[emotion])
+
+    entry = JournalEntry(
+        user_id=user.id,
+        content=content,
+        summary=content[:200],
+        created_at=created_at,
+        deleted=False,
+        analysis_status="pending",
+    )
+
+    db.add(entry)
+    db.flush()  # get entry.id
+    return entry.id
+
+
+def seed_entries_for_user(total_entries: int = 18, with_ai_reply: bool = True) -> None:
     """
     Seed about 18 entries for the specified user:
     - today
@@ -155,6 +176,7 @@ def seed_entries_for_user(total_entries: int = 18) -> None:
     - plus 2 additional random dates (recent 60 days) avoiding duplicates
 
     For each entry, we call generate_ai_reply_for_entry to generate AI reply + emotion + intensity.
+    With with_ai_reply=False, entries are analyzed only, several per LLM call.
     """
 
     db: Session = SessionLocal()
@@ -224,9 +246,26 @@ def seed_entries_for_user(total_entries: int = 18) -> None:
     # db.commit()
     # print("Cleared existing entries for this user.")
 
-    for d in all_target_dates:
-        created_at = random_time_on_date(d)
-        create_entry_with_ai(db, user, created_at)
+    async def _create_all() -> None:
+        # One event loop for the whole run so the pooled LLM client is reused
+        if with_ai_reply:
+            for d in all_target_dates:
+                created_at = random_time_on_date(d)
+                await create_entry_with_ai(db, user, created_at)
+        else:
+            entry_ids = [create_entry_without_ai(db, user, random_time_on_date(d)) for d in all_target_dates]
+            db.commit()
+            results = await analyze_entries_batch(db=db, entry_ids=entry_ids, current_user=user)
+            failed_ids = [entry_id for entry_id, outcome in results.items() if outcome != BATCH_OK]
+            if failed_ids:
+                db.query(JournalEntry).filter(JournalEntry.id.in_(failed_ids)).update(
+                    {"analysis_status": "failed"}, synchronize_session=False
+                )
+                db.commit()
+            print(f"Analyzed {len(entry_ids) - len(failed_ids)}/{len(entry_ids)} entries in batches")
+        await close_client()
+
+    asyncio.run(_create_all())
 
     db.commit()
     db.close()
@@ -234,4 +273,5 @@ def seed_entries_for_user(total_entries: int = 18) -> None:
 
 
 if __name__ == "__main__":
-    seed_entries_for_user(total_entries=18)
+    # Pass --no-reply to skip AI replies and analyze entries in batches
+    seed_entries_for_user(total_entries=18, with_ai_reply="--no-reply" not in sys.argv)
@@ -0,0 +1,156 @@
+# backend/scripts/train_local_classifier.py
+#
+# Train the hashed n-gram local classifier on entries the LLM already analyzed.
+# Run it while LOCAL_CLASSIFIER_MODE is "off" or "shadow" so labels come from the LLM.
+#
+#   python scripts/train_local_classifier.py --out data/local_classifier.npz
+#
+# Then set LOCAL_CLASSIFIER_BACKEND=ngram (and LOCAL_CLASSIFIER_WEIGHTS if --out differs).
+
+import os
+import sys
+
+# Let Python know backend root path
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+
+import argparse
+
+import numpy as np
+
+from database import SessionLocal
+from models import JournalEntry
+from core.text_features import hashed_ngrams
+from core.local_classifier import EMOTION_LABELS, THEME_LABELS, LOCAL_CLASSIFIER_WEIGHTS
+
+THRESHOLDS = [0.3, 0.4, 0.5, 0.6, 0.7, 0.8, 0.9]
+
+
+def load_examples(limit: int):
+    db = SessionLocal()
+    try:
+        rows = (
+            db.query(JournalEntry.content, JournalEntry.emotion, JournalEntry.emotion_intensity, JournalEntry.primary_theme)
+            .filter(
+                JournalEntry.deleted == False,
+                JournalEntry.emotion.in_(EMOTION_LABELS),
+                JournalEntry.emotion_intensity.in_([1, 2, 3]),
+                JournalEntry.primary_theme.in_(THEME_LABELS),
+            )
+            .order_by(JournalEntry.id.desc())
+            .limit(limit)
+            .all()
+        )
+    finally:
+        db.close()
+    return rows
+
+
+def featurize(texts, dim: int):
+    """CSR-like (row, col, val) arrays for a batch of texts."""
+    rows, cols, vals = [], [], []
+    for i, text in enumerate(texts):
+        for idx, v in hashed_ngrams(text, dim).items():
+            rows.append(i)
+            cols.append(idx)
+            vals.append(v)
+    return np.array(rows, dtype=np.int64), np.array(cols, dtype=np.int64), np.array(vals, dtype=np.float32)
+
+
+def sparse_dot(rows, cols, vals, n, W):
+    """X @ W for the sparse X given as (rows, cols, vals)."""
+    out = np.zeros((n, W.shape[1]), dtype=np.float32)
+    np.add.at(out, rows, vals[:, None] * W[cols])
+    return out
+
+
+def softmax(z):
+    z = z - z.max(axis=1, keepdims=True)
+    e = np.exp(z)
+    return e / e.sum(axis=1, keepdims=True)
+
+
+def train_head(X, n, y, n_labels, dim, epochs, lr, l2):
+    """Full-batch softmax regression with Adam."""
+    rows, cols, vals = X
+    W = np.zeros((dim, n_labels), dtype=np.float32)
+    b = np.zeros(n_labels, dtype=np.float32)
+    onehot = np.eye(n_labels, dtype=np.float32)[y]
+    state = {"mW": np.zeros_like(W), "vW": np.zeros_like(W), "mb": np.zeros_like(b), "vb": np.zeros_like(b)}
+    beta1, beta2, eps = 0.9, 0.999, 1e-8
+
+    for t in range(1, epochs + 1):
+        probs = softmax(sparse_dot(rows, cols, vals, n, W) + b)
+        grad_z = (probs - onehot) / n
+        gW = np.zeros_like(W)
+        np.add.at(gW, cols, vals[:, None] * grad_z[rows])
+        gW += l2 * W
+        gb = grad_z.sum(axis=0)
+
+        for name, param, grad in (("W", W, gW), ("b", b, gb)):
+            m, v = state["m" + name], state["v" + name]
+            m[:] = beta1 * m + (1 - beta1) * grad
+            v[:] = beta2 * v + (1 - beta2) * grad * grad
+            param -= lr * (m / (1 - beta1 ** t)) / (np.sqrt(v / (1 - beta2 ** t)) + eps)
+    return W, b
+
+
+def main(args) -> None:
+    examples = load_examples(args.limit)
+    if len(examples) < 20:
+        print(f"Only {len(examples)} labeled entries found; need at least 20.")
+        return
+
+    rng = np.random.default_rng(args.seed)
+    order = rng.permutation(len(examples))
+    n_test = max(1, int(len(examples) * args.holdout))
+    test_idx, train_idx = order[:n_test], order[n_test:]
+
+    texts = [e[0] for e in examples]
+    y = {
+        "emotion": np.array([EMOTION_LABELS.index(e[1]) for e in examples]),
+        "intensity": np.array([e[2] - 1 for e in examples]),
+        "theme": np.array([THEME_LABELS.index(e[3]) for e in examples]),
+    }
+    n_labels = {"emotion": len(EMOTION_LABELS), "intensity": 3, "theme": len(THEME_LABELS)}
+
+    X_train = featurize([texts[i] for i in train_idx], args.dim)
+    X_test = featurize([texts[i] for i in test_idx], args.dim)
+    print(f"Training on {len(train_idx)} entries, holding out {len(test_idx)} (dim={args.dim})")
+
+    arrays = {"dim": np.array(args.dim)}
+    probs = {}
+    for head in ("emotion", "intensity", "theme"):
+        W, b = train_head(X_train, len(train_idx), y[head][train_idx], n_labels[head], args.dim, args.epochs, args.lr, args.l2)
+        arrays[f"{head}_W"], arrays[f"{head}_b"] = W, b
+        probs[head] = softmax(sparse_dot(*X_test, len(test_idx), W) + b)
+        acc = (probs[head].argmax(axis=1) == y[head][test_idx]).mean()
+        print(f"  {head:<10} holdout agreement with LLM: {acc:.3f}")
+
+    # Same confidence formula as HashedNgramClassifier.classify
+    confidence = probs["emotion"].max(axis=1) * (0.5 + 0.5 * probs["theme"].max(axis=1))
+    emotion_ok = probs["emotion"].argmax(axis=1) == y["emotion"][test_idx]
+    theme_ok = probs["theme"].argmax(axis=1) == y["theme"][test_idx]
+    print("\nthreshold  coverage  emotion_agree  theme_agree")
+    for threshold in THRESHOLDS:
+        mask = confidence >= threshold
+        if not mask.any():
+            print(f"{threshold:>9.2f}  {0:>8.3f}  {'-':>13}  {'-':>11}")
+            continue
+        print(f"{threshold:>9.2f}  {mask.mean():>8.3f}  {emotion_ok[mask].mean():>13.3f}  {theme_ok[mask].mean():>11.3f}")
+
+    os.makedirs(os.path.dirname(os.path.abspath(args.out)), exist_ok=True)
+    np.savez_compressed(args.out, **arrays)
+    print(f"\nSaved weights to {args.out}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Train the local emotion/theme classifier")
+    parser.add_argument("--out", default=LOCAL_CLASSIFIER_WEIGHTS)
+    parser.add_argument("--dim", type=int, default=2 ** 16, help="Hashed feature buckets")
+    parser.add_argument("--limit", type=int, default=50000, help="Most recent labeled entries to use")
+    parser.add_argument("--epochs", type=int, default=200)
+    parser.add_argument("--lr", type=float, default=0.05)
+    parser.add_argument("--l2", type=float, default=1e-4)
+    parser.add_argument("--holdout", type=float, default=0.2)
+    parser.add_argument("--seed", type=int, default=0)
+    main(parser.parse_args())
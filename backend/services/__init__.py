@@ -1,2 +1,5 @@
 # backend/services/__init__.py
 # Service layer modules
+
+# Keeps user_daily_rollup in step with every journal entry write (session flush hook)
+from . import rollup_service  # noqa: F401
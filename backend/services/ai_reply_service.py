@@ -1,6 +1,8 @@
 # backend/services/ai_reply_service.py
 
-from typing import Optional, Dict, Any, Tuple
+from datetime import datetime, timezone
+from typing import Optional, Dict, Any, AsyncIterator, List, Tuple
+import asyncio
 import json
 import re
 
@@ -8,7 +10,10 @@ from fastapi import HTTPException
 from sqlalchemy.orm import Session
 
 from models import JournalEntry, User, AICompanion, AIReply
-from core.ai_client import call_siliconflow
+from core.ai_client import MODEL_NAME, call_siliconflow, stream_siliconflow
+from core.single_flight import single_flight
+from core import local_classifier
+from core.json_extract import extract_json_array, extract_json_object
 
 
 # Fixed six emotions
@@ -124,41 +129,17 @@ The user's journal entry is:
 
 def _extract_json(text: str) -> Dict[str, Any]:
     """
-    Try to extract JSON from LLM output:
-    1) Use full text as JSON
-    2) ```json ... ``` code block
-    3) First {...} block
-    On failure, treat entire text as reply with empty emotion/intensity/theme.
+    Extract the JSON object from LLM output (fences, surrounding prose and
+    truncation are handled by core.json_extract). On failure, treat the
+    entire text as reply with empty emotion/intensity/theme.
     """
-    text = text.strip()
-
-    # 1) Direct parse
-    try:
-        return json.loads(text)
-    except Exception:
-        pass
-
-    # 2) ```json ... ``` block
-    m = re.search(r"```json(.*?)```", text, re.DOTALL | re.IGNORECASE)
-    if m:
-        inner = m.group(1).strip()
-        try:
-            return json.loads(inner)
-        except Exception:
-            pass
-
-    # 3) First brace block
-    m2 = re.search(r"\{.*\}", text, re.DOTALL)
-    if m2:
-        candidate = m2.group(0)
-        try:
-            return json.loads(candidate)
-        except Exception:
-            pass
+    data = extract_json_object(text)
+    if data is not None:
+        return data
 
     # Complete failure: fallback
     return {
-        "reply": text,
+        "reply": (text or "").strip(),
         "emotion": None,
         "intensity": None,
         "theme_scores": None,
@@ -242,7 +223,12 @@ def _clean_primary_theme(primary_theme: Any) -> Optional[str]:
     return None
 
 
-def call_llm_for_reply_emotion_and_theme(prompt: str) -> Dict[str, Any]:
+async def call_llm_for_reply_emotion_and_theme(
+    prompt: str,
+    bypass_cache: bool = False,
+    call_type: str = "reply",
+    user_id: Optional[int] = None,
+) -> Dict[str, Any]:
     """Return:
     - reply: str
     - emotion: str|None
@@ -251,10 +237,17 @@ def call_llm_for_reply_emotion_and_theme(prompt: str) -> Dict[str, Any]:
     - primary_theme: str|None
     """
     try:
-        raw = call_siliconflow(prompt)
+        raw = await call_siliconflow(prompt, bypass_cache=bypass_cache, call_type=call_type, user_id=user_id)
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=502, detail="AI service unavailable.") from e
 
+    return _parse_llm_result(raw)
+
+
+def _parse_llm_result(raw: str) -> Dict[str, Any]:
+    """Parse a complete reply/analysis completion into cleaned fields."""
     data = _extract_json(raw)
 
     reply = data.get("reply")
@@ -280,6 +273,24 @@ def call_llm_for_reply_emotion_and_theme(prompt: str) -> Dict[str, Any]:
     }
 
 
+def _classify_locally(content: str) -> Optional[Dict[str, Any]]:
+    """Local classifier result (with a "confidence"), or None when disabled/unavailable."""
+    if not local_classifier.enabled():
+        return None
+    try:
+        result = local_classifier.classify(content)
+    except Exception as e:
+        print(f"[local_classifier] classification failed: {type(e).__name__}: {e}")
+        return None
+
+    result["emotion"] = _clean_emotion(result["emotion"])
+    result["intensity"] = _clean_intensity(result["intensity"])
+    result["theme_scores"], result["primary_theme"] = _clean_and_normalize_theme_scores(result["theme_scores"])
+    if result["emotion"] is None or result["intensity"] is None:
+        return None
+    return result
+
+
 def _apply_analysis_to_entry(
     entry: JournalEntry,
     emotion: Optional[str],
@@ -298,17 +309,11 @@ def _apply_analysis_to_entry(
     if primary_theme:
         entry.primary_theme = primary_theme
 
+    entry.analysis_status = "done"
 
-def analyze_entry_for_entry(
-    db: Session,
-    entry_id: int,
-    current_user: User,
-    force_regenerate: bool = False,
-) -> JournalEntry:
-    """Analysis only (emotion/intensity/theme), no AIReply.
-    - Default: if entry already has analysis and not forced, return directly
-    - force_regenerate=True: re-analyze and overwrite
-    """
+
+def get_owned_entry(db: Session, entry_id: int, current_user: User) -> JournalEntry:
+    """Load a non-deleted entry of the current user or raise 404."""
     entry: Optional[JournalEntry] = (
         db.query(JournalEntry)
         .filter(
@@ -320,56 +325,17 @@ def analyze_entry_for_entry(
     )
     if not entry:
         raise HTTPException(status_code=404, detail="Journal entry not found")
-
-    has_analysis = bool(entry.emotion or entry.emotion_intensity or entry.primary_theme or entry.theme_scores)
-    if has_analysis and not force_regenerate:
-        return entry
-
-    companion = _get_companion_or_default(db, current_user)
-
-    prompt = build_prompt_for_entry(entry, companion, analysis_only=True)
-    result = call_llm_for_reply_emotion_and_theme(prompt)
-
-    _apply_analysis_to_entry(
-        entry=entry,
-        emotion=result["emotion"],
-        intensity=result["intensity"],
-        theme_scores=result["theme_scores"],
-        primary_theme=result["primary_theme"],
-    )
-
-    db.commit()
-    db.refresh(entry)
     return entry
 
 
-def generate_ai_reply_for_entry(
+def _save_ai_reply(
     db: Session,
-    entry_id: int,
+    entry: JournalEntry,
     current_user: User,
-    force_regenerate: bool = False,
+    companion: AICompanion,
+    result: Dict[str, Any],
 ) -> AIReply:
-    """Generate AI reply + analysis (emotion/intensity/theme)."""
-    entry: Optional[JournalEntry] = (
-        db.query(JournalEntry)
-        .filter(
-            JournalEntry.id == entry_id,
-            JournalEntry.user_id == current_user.id,
-            JournalEntry.deleted == False,
-        )
-        .first()
-    )
-    if not entry:
-        raise HTTPException(status_code=404, detail="Journal entry not found")
-
-    if entry.ai_reply and not force_regenerate:
-        return entry.ai_reply
-
-    companion = _get_companion_or_default(db, current_user)
-
-    prompt = build_prompt_for_entry(entry, companion, analysis_only=False)
-    result = call_llm_for_reply_emotion_and_theme(prompt)
-
+    """Persist analysis fields + (re)create the AIReply row for a parsed result."""
     reply_text: str = (result.get("reply") or "").strip()
 
     _apply_analysis_to_entry(
@@ -390,10 +356,530 @@ def generate_ai_reply_for_entry(
         companion_id=companion.id,
         reply_type="empathetic_reply_with_emotion",
         content=reply_text or " ",
-        model_name="Qwen/Qwen2.5-7B-Instruct",
+        model_name=MODEL_NAME,
     )
     db.add(ai_reply)
 
     db.commit()
     db.refresh(ai_reply)
     return ai_reply
+
+
+async def analyze_entry_for_entry(
+    db: Session,
+    entry_id: int,
+    current_user: User,
+    force_regenerate: bool = False,
+) -> JournalEntry:
+    """Analysis only (emotion/intensity/theme), no AIReply.
+    - Default: if entry already has analysis and not forced, return directly
+    - force_regenerate=True: re-analyze and overwrite
+    """
+    # Sync DB work runs in a worker thread; only the LLM await stays on the loop
+    def _load() -> Tuple[JournalEntry, Optional[str], Optional[Dict[str, Any]]]:
+        entry = get_owned_entry(db, entry_id, current_user)
+
+        has_analysis = bool(entry.emotion or entry.emotion_intensity or entry.primary_theme or entry.theme_scores)
+        if has_analysis and not force_regenerate:
+            return entry, None, None
+
+        # A forced re-analysis always goes to the LLM
+        local = None if force_regenerate else _classify_locally(entry.content)
+        companion = _get_companion_or_default(db, current_user)
+        return entry, build_prompt_for_entry(entry, companion, analysis_only=True), local
+
+    entry, prompt, local = await asyncio.to_thread(_load)
+    if prompt is None:
+        return entry
+
+    if local_classifier.accepts(local):
+        local_classifier.agreement.record_local()
+        result = local
+    else:
+        result = await call_llm_for_reply_emotion_and_theme(
+            prompt, bypass_cache=force_regenerate, call_type="analysis", user_id=entry.user_id
+        )
+        if local is not None:
+            local_classifier.agreement.record_comparison(local, result)
+
+    def _save() -> JournalEntry:
+        _apply_analysis_to_entry(
+            entry=entry,
+            emotion=result["emotion"],
+            intensity=result["intensity"],
+            theme_scores=result["theme_scores"],
+            primary_theme=result["primary_theme"],
+        )
+
+        db.commit()
+        db.refresh(entry)
+        return entry
+
+    return await asyncio.to_thread(_save)
+
+
+def _prepare_reply_generation(
+    db: Session,
+    entry: JournalEntry,
+    current_user: User,
+    force_regenerate: bool,
+    requested_at: datetime,
+) -> Tuple[Optional[int], Optional[AICompanion], Optional[str]]:
+    """Return (existing_reply_id, None, None) when a usable reply is stored,
+    otherwise (None, companion, prompt) for a new generation."""
+    # Another caller (or worker) may have stored a reply while we waited for the lock
+    db.refresh(entry)
+    existing = entry.ai_reply
+    if existing and (not force_regenerate or existing.created_at >= requested_at):
+        return existing.id, None, None
+
+    companion = _get_companion_or_default(db, current_user)
+    return None, companion, build_prompt_for_entry(entry, companion, analysis_only=False)
+
+
+def _load_generated_reply(db: Session, entry: JournalEntry, reply_id: int) -> AIReply:
+    """Load the reply produced by a (possibly shared) generation, with the entry refreshed."""
+    db.refresh(entry)
+    ai_reply = db.query(AIReply).filter(AIReply.id == reply_id).first()
+    if not ai_reply:
+        # A later forced generation replaced it: its reply is the current one
+        ai_reply = entry.ai_reply
+    if not ai_reply:
+        raise HTTPException(status_code=409, detail="AI reply was replaced, please retry.")
+    return ai_reply
+
+
+def _reply_flight_key(current_user: User, entry: JournalEntry) -> str:
+    # Shared by the JSON endpoint, the SSE endpoint and the queued reply job
+    return f"ai_reply:{current_user.id}:{entry.id}"
+
+
+async def generate_ai_reply_for_entry(
+    db: Session,
+    entry_id: int,
+    current_user: User,
+    force_regenerate: bool = False,
+) -> AIReply:
+    """Generate AI reply + analysis (emotion/intensity/theme).
+
+    Concurrent requests for the same entry share one generation (single-flight).
+    """
+    def _load() -> Tuple[JournalEntry, Optional[AIReply]]:
+        entry = get_owned_entry(db, entry_id, current_user)
+        return entry, entry.ai_reply
+
+    entry, existing = await asyncio.to_thread(_load)
+    if existing and not force_regenerate:
+        return existing
+
+    requested_at = datetime.now(timezone.utc)
+
+    async def _generate() -> int:
+        existing_id, companion, prompt = await asyncio.to_thread(
+            _prepare_reply_generation, db, entry, current_user, force_regenerate, requested_at
+        )
+        if existing_id is not None:
+            return existing_id
+
+        result = await call_llm_for_reply_emotion_and_theme(
+            prompt, bypass_cache=force_regenerate, user_id=entry.user_id
+        )
+
+        ai_reply = await asyncio.to_thread(_save_ai_reply, db, entry, current_user, companion, result)
+        return ai_reply.id
+
+    reply_id = await single_flight.do(_reply_flight_key(current_user, entry), _generate)
+    return await asyncio.to_thread(_load_generated_reply, db, entry, reply_id)
+
+
+# =====================================================
+# Streaming reply (SSE)
+# =====================================================
+
+class ReplyStreamParser:
+    """Incrementally pull the "reply" string value out of a streamed JSON completion.
+
+    feed() returns newly decoded reply text; escapes split across chunks are held
+    back until complete. Everything after the closing quote is ignored.
+    """
+
+    _KEY_RE = re.compile(r'"reply"\s*:\s*"')
+
+    def __init__(self):
+        self._buf = ""
+        self._pos: Optional[int] = None
+        self.done = False
+
+    def feed(self, chunk: str) -> str:
+        self._buf += chunk
+        if self.done:
+            return ""
+
+        if self._pos is None:
+            m = self._KEY_RE.search(self._buf)
+            if not m:
+                return ""
+            self._pos = m.end()
+
+        buf = self._buf
+        i = safe = self._pos
+        n = len(buf)
+        while i < n:
+            c = buf[i]
+            if c == "\\":
+                if i + 1 >= n:
+                    break
+                if buf[i + 1] == "u":
+                    if i + 6 > n:
+                        break
+                    try:
+                        code = int(buf[i + 2:i + 6], 16)
+                    except ValueError:
+                        code = 0
+                    # High surrogate: wait for the low half so the pair decodes together
+                    if 0xD800 <= code < 0xDC00:
+                        if i + 12 > n:
+                            break
+                        i += 12
+                    else:
+                        i += 6
+                else:
+                    i += 2
+                safe = i
+                continue
+            if c == '"':
+                self.done = True
+                break
+            i += 1
+            safe = i
+
+        segment = buf[self._pos:safe]
+        self._pos = safe
+        if not segment:
+            return ""
+        try:
+            return json.loads(f'"{segment}"', strict=False)
+        except Exception:
+            return segment
+
+
+async def stream_ai_reply_for_entry(
+    db: Session,
+    entry: JournalEntry,
+    current_user: User,
+    force_regenerate: bool = False,
+) -> AsyncIterator[Tuple[str, Any]]:
+    """Yield ("delta", text) while the reply is generated, then ("done", AIReply).
+
+    Emotion/theme fields are parsed and persisted once the stream completes.
+    The generation runs under the same single-flight key as
+    generate_ai_reply_for_entry: a stream that joins an in-flight generation
+    receives the finished reply as one delta instead of calling the LLM again.
+    """
+    existing = await asyncio.to_thread(lambda: entry.ai_reply)
+    if existing and not force_regenerate:
+        yield "delta", existing.content
+        yield "done", existing
+        return
+
+    requested_at = datetime.now(timezone.utc)
+    deltas: "asyncio.Queue[str]" = asyncio.Queue()
+
+    async def _generate() -> int:
+        existing_id, companion, prompt = await asyncio.to_thread(
+            _prepare_reply_generation, db, entry, current_user, force_regenerate, requested_at
+        )
+        if existing_id is not None:
+            return existing_id
+
+        parser = ReplyStreamParser()
+        parts: List[str] = []
+        streamed = False
+
+        async for chunk in stream_siliconflow(prompt, bypass_cache=force_regenerate, user_id=entry.user_id):
+            parts.append(chunk)
+            text = parser.feed(chunk)
+            if text:
+                streamed = True
+                deltas.put_nowait(text)
+
+        result = _parse_llm_result("".join(parts))
+
+        # Model ignored the JSON format: nothing was streamed, send the parsed reply now
+        if not streamed and result["reply"]:
+            deltas.put_nowait(result["reply"])
+
+        ai_reply = await asyncio.to_thread(_save_ai_reply, db, entry, current_user, companion, result)
+        return ai_reply.id
+
+    flight = asyncio.ensure_future(single_flight.do(_reply_flight_key(current_user, entry), _generate))
+    next_delta: Optional[asyncio.Future] = None
+    sent_any = False
+    try:
+        while True:
+            next_delta = asyncio.ensure_future(deltas.get())
+            done, _ = await asyncio.wait({flight, next_delta}, return_when=asyncio.FIRST_COMPLETED)
+            if next_delta not in done:
+                break
+            sent_any = True
+            yield "delta", next_delta.result()
+
+        next_delta.cancel()
+        while not deltas.empty():
+            sent_any = True
+            yield "delta", deltas.get_nowait()
+
+        reply_id = flight.result()
+    finally:
+        # Client went away: stop our generation (a waiting follower takes over)
+        if next_delta is not None and not next_delta.done():
+            next_delta.cancel()
+        if not flight.done():
+            flight.cancel()
+
+    ai_reply = await asyncio.to_thread(_load_generated_reply, db, entry, reply_id)
+
+    # Joined someone else's generation (or reused a stored reply): send it whole
+    if not sent_any:
+        yield "delta", ai_reply.content
+
+    yield "done", ai_reply
+
+
+# =====================================================
+# Batch analysis (analysis-only, many entries per LLM call)
+# =====================================================
+
+# Max entries packed into one request, and a soft cap on total journal text
+BATCH_ANALYSIS_SIZE = 10
+BATCH_ANALYSIS_MAX_CHARS = 12000
+
+# Per-entry outcome of analyze_entries_batch
+BATCH_OK = "ok"
+BATCH_FAILED = "failed"        # LLM / validation failure, worth retrying
+BATCH_NOT_FOUND = "not_found"  # deleted or not owned by the user, never retried
+
+
+def build_batch_analysis_prompt(entries: List[JournalEntry], companion: AICompanion) -> str:
+    """Pack several entries into one analysis-only prompt.
+
+    The instruction block is sent once; the model returns a JSON array with one
+    object per entry, tagged by the entry's position ("index") in the batch.
+    """
+    persona = companion.persona_prompt or (
+        f"You are {companion.name}, a journaling companion. "
+        "You do not diagnose or give medical advice."
+    )
+
+    blocks = []
+    for i, entry in enumerate(entries):
+        blocks.append(f"<<<ENTRY {i}>>>\n{entry.content}\n<<<END ENTRY {i}>>>")
+    entries_text = "\n\n".join(blocks)
+
+    prompt = f"""{persona}
+
+You are analyzing {len(entries)} private journal entries. Do NOT write replies.
+
+For EACH entry:
+1) Estimate the emotional state using a fixed label set and intensity.
+2) Classify the entry into FOUR high-level life themes and provide a distribution.
+
+Emotion classification:
+- emotion must be ONE of: "joy", "calm", "tired", "anxiety", "sadness", "anger".
+- intensity must be an integer: 1 = low, 2 = medium, 3 = high.
+- If you truly cannot decide the emotion, set emotion to null.
+
+Theme classification:
+- theme_scores is a JSON object with exactly these keys: "work", "hobbies", "social", "other"
+- Each value is a number between 0 and 1; the sum should be approximately 1.0.
+- If unsure, put more weight into "other".
+- primary_theme is one of: "work" | "hobbies" | "social" | "other".
+
+OUTPUT FORMAT (VERY IMPORTANT):
+Return ONLY a JSON array with exactly {len(entries)} objects, one per entry, in this structure:
+
+[
+  {{
+    "index": 0,
+    "emotion": "joy | calm | tired | anxiety | sadness | anger | null",
+    "intensity": 1,
+    "theme_scores": {{"work": 0.0, "hobbies": 0.0, "social": 0.0, "other": 1.0}},
+    "primary_theme": "work | hobbies | social | other | null"
+  }}
+]
+
+"index" must match the number in the entry's <<<ENTRY n>>> marker.
+Do not write any other text outside this JSON array.
+
+The journal entries are:
+
+{entries_text}"""
+
+    return prompt
+
+
+def _extract_json_array(text: str) -> List[Any]:
+    """Extract the result array from a batch completion ([] on failure)."""
+    return extract_json_array(text) or []
+
+
+def _clean_batch_item(item: Any) -> Optional[Dict[str, Any]]:
+    """Validate one batch result; None means the item must be re-analyzed alone."""
+    if not isinstance(item, dict):
+        return None
+
+    emotion = _clean_emotion(item.get("emotion"))
+    intensity = _clean_intensity(item.get("intensity"))
+    theme_scores, inferred_primary = _clean_and_normalize_theme_scores(item.get("theme_scores"))
+    primary_theme = _clean_primary_theme(item.get("primary_theme")) or inferred_primary
+
+    if theme_scores is None or (emotion is None and intensity is None):
+        return None
+
+    return {
+        "emotion": emotion,
+        "intensity": intensity,
+        "theme_scores": theme_scores,
+        "primary_theme": primary_theme,
+    }
+
+
+def _chunk_for_batch(entries: List[JournalEntry], batch_size: int) -> List[List[JournalEntry]]:
+    chunks: List[List[JournalEntry]] = []
+    current: List[JournalEntry] = []
+    current_chars = 0
+
+    for entry in entries:
+        size = len(entry.content or "")
+        if current and (len(current) >= batch_size or current_chars + size > BATCH_ANALYSIS_MAX_CHARS):
+            chunks.append(current)
+            current, current_chars = [], 0
+        current.append(entry)
+        current_chars += size
+
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+async def analyze_entries_batch(
+    db: Session,
+    entry_ids: List[int],
+    current_user: User,
+    force_regenerate: bool = False,
+    batch_size: int = BATCH_ANALYSIS_SIZE,
+) -> Dict[int, str]:
+    """Analysis only for many entries of one user, several entries per LLM call.
+
+    Items that are missing or fail validation fall back to analyze_entry_for_entry.
+    Returns {entry_id: BATCH_OK | BATCH_FAILED | BATCH_NOT_FOUND}.
+    """
+    entries: List[JournalEntry] = await asyncio.to_thread(
+        lambda: db.query(JournalEntry)
+        .filter(
+            JournalEntry.id.in_(entry_ids),
+            JournalEntry.user_id == current_user.id,
+            JournalEntry.deleted == False,
+        )
+        .order_by(JournalEntry.id.asc())
+        .all()
+    )
+
+    # Ids the query did not return are deleted or belong to another user
+    results: Dict[int, str] = {entry_id: BATCH_NOT_FOUND for entry_id in entry_ids}
+
+    pending: List[JournalEntry] = []
+    for entry in entries:
+        has_analysis = bool(entry.emotion or entry.emotion_intensity or entry.primary_theme or entry.theme_scores)
+        if has_analysis and not force_regenerate:
+            results[entry.id] = BATCH_OK
+        else:
+            results[entry.id] = BATCH_FAILED
+            pending.append(entry)
+
+    if not pending:
+        return results
+    # Read before the commits below expire the rows
+    user_id = pending[0].user_id
+
+    # Confident local results skip the LLM; the rest keep theirs for shadow comparison
+    local_results: Dict[int, Dict[str, Any]] = {}
+    applied_locally = False
+    if not force_regenerate and local_classifier.enabled():
+        remaining: List[JournalEntry] = []
+        for entry in pending:
+            local = _classify_locally(entry.content)
+            if local_classifier.accepts(local):
+                local_classifier.agreement.record_local()
+                _apply_analysis_to_entry(
+                    entry=entry,
+                    emotion=local["emotion"],
+                    intensity=local["intensity"],
+                    theme_scores=local["theme_scores"],
+                    primary_theme=local["primary_theme"],
+                )
+                results[entry.id] = BATCH_OK
+                applied_locally = True
+                continue
+            if local is not None:
+                local_results[entry.id] = local
+            remaining.append(entry)
+        pending = remaining
+
+    companion = await asyncio.to_thread(_get_companion_or_default, db, current_user)
+    fallback_ids: List[int] = []
+
+    # Build every prompt (and read ids) up front: commits below expire the loaded rows
+    prepared = [
+        (chunk, [e.id for e in chunk], build_batch_analysis_prompt(chunk, companion) if len(chunk) > 1 else None)
+        for chunk in _chunk_for_batch(pending, batch_size)
+    ]
+    if applied_locally:
+        await asyncio.to_thread(db.commit)
+
+    for chunk, chunk_ids, prompt in prepared:
+        if prompt is None:
+            fallback_ids.extend(chunk_ids)
+            continue
+
+        try:
+            raw = await call_siliconflow(
+                prompt, bypass_cache=force_regenerate, call_type="analysis", user_id=user_id
+            )
+        except Exception:
+            fallback_ids.extend(chunk_ids)
+            continue
+
+        items: Dict[int, Any] = {}
+        for pos, item in enumerate(_extract_json_array(raw)):
+            idx = item.get("index", pos) if isinstance(item, dict) else pos
+            if isinstance(idx, int) and 0 <= idx < len(chunk) and idx not in items:
+                items[idx] = item
+
+        for idx, (entry, entry_id) in enumerate(zip(chunk, chunk_ids)):
+            cleaned = _clean_batch_item(items.get(idx))
+            if cleaned is None:
+                fallback_ids.append(entry_id)
+                continue
+            _apply_analysis_to_entry(entry=entry, **cleaned)
+            results[entry_id] = BATCH_OK
+            if entry_id in local_results:
+                local_classifier.agreement.record_comparison(local_results[entry_id], cleaned)
+
+        await asyncio.to_thread(db.commit)
+
+    for entry_id in fallback_ids:
+        try:
+            await analyze_entry_for_entry(
+                db=db,
+                entry_id=entry_id,
+                current_user=current_user,
+                force_regenerate=force_regenerate,
+            )
+            results[entry_id] = BATCH_OK
+        except HTTPException as e:
+            await asyncio.to_thread(db.rollback)
+            if e.status_code == 404:
+                results[entry_id] = BATCH_NOT_FOUND
+
+    return results
@@ -13,7 +13,8 @@ def build_summary_prompt(
 ):
     """
     companion: dict-like object (may contain 'name' and 'persona_prompt')
-    range_type: "week" or "month"
+    range_type: "week", "month", "quarter" or "year" (current period), or a
+                description of a past period / custom span
     stats: dict with entries/active_days
     emotion_trend: list of {date, valence}
     top_emotions: dict {emotion: count}
@@ -57,13 +58,14 @@ Now write the message:
     return prompt
 
 
-def generate_summary_message(
+async def generate_summary_message(
     companion: Optional[Dict[str, Any]],
     range_type: str,
     stats: Dict[str, Any],
     emotion_trend: List[Dict[str, Any]],
     top_emotions: Dict[str, int],
+    user_id: Optional[int] = None,
 ) -> str:
     prompt = build_summary_prompt(companion, range_type, stats, emotion_trend, top_emotions)
-    raw = call_siliconflow(prompt)
+    raw = await call_siliconflow(prompt, call_type="summary", user_id=user_id)
     return raw.strip()
@@ -0,0 +1,345 @@
+# backend/services/analysis_queue.py
+
+from __future__ import annotations
+
+import asyncio
+import os
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional, Set
+
+from fastapi import HTTPException
+from sqlalchemy import or_
+from sqlalchemy.orm import Session
+
+from database import SessionLocal
+from models import AnalysisJob, JournalEntry, User
+from .ai_reply_service import (
+    BATCH_NOT_FOUND,
+    BATCH_OK,
+    analyze_entry_for_entry,
+    analyze_entries_batch,
+    generate_ai_reply_for_entry,
+)
+
+
+# Queue mode:
+# - "worker": jobs are picked up by the separate worker process (scripts/analysis_worker.py)
+# - "local":  jobs run in-process right after the response is sent (dev / tests)
+ANALYSIS_QUEUE_MODE = os.getenv("ANALYSIS_QUEUE_MODE", "worker")
+
+MAX_ATTEMPTS = int(os.getenv("ANALYSIS_MAX_ATTEMPTS", "3"))
+RETRY_BACKOFF_SECONDS = int(os.getenv("ANALYSIS_RETRY_BACKOFF_SECONDS", "30"))
+
+# A running job whose worker died is picked up again after this lease expires
+RUNNING_LEASE_SECONDS = int(os.getenv("ANALYSIS_RUNNING_LEASE_SECONDS", "300"))
+
+JOB_TYPE_REPLY = "reply"
+JOB_TYPE_ANALYSIS = "analysis"
+
+
+def is_local_mode() -> bool:
+    return ANALYSIS_QUEUE_MODE == "local"
+
+
+def enqueue_entry_analysis(db: Session, entry: JournalEntry, need_ai_reply: bool) -> AnalysisJob:
+    """Queue analysis (and optionally an AI reply) for an entry.
+
+    The caller owns the transaction: the job row is committed together with the entry.
+    """
+    entry.analysis_status = "pending"
+    job = AnalysisJob(
+        entry_id=entry.id,
+        user_id=entry.user_id,
+        job_type=JOB_TYPE_REPLY if need_ai_reply else JOB_TYPE_ANALYSIS,
+        status="pending",
+    )
+    db.add(job)
+    db.flush()
+    return job
+
+
+def get_latest_job(db: Session, entry_id: int) -> Optional[AnalysisJob]:
+    return (
+        db.query(AnalysisJob)
+        .filter(AnalysisJob.entry_id == entry_id)
+        .order_by(AnalysisJob.id.desc())
+        .first()
+    )
+
+
+def claim_jobs(db: Session, limit: int, job_type: Optional[str] = None) -> List[AnalysisJob]:
+    """Atomically claim up to `limit` runnable jobs (safe with many workers).
+
+    Uses FOR UPDATE SKIP LOCKED so concurrent workers never claim the same row.
+    Running jobs whose lease expired are reclaimed only while attempts remain;
+    the rest are marked failed so a job that kills its worker is not retried forever.
+    """
+    now = datetime.now(timezone.utc)
+    lease_cutoff = now - timedelta(seconds=RUNNING_LEASE_SECONDS)
+
+    _fail_exhausted_leases(db, lease_cutoff)
+
+    query = db.query(AnalysisJob).filter(
+        or_(
+            (AnalysisJob.status == "pending") & (AnalysisJob.run_after <= now),
+            (AnalysisJob.status == "running")
+            & (AnalysisJob.updated_at < lease_cutoff)
+            & (AnalysisJob.attempts < MAX_ATTEMPTS),
+        )
+    )
+    if job_type:
+        query = query.filter(AnalysisJob.job_type == job_type)
+
+    jobs = (
+        query.order_by(AnalysisJob.run_after.asc(), AnalysisJob.id.asc())
+        .limit(limit)
+        .with_for_update(skip_locked=True)
+        .all()
+    )
+
+    for job in jobs:
+        job.status = "running"
+        job.attempts = (job.attempts or 0) + 1
+        job.updated_at = now
+
+    db.commit()
+    return jobs
+
+
+def _fail_exhausted_leases(db: Session, lease_cutoff: datetime) -> None:
+    """Fail running jobs whose lease expired after their last allowed attempt."""
+    stale = (
+        db.query(AnalysisJob)
+        .filter(
+            AnalysisJob.status == "running",
+            AnalysisJob.updated_at < lease_cutoff,
+            AnalysisJob.attempts >= MAX_ATTEMPTS,
+        )
+        .with_for_update(skip_locked=True)
+        .all()
+    )
+    for job in stale:
+        _mark_failed(db, job, job.last_error or "Lease expired: worker stopped while running the job", retry=False)
+
+
+def _mark_failed(db: Session, job: AnalysisJob, error: str, retry: bool) -> None:
+    job.last_error = error[:2000]
+    if retry and job.attempts < MAX_ATTEMPTS:
+        # Exponential backoff: 30s, 60s, 120s, ...
+        delay = RETRY_BACKOFF_SECONDS * (2 ** max(job.attempts - 1, 0))
+        job.status = "pending"
+        job.run_after = datetime.now(timezone.utc) + timedelta(seconds=delay)
+        return
+
+    job.status = "failed"
+    entry = db.query(JournalEntry).filter(JournalEntry.id == job.entry_id).first()
+    if entry and entry.analysis_status == "pending":
+        entry.analysis_status = "failed"
+
+
+def _record_failure(db: Session, jobs: List[AnalysisJob], error: str, retry: bool) -> None:
+    db.rollback()
+    for job in jobs:
+        _mark_failed(db, job, error, retry=retry)
+    db.commit()
+
+
+def _record_done(db: Session, job: AnalysisJob) -> None:
+    job.status = "done"
+    job.last_error = None
+    db.query(JournalEntry).filter(
+        JournalEntry.id == job.entry_id,
+        JournalEntry.analysis_status != "done",
+    ).update({"analysis_status": "done"}, synchronize_session=False)
+
+
+# DB work below runs in worker threads so concurrent jobs do not block the loop
+async def run_job(db: Session, job: AnalysisJob) -> None:
+    """Run one claimed job and record its outcome."""
+    user = await asyncio.to_thread(lambda: db.query(User).filter(User.id == job.user_id).first())
+
+    try:
+        if user is None:
+            raise HTTPException(status_code=404, detail="User not found")
+
+        if job.job_type == JOB_TYPE_REPLY:
+            await generate_ai_reply_for_entry(
+                db=db,
+                entry_id=job.entry_id,
+                current_user=user,
+                force_regenerate=False,
+            )
+        else:
+            await analyze_entry_for_entry(
+                db=db,
+                entry_id=job.entry_id,
+                current_user=user,
+                force_regenerate=False,
+            )
+    except HTTPException as e:
+        # 404 (entry deleted meanwhile) will not succeed on retry
+        await asyncio.to_thread(
+            _record_failure, db, [job], f"{e.status_code}: {e.detail}", e.status_code >= 500
+        )
+        return
+    except Exception as e:
+        await asyncio.to_thread(_record_failure, db, [job], f"{type(e).__name__}: {e}", True)
+        return
+
+    def _finish() -> None:
+        _record_done(db, job)
+        db.commit()
+
+    await asyncio.to_thread(_finish)
+
+
+async def run_analysis_jobs_batch(db: Session, jobs: List[AnalysisJob]) -> None:
+    """Run several claimed analysis-only jobs of ONE user through the batch analyzer."""
+    if not jobs:
+        return
+
+    user_id, entry_ids = jobs[0].user_id, [job.entry_id for job in jobs]
+    user = await asyncio.to_thread(lambda: db.query(User).filter(User.id == user_id).first())
+    if user is None:
+        await asyncio.to_thread(_record_failure, db, jobs, "404: User not found", False)
+        return
+
+    try:
+        results = await analyze_entries_batch(
+            db=db,
+            entry_ids=entry_ids,
+            current_user=user,
+            force_regenerate=False,
+        )
+    except Exception as e:
+        await asyncio.to_thread(_record_failure, db, jobs, f"{type(e).__name__}: {e}", True)
+        return
+
+    def _finish() -> None:
+        for job in jobs:
+            outcome = results.get(job.entry_id)
+            if outcome == BATCH_OK:
+                _record_done(db, job)
+            elif outcome == BATCH_NOT_FOUND:
+                # Same as run_job: a deleted entry will not succeed on retry
+                _mark_failed(db, job, "404: Journal entry not found", retry=False)
+            else:
+                _mark_failed(db, job, "Batch analysis failed", retry=True)
+        db.commit()
+
+    await asyncio.to_thread(_finish)
+
+
+def _claim_job_by_id(db: Session, job_id: int) -> Optional[AnalysisJob]:
+    job = (
+        db.query(AnalysisJob)
+        .filter(AnalysisJob.id == job_id, AnalysisJob.status == "pending")
+        .with_for_update(skip_locked=True)
+        .first()
+    )
+    if not job:
+        db.rollback()
+        return None
+
+    job.status = "running"
+    job.attempts = (job.attempts or 0) + 1
+    db.commit()
+    return job
+
+
+def _pending_retry_at(db: Session, job_id: int) -> Optional[datetime]:
+    db.expire_all()
+    job = db.query(AnalysisJob).filter(AnalysisJob.id == job_id).first()
+    if job is None or job.status != "pending":
+        return None
+    return job.run_after
+
+
+async def process_job_by_id(job_id: int) -> None:
+    """Claim and run a single job in its own session (used by local mode).
+
+    There is no worker to pick up retries in local mode, so a job rescheduled
+    by _mark_failed is retried here after its backoff, until it is done or failed.
+    """
+    db = SessionLocal()
+    try:
+        while True:
+            job = await asyncio.to_thread(_claim_job_by_id, db, job_id)
+            if job is None:
+                return
+
+            await run_job(db, job)
+
+            retry_at = await asyncio.to_thread(_pending_retry_at, db, job_id)
+            if retry_at is None:
+                return
+            await asyncio.sleep(max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds()))
+    finally:
+        db.close()
+
+
+def _claim_groups(limit: int) -> List[List[int]]:
+    """Claim up to `limit` jobs and group them: one group per reply job,
+    one group per user for analysis-only jobs."""
+    db = SessionLocal()
+    try:
+        jobs = claim_jobs(db, limit)
+        groups: List[List[int]] = []
+        analysis_by_user: Dict[int, List[int]] = {}
+        for job in jobs:
+            if job.job_type == JOB_TYPE_REPLY:
+                groups.append([job.id])
+            else:
+                analysis_by_user.setdefault(job.user_id, []).append(job.id)
+        groups.extend(analysis_by_user.values())
+        return groups
+    finally:
+        db.close()
+
+
+async def _run_group(job_ids: List[int]) -> None:
+    db = SessionLocal()
+    try:
+        jobs = await asyncio.to_thread(
+            lambda: db.query(AnalysisJob)
+            .filter(AnalysisJob.id.in_(job_ids))
+            .order_by(AnalysisJob.id.asc())
+            .all()
+        )
+        if len(jobs) == 1 and jobs[0].job_type == JOB_TYPE_REPLY:
+            await run_job(db, jobs[0])
+        elif jobs:
+            await run_analysis_jobs_batch(db, jobs)
+    except Exception as e:
+        # The lease expires and the jobs are reclaimed (bounded by MAX_ATTEMPTS)
+        print(f"Analysis job group {job_ids} crashed: {type(e).__name__}: {e}")
+    finally:
+        db.close()
+
+
+async def run_worker(batch_size: int = 20, poll_interval: float = 1.0, concurrency: int = 20) -> None:
+    """Worker loop: keep up to `concurrency` job groups in flight.
+
+    New jobs are claimed as soon as a slot frees up, so one slow reply job does
+    not hold back the rest of the queue. Reply jobs run one by one; analysis-only
+    jobs of the same user are packed into batch LLM calls.
+    """
+    in_flight: Set[asyncio.Task] = set()
+
+    while True:
+        free = concurrency - len(in_flight)
+        groups = await asyncio.to_thread(_claim_groups, min(batch_size, free)) if free > 0 else []
+
+        for job_ids in groups:
+            task = asyncio.create_task(_run_group(job_ids))
+            in_flight.add(task)
+            task.add_done_callback(in_flight.discard)
+
+        # More jobs may be runnable right away while slots remain
+        if groups and len(in_flight) < concurrency:
+            continue
+
+        if in_flight:
+            await asyncio.wait(in_flight, timeout=poll_interval, return_when=asyncio.FIRST_COMPLETED)
+        else:
+            await asyncio.sleep(poll_interval)
@@ -1,41 +1,30 @@
-from datetime import date, datetime, timedelta
-from sqlalchemy import func
+import base64
+from datetime import date, timedelta
+from typing import Optional
 from sqlalchemy.orm import Session
-from models import JournalEntry, User
+from models import User
+from .rollup_service import daily_rollups
+
+
+PAW_LEVELS = ["none", "light", "dark"]
+
+
+def paw_level(count: int) -> str:
+    """none: no entry, light: one entry, dark: two or more."""
+    return PAW_LEVELS[min(max(count, 0), 2)]
 
 
 def _counts_by_day(db: Session, current_user: User, start: date, end: date) -> dict[str, int]:
-    start_dt = datetime.combine(start, datetime.min.time())
-    end_dt = datetime.combine(end, datetime.min.time())
-
-    rows = (
-        db.query(func.date(JournalEntry.created_at).label("day"), func.count(JournalEntry.id))
-        .filter(
-            JournalEntry.user_id == current_user.id,
-            JournalEntry.deleted == False,
-            JournalEntry.created_at >= start_dt,
-            JournalEntry.created_at < end_dt,
-        )
-        .group_by("day")
-        .all()
-    )
-
-    counts: dict[str, int] = {}
-    for day_val, cnt in rows:
-        if isinstance(day_val, date):
-            key = day_val.isoformat()
-        else:
-            key = str(day_val)
-        counts[key] = int(cnt or 0)
-
-    return counts
+    """Entries per day in [start, end), from the daily rollups (one small row per active day)."""
+    return {r.day.isoformat(): r.entry_count for r in daily_rollups(db, current_user.id, start, end)}
 
 
 # ============================================================
 # WEEK CALENDAR (Mon → Sun)
 # ============================================================
-def build_week_calendar(db: Session, current_user: User):
-    today = date.today()
+def build_week_calendar(db: Session, current_user: User, day: Optional[date] = None):
+    """The week (Mon → Sun) containing day (default: today)."""
+    today = day or date.today()
     monday = today - timedelta(days=today.weekday())  # Monday
     days = [monday + timedelta(days=i) for i in range(7)]
     counts = _counts_by_day(db, current_user, monday, monday + timedelta(days=7))
@@ -43,18 +32,9 @@ def build_week_calendar(db: Session, current_user: User):
     result = []
 
     for d in days:
-        count = counts.get(d.isoformat(), 0)
-
-        if count == 0:
-            paw = "none"
-        elif count == 1:
-            paw = "light"
-        else:
-            paw = "dark"
-
         result.append({
             "date": d.isoformat(),
-            "paw": paw
+            "paw": paw_level(counts.get(d.isoformat(), 0))
         })
 
     return {"week": result}
@@ -94,17 +74,7 @@ def build_month_calendar(db: Session, current_user: User, month_str: str):
     # --- actual days ---
     for i in range(1, total_days + 1):
         d = date(year, mon, i)
-
-        count = counts.get(d.isoformat(), 0)
-
-        if count == 0:
-            paw = "none"
-        elif count == 1:
-            paw = "light"
-        else:
-            paw = "dark"
-
-        cells.append(paw)
+        cells.append(paw_level(counts.get(d.isoformat(), 0)))
 
     # --- trailing empty cells until 6 rows ---
     while len(cells) < 42:
@@ -114,3 +84,34 @@ def build_month_calendar(db: Session, current_user: User, month_str: str):
     month_grid = [cells[i:i+7] for i in range(0, 42, 7)]
 
     return {"month": month_grid}
+
+
+
+# ============================================================
+# YEAR HEATMAP (one value per day, compact)
+# ============================================================
+def build_year_calendar(db: Session, current_user: User, year: int):
+    """
+    Every day of the year from one rollup query, encoded compactly.
+    Day i (0-based) is start + i days:
+    - counts: base64 of one byte per day (entry count, capped at 255)
+    - paw: one digit per day, an index into paw_levels
+    """
+    first_day = date(year, 1, 1)
+    next_year = date(year + 1, 1, 1)
+    total_days = (next_year - first_day).days
+
+    counts = [0] * total_days
+    for r in daily_rollups(db, current_user.id, first_day, next_year):
+        counts[(r.day - first_day).days] = max(r.entry_count, 0)
+
+    return {
+        "year": year,
+        "start": first_day.isoformat(),
+        "days": total_days,
+        "counts": base64.b64encode(bytes(min(c, 255) for c in counts)).decode("ascii"),
+        "paw": "".join(str(min(c, 2)) for c in counts),
+        "paw_levels": PAW_LEVELS,
+        "total_entries": sum(counts),
+        "active_days": sum(1 for c in counts if c > 0),
+    }
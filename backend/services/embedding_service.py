@@ -0,0 +1,177 @@
+# backend/services/embedding_service.py
+#
+# Per-user similarity index over entry embeddings. Embeddings are computed
+# offline (core/embeddings.py) for entries that do not have one yet and
+# persisted in entry_embeddings; each process keeps the user's vectors as one
+# int8 matrix and scores all of them with a single matrix-vector product.
+
+from __future__ import annotations
+
+import os
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import date, datetime, timezone
+from typing import List, Optional, Tuple
+
+import numpy as np
+from sqlalchemy import func, or_
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+from core.embeddings import EMBEDDING_VERSION, cosine_scores, embed, from_bytes, to_bytes
+from models import EntryEmbedding, JournalEntry
+
+# Users whose index is kept in memory (per process)
+EMBEDDING_CACHE_USERS = int(os.getenv("EMBEDDING_CACHE_USERS", "256"))
+
+# Entries embedded per round trip when filling in missing embeddings
+_SYNC_BATCH = 500
+
+
+@dataclass
+class UserIndex:
+    stamp: Tuple[int, Optional[int]]   # (live entry count, max entry id) it was built from
+    ids: np.ndarray                    # int64 entry ids
+    days: np.ndarray                   # int64 UTC day ordinal of created_at
+    matrix: np.ndarray                 # int8 (n, EMBEDDING_DIM)
+    norms: np.ndarray                  # float32 row norms
+
+
+_cache: "OrderedDict[int, UserIndex]" = OrderedDict()
+_cache_lock = threading.Lock()
+
+
+# -----------------------------
+# Build / sync
+# -----------------------------
+def _live_stamp(db: Session, user_id: int) -> Tuple[int, Optional[int]]:
+    count, max_id = (
+        db.query(func.count(JournalEntry.id), func.max(JournalEntry.id))
+        .filter(JournalEntry.user_id == user_id, JournalEntry.deleted == False)
+        .one()
+    )
+    return count, max_id
+
+
+def sync_user_embeddings(db: Session, user_id: int) -> int:
+    """Embed the user's live entries that have no (current-version) embedding; returns how many."""
+    written = 0
+    while True:
+        missing = (
+            db.query(JournalEntry.id, JournalEntry.content)
+            .outerjoin(EntryEmbedding, EntryEmbedding.entry_id == JournalEntry.id)
+            .filter(
+                JournalEntry.user_id == user_id,
+                JournalEntry.deleted == False,
+                or_(EntryEmbedding.entry_id.is_(None), EntryEmbedding.version != EMBEDDING_VERSION),
+            )
+            .order_by(JournalEntry.id)
+            .limit(_SYNC_BATCH)
+            .all()
+        )
+        if not missing:
+            return written
+
+        stmt = insert(EntryEmbedding).values([
+            {"entry_id": entry_id, "user_id": user_id, "version": EMBEDDING_VERSION, "vector": to_bytes(embed(content))}
+            for entry_id, content in missing
+        ])
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["entry_id"],
+            set_={"version": stmt.excluded.version, "vector": stmt.excluded.vector},
+        )
+        db.execute(stmt)
+        db.commit()
+        written += len(missing)
+
+
+def _build_index(db: Session, user_id: int, stamp: Tuple[int, Optional[int]]) -> UserIndex:
+    sync_user_embeddings(db, user_id)
+    rows = (
+        db.query(EntryEmbedding.entry_id, JournalEntry.created_at, EntryEmbedding.vector)
+        .join(JournalEntry, JournalEntry.id == EntryEmbedding.entry_id)
+        .filter(JournalEntry.user_id == user_id, JournalEntry.deleted == False)
+        .order_by(EntryEmbedding.entry_id)
+        .all()
+    )
+
+    if rows:
+        matrix = np.stack([from_bytes(r.vector) for r in rows])
+    else:
+        matrix = np.zeros((0, 0), dtype=np.int8)
+    return UserIndex(
+        stamp=stamp,
+        ids=np.fromiter((r.entry_id for r in rows), dtype=np.int64, count=len(rows)),
+        days=np.fromiter((_utc_day(r.created_at) for r in rows), dtype=np.int64, count=len(rows)),
+        matrix=matrix,
+        norms=np.linalg.norm(matrix.astype(np.float32), axis=1) if rows else np.zeros(0, dtype=np.float32),
+    )
+
+
+def _utc_day(created_at: datetime) -> int:
+    if created_at.tzinfo is not None:
+        created_at = created_at.astimezone(timezone.utc)
+    return created_at.date().toordinal()
+
+
+def get_user_index(db: Session, user_id: int) -> UserIndex:
+    """The user's index; rebuilt when entries were added or deleted since it was cached."""
+    stamp = _live_stamp(db, user_id)
+    with _cache_lock:
+        index = _cache.get(user_id)
+        if index is not None and index.stamp == stamp:
+            _cache.move_to_end(user_id)
+            return index
+
+    index = _build_index(db, user_id, stamp)
+    with _cache_lock:
+        _cache[user_id] = index
+        _cache.move_to_end(user_id)
+        while len(_cache) > EMBEDDING_CACHE_USERS:
+            _cache.popitem(last=False)
+    return index
+
+
+# -----------------------------
+# Queries
+# -----------------------------
+def _top(index: UserIndex, query: np.ndarray, mask: np.ndarray, limit: int, min_score: float) -> List[Tuple[int, float]]:
+    scores = cosine_scores(index.matrix, index.norms, query)
+    scores = np.where(mask, scores, -np.inf)
+    candidates = np.flatnonzero(scores >= min_score)
+    if len(candidates) > limit:
+        candidates = candidates[np.argpartition(-scores[candidates], limit - 1)[:limit]]
+    best = candidates[np.argsort(-scores[candidates], kind="stable")]
+    return [(int(index.ids[i]), float(scores[i])) for i in best]
+
+
+def similar_entries(
+    db: Session,
+    user_id: int,
+    entry_id: int,
+    limit: int = 5,
+    min_score: float = 0.05,
+) -> List[Tuple[int, float]]:
+    """[(entry_id, cosine)] of the user's entries most similar to entry_id, best first."""
+    index = get_user_index(db, user_id)
+    pos = np.searchsorted(index.ids, entry_id)
+    if pos >= len(index.ids) or index.ids[pos] != entry_id:
+        return []
+    return _top(index, index.matrix[pos], index.ids != entry_id, limit, min_score)
+
+
+def most_similar_before(
+    db: Session,
+    user_id: int,
+    entry_id: int,
+    before: date,
+    min_score: float,
+) -> Optional[Tuple[int, float]]:
+    """The entry written before `before` (UTC day) that is most similar to entry_id."""
+    index = get_user_index(db, user_id)
+    pos = np.searchsorted(index.ids, entry_id)
+    if pos >= len(index.ids) or index.ids[pos] != entry_id:
+        return None
+    best = _top(index, index.matrix[pos], index.days < before.toordinal(), 1, min_score)
+    return best[0] if best else None
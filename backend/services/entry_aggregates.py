@@ -0,0 +1,248 @@
+# backend/services/entry_aggregates.py
+#
+# Rollup columns for many entries at once, with NumPy. Each entry is one slot
+# in a few flat arrays (day, emotion code, intensity code, words, chars) plus
+# a row of the (n, 4) theme matrix. Valence and pleasure come from lookup
+# tables filled by the per-entry functions. Theme rows are normalized exactly
+# like normalize_theme_scores(), and per-day sums are accumulated in entry
+# order. The result is bit-identical to entry_contribution() applied entry by
+# entry. Used to check the rollups against the entries over long ranges
+# (scripts/rebuild_rollups.py --verify).
+
+from __future__ import annotations
+
+import json
+import math
+from dataclasses import dataclass
+from datetime import date
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+from sqlalchemy import Integer, case, cast, func, literal_column, select
+from sqlalchemy.orm import Session
+
+from models import JournalEntry, UserDailyRollup
+from models.entry import PLEASURE_INTENSITY_WEIGHT, pleasure_score
+from .entry_metrics import (
+    EMOTIONS,
+    INTENSITY_WEIGHT,
+    THEME_KEYS,
+    coerce_float,
+    entry_valence,
+    theme_value_expr,
+    utc_day_expr,
+    word_count,
+    word_count_expr,
+)
+from .rollup_service import EMOTION_COLUMNS, SUM_COLUMNS, THEME_COLUMNS, rollup_day
+
+# Code of an entry without a (known) emotion / intensity
+NO_EMOTION = len(EMOTIONS)
+NO_INTENSITY = 0
+INTENSITIES = sorted(set(INTENSITY_WEIGHT) | set(PLEASURE_INTENSITY_WEIGHT))
+
+_EMOTION_CODES = {e: i for i, e in enumerate(EMOTIONS)}
+_INTENSITY_CODES = {v: i + 1 for i, v in enumerate(INTENSITIES)}
+
+# [emotion code, intensity code] -> per-entry score
+_EMOTION_VALUES = [*EMOTIONS, None]
+_INTENSITY_VALUES = [None, *INTENSITIES]
+VALENCE_TABLE = np.array([[entry_valence(e, i) for i in _INTENSITY_VALUES] for e in _EMOTION_VALUES])
+PLEASURE_TABLE = np.array([[float(pleasure_score(e, i)) for i in _INTENSITY_VALUES] for e in _EMOTION_VALUES])
+
+_OTHER = THEME_KEYS.index("other")
+
+
+@dataclass
+class EntryArrays:
+    days: np.ndarray          # int64 date ordinal of the rollup (UTC) day
+    emotions: np.ndarray      # int64 index into EMOTIONS, NO_EMOTION if none/unknown
+    intensities: np.ndarray   # int64 1-based index into INTENSITIES, NO_INTENSITY if none/unknown
+    words: np.ndarray         # int64
+    chars: np.ndarray         # int64
+    themes: np.ndarray        # float64 (n, len(THEME_KEYS)) raw scores, THEME_KEYS order
+
+
+@dataclass
+class DailySums:
+    days: np.ndarray                  # int64 date ordinals, ascending
+    columns: Dict[str, np.ndarray]    # rollup column (SUM_COLUMNS) -> value per day
+
+
+# -----------------------------
+# Loading
+# -----------------------------
+def _theme_row(scores: Any) -> List[float]:
+    """Scores as normalize_theme_scores() reads them, before normalizing (unusable -> zeros)."""
+    if isinstance(scores, str):
+        try:
+            scores = json.loads(scores)
+        except Exception:
+            return [0.0] * len(THEME_KEYS)
+    if not isinstance(scores, dict):
+        return [0.0] * len(THEME_KEYS)
+    row = []
+    for k in THEME_KEYS:
+        v = coerce_float(scores.get(k))
+        row.append(0.0 if v is None or v < 0 else v)
+    return row
+
+
+def entry_arrays(values: Sequence[Dict[str, Any]]) -> EntryArrays:
+    """Arrays for one user's entry values (the dicts entry_contribution() takes);
+    entries that do not count toward a rollup are left out."""
+    counted = [
+        v for v in values
+        if not v["deleted"] and v["user_id"] is not None and v["created_at"] is not None
+    ]
+    n = len(counted)
+    return EntryArrays(
+        days=np.fromiter((rollup_day(v["created_at"]).toordinal() for v in counted), dtype=np.int64, count=n),
+        emotions=np.fromiter((_EMOTION_CODES.get(v["emotion"], NO_EMOTION) for v in counted), dtype=np.int64, count=n),
+        intensities=np.fromiter(
+            (_INTENSITY_CODES.get(v["emotion_intensity"], NO_INTENSITY) for v in counted), dtype=np.int64, count=n
+        ),
+        words=np.fromiter((word_count(v["content"] or "") for v in counted), dtype=np.int64, count=n),
+        chars=np.fromiter((len(v["content"] or "") for v in counted), dtype=np.int64, count=n),
+        themes=np.array([_theme_row(v["theme_scores"]) for v in counted], dtype=np.float64).reshape(n, len(THEME_KEYS)),
+    )
+
+
+def load_entry_arrays(
+    db: Session,
+    user_id: int,
+    start_day: Optional[date] = None,
+    end_day: Optional[date] = None,
+) -> EntryArrays:
+    """Arrays for the user's live entries with rollup day in [start_day, end_day).
+
+    Codes, word counts and theme values are computed by Postgres (the same
+    expressions rebuild_rollups() uses), so rows arrive as plain numbers.
+    """
+    day = utc_day_expr()
+    stmt = select(
+        cast(day - literal_column("DATE '0001-01-01'"), Integer) + 1,  # date.toordinal()
+        case(_EMOTION_CODES, value=JournalEntry.emotion, else_=NO_EMOTION),
+        case(_INTENSITY_CODES, value=JournalEntry.emotion_intensity, else_=NO_INTENSITY),
+        word_count_expr(),
+        func.char_length(JournalEntry.content),
+        *[theme_value_expr(k) for k in THEME_KEYS],
+    ).where(JournalEntry.user_id == user_id, JournalEntry.deleted == False)
+    if start_day is not None:
+        stmt = stmt.where(day >= start_day)
+    if end_day is not None:
+        stmt = stmt.where(day < end_day)
+
+    rows = db.execute(stmt.order_by(JournalEntry.id)).all()
+    table = np.array(rows, dtype=np.float64).reshape(len(rows), 5 + len(THEME_KEYS))
+    ints = np.nan_to_num(table[:, :5]).astype(np.int64)
+    return EntryArrays(
+        days=ints[:, 0],
+        emotions=ints[:, 1],
+        intensities=ints[:, 2],
+        words=ints[:, 3],
+        chars=ints[:, 4],
+        themes=np.ascontiguousarray(table[:, 5:]),
+    )
+
+
+# -----------------------------
+# Vectorized metrics
+# -----------------------------
+def _row_sum(matrix: np.ndarray) -> np.ndarray:
+    # Left to right, like sum() over the dict values, so totals are bit-identical
+    total = matrix[:, 0].copy()
+    for k in range(1, matrix.shape[1]):
+        total += matrix[:, k]
+    return total
+
+
+def normalize_theme_matrix(raw: np.ndarray):
+    """normalize_theme_scores() for every row: (normalized, valid). Rows that
+    are not valid (no positive total) are all zero."""
+    total = _row_sum(raw)
+    valid = ~(total <= 0)
+    normalized = np.divide(raw, total[:, None], out=np.zeros_like(raw), where=valid[:, None])
+
+    # Same floating error fix-up on "other"
+    diff = 1.0 - _row_sum(normalized)
+    fix = valid & (np.abs(diff) > 1e-9)
+    normalized[fix, _OTHER] = np.maximum(0.0, normalized[fix, _OTHER] + diff[fix])
+    return normalized, valid
+
+
+def daily_sums(arrays: EntryArrays) -> DailySums:
+    """Rollup columns per day. np.bincount adds in entry order, like the
+    incremental updates do, so float sums match them exactly."""
+    days, inverse = np.unique(arrays.days, return_inverse=True)
+    n_days = len(days)
+
+    def per_day(weights: Optional[np.ndarray] = None) -> np.ndarray:
+        return np.bincount(inverse, weights=weights, minlength=n_days)
+
+    normalized, valid = normalize_theme_matrix(arrays.themes)
+    columns: Dict[str, np.ndarray] = {
+        "entry_count": per_day(),
+        "word_count": per_day(arrays.words.astype(np.float64)).astype(np.int64),
+        "char_count": per_day(arrays.chars.astype(np.float64)).astype(np.int64),
+        "valence_sum": per_day(VALENCE_TABLE[arrays.emotions, arrays.intensities]),
+        "pleasure_sum": per_day(PLEASURE_TABLE[arrays.emotions, arrays.intensities]),
+        "theme_count": np.bincount(inverse[valid], minlength=n_days),
+    }
+    for code, emotion in enumerate(EMOTIONS):
+        columns[EMOTION_COLUMNS[emotion]] = np.bincount(inverse[arrays.emotions == code], minlength=n_days)
+    for k, key in enumerate(THEME_KEYS):
+        columns[THEME_COLUMNS[key]] = per_day(normalized[:, k])
+    return DailySums(days=days, columns=columns)
+
+
+# -----------------------------
+# Reads (same results as the rollup-based ones in rollup_service)
+# -----------------------------
+def _sequential_sum(values: np.ndarray) -> float:
+    # cumsum adds left to right, like sum() (np.sum uses pairwise summation)
+    return float(np.cumsum(values)[-1]) if len(values) else 0.0
+
+
+def emotion_counts(sums: DailySums) -> Dict[str, int]:
+    counts = {e: int(sums.columns[col].sum()) for e, col in EMOTION_COLUMNS.items()}
+    return {e: n for e, n in counts.items() if n}
+
+
+def theme_distribution(sums: DailySums) -> Dict[str, float]:
+    """rollup_theme_distribution() over the daily sums."""
+    if int(sums.columns["theme_count"].sum()) == 0:
+        return {}
+    theme_sum = {k: _sequential_sum(np.maximum(0.0, sums.columns[THEME_COLUMNS[k]])) for k in THEME_KEYS}
+    total_theme = sum(theme_sum.values()) or 1.0
+    return {k: round(theme_sum[k] / total_theme, 3) for k in THEME_KEYS}
+
+
+def valence_means(sums: DailySums) -> np.ndarray:
+    """Mean valence per day (the insights trend, before rounding)."""
+    return sums.columns["valence_sum"] / sums.columns["entry_count"]
+
+
+# -----------------------------
+# Verification
+# -----------------------------
+def rollup_mismatches(db: Session, user_id: int) -> List[date]:
+    """Days whose stored rollup row does not match the user's entries."""
+    sums = daily_sums(load_entry_arrays(db, user_id))
+    expected = {date.fromordinal(int(d)): i for i, d in enumerate(sums.days)}
+    stored = {
+        r.day: r
+        for r in db.query(UserDailyRollup).filter(
+            UserDailyRollup.user_id == user_id, UserDailyRollup.entry_count > 0
+        )
+    }
+
+    mismatched = []
+    for day in sorted(set(expected) | set(stored)):
+        row, i = stored.get(day), expected.get(day)
+        if row is None or i is None or not all(
+            math.isclose(float(getattr(row, col)), float(sums.columns[col][i]), rel_tol=1e-9, abs_tol=1e-6)
+            for col in SUM_COLUMNS
+        ):
+            mismatched.append(day)
+    return mismatched
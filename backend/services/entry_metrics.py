@@ -0,0 +1,154 @@
+# backend/services/entry_metrics.py
+#
+# Per-entry scores shared by insights, stats and the daily rollups, each in a
+# Python form (for single entries) and an SQL form (for grouped queries).
+
+from __future__ import annotations
+
+from typing import Any, Dict, Optional
+
+from sqlalchemy import Date, Float, Numeric, and_, case, cast, func
+
+from models import JournalEntry
+from models.entry import PLEASURE_BASE_SCORES, PLEASURE_INTENSITY_WEIGHT
+
+EMOTIONS = ["joy", "calm", "tired", "anxiety", "sadness", "anger"]
+
+VALENCE = {
+    "joy": 2,
+    "calm": 1,
+    "tired": -1,
+    "anxiety": -1,
+    "sadness": -2,
+    "anger": -2,
+}
+
+INTENSITY_WEIGHT = {
+    1: 0.7,
+    2: 1.0,
+    3: 1.3,
+}
+
+# Use unified theme keys: work/hobbies/social/other (no more job)
+THEME_KEYS = ["work", "hobbies", "social", "other"]
+
+
+# -----------------------------
+# Python (one entry)
+# -----------------------------
+def coerce_float(x: Any) -> Optional[float]:
+    try:
+        if x is None:
+            return None
+        if isinstance(x, (int, float)):
+            return float(x)
+        if isinstance(x, str):
+            return float(x.strip())
+    except Exception:
+        return None
+    return None
+
+
+def entry_valence(emotion: Optional[str], intensity: Optional[int]) -> float:
+    return float(VALENCE.get(emotion, 0)) * float(INTENSITY_WEIGHT.get(intensity, 1.0))
+
+
+def word_count(content: Optional[str]) -> int:
+    return len(content.split()) if content else 0
+
+
+def normalize_theme_scores(scores_dict: Any) -> Optional[Dict[str, float]]:
+    """
+    Input may be:
+    - dict: {"work":0.2,...}
+    - None
+    - (rare) str JSON if backend/DB driver returns raw text
+
+    Output:
+    - dict with exactly THEME_KEYS, values >=0, sum == 1 (approx)
+    - None if input cannot be parsed / sum <= 0
+    """
+    if scores_dict is None:
+        return None
+
+    # If somehow stored as text
+    if isinstance(scores_dict, str):
+        try:
+            import json
+
+            scores_dict = json.loads(scores_dict)
+        except Exception:
+            return None
+
+    if not isinstance(scores_dict, dict):
+        return None
+
+    cleaned: Dict[str, float] = {k: 0.0 for k in THEME_KEYS}
+    for k in THEME_KEYS:
+        v = coerce_float(scores_dict.get(k))
+        if v is None or v < 0:
+            v = 0.0
+        cleaned[k] = float(v)
+
+    total = sum(cleaned.values())
+    if total <= 0:
+        return None
+
+    for k in cleaned:
+        cleaned[k] = cleaned[k] / total
+
+    # Fix floating error by adding delta to other
+    total2 = sum(cleaned.values())
+    diff = 1.0 - total2
+    if abs(diff) > 1e-9:
+        cleaned["other"] = max(0.0, cleaned["other"] + diff)
+
+    return cleaned
+
+
+# -----------------------------
+# SQL (per row of journal_entries)
+# -----------------------------
+# Plain JSON numbers, or strings holding a plain decimal number
+_NUMERIC_TEXT = r"^\s*[-+]?([0-9]+\.?[0-9]*|\.[0-9]+)([eE][-+]?[0-9]+)?\s*$"
+
+
+def utc_day_expr():
+    """Calendar day of created_at in UTC (the rollup day)."""
+    return cast(func.timezone("UTC", JournalEntry.created_at), Date)
+
+
+def valence_expr():
+    """entry_valence() in SQL; numeric, so sums are exact and do not depend on row order."""
+    base = case(VALENCE, value=JournalEntry.emotion, else_=0)
+    weight = case(INTENSITY_WEIGHT, value=JournalEntry.emotion_intensity, else_=1.0)
+    return cast(base, Numeric) * cast(weight, Numeric)
+
+
+def pleasure_expr():
+    """JournalEntry.pleasure in SQL."""
+    base = case(PLEASURE_BASE_SCORES, value=JournalEntry.emotion, else_=0)
+    weight = case(PLEASURE_INTENSITY_WEIGHT, value=JournalEntry.emotion_intensity, else_=1.0)
+    return func.round(cast(base, Numeric) * cast(weight, Numeric), 2)
+
+
+def word_count_expr():
+    """Whitespace-separated words, like word_count()."""
+    return func.cardinality(
+        func.array_remove(func.regexp_split_to_array(JournalEntry.content, r"\s+"), "")
+    )
+
+
+def theme_value_expr(key: str):
+    """theme_scores[key] as a float >= 0, like coerce_float (missing/invalid/negative -> 0)."""
+    item = JournalEntry.theme_scores[key]
+    text_value = item.as_string()
+    value = case(
+        (func.json_typeof(item) == "number", cast(text_value, Float)),
+        (
+            and_(func.json_typeof(item) == "string", text_value.op("~")(_NUMERIC_TEXT)),
+            cast(text_value, Float),
+        ),
+        else_=0.0,
+    )
+    return func.greatest(value, 0.0)
@@ -0,0 +1,142 @@
+# backend/services/export_service.py
+#
+# Full-history journal export, streamed: rows come from a server-side cursor
+# in batches of EXPORT_BATCH_SIZE and are written out batch by batch, so memory
+# does not grow with the size of the history.
+
+from __future__ import annotations
+
+import csv
+import io
+import json
+import os
+from datetime import datetime
+from typing import Any, Dict, Iterator, Optional
+
+from sqlalchemy import func, select
+from sqlalchemy.dialects.postgresql import aggregate_order_by
+
+from database import SessionLocal
+from models import AIReply, JournalComment, JournalEntry
+
+EXPORT_BATCH_SIZE = int(os.getenv("EXPORT_BATCH_SIZE", "500"))
+
+EXPORT_FORMATS = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+}
+
+EXPORT_FIELDS = [
+    "id",
+    "created_at",
+    "content",
+    "summary",
+    "emotion",
+    "emotion_intensity",
+    "primary_theme",
+    "theme_scores",
+    "ai_reply",
+    "ai_reply_created_at",
+    "comments",
+]
+
+
+# -----------------------------
+# Query
+# -----------------------------
+def _export_select(user_id: int, after_id: Optional[int]):
+    """One row per live entry, oldest id first, with its AI reply and comments."""
+    comments = (
+        select(
+            func.coalesce(
+                func.json_agg(
+                    aggregate_order_by(
+                        func.json_build_object(
+                            "content", JournalComment.content,
+                            "created_at", JournalComment.created_at,
+                        ),
+                        JournalComment.created_at.asc(),
+                        JournalComment.id.asc(),
+                    )
+                ),
+                func.json_build_array(),
+            )
+        )
+        .where(JournalComment.entry_id == JournalEntry.id, JournalComment.deleted == False)
+        .scalar_subquery()
+    )
+
+    stmt = (
+        select(
+            JournalEntry.id,
+            JournalEntry.created_at,
+            JournalEntry.content,
+            JournalEntry.summary,
+            JournalEntry.emotion,
+            JournalEntry.emotion_intensity,
+            JournalEntry.primary_theme,
+            JournalEntry.theme_scores,
+            AIReply.content.label("ai_reply"),
+            AIReply.created_at.label("ai_reply_created_at"),
+            comments.label("comments"),
+        )
+        .outerjoin(AIReply, AIReply.entry_id == JournalEntry.id)
+        .where(JournalEntry.user_id == user_id, JournalEntry.deleted == False)
+        .order_by(JournalEntry.id.asc())
+    )
+    if after_id is not None:
+        stmt = stmt.where(JournalEntry.id > after_id)
+    return stmt
+
+
+def _record(row) -> Dict[str, Any]:
+    record = dict(row._mapping)
+    for key in ("created_at", "ai_reply_created_at"):
+        if isinstance(record[key], datetime):
+            record[key] = record[key].isoformat()
+    return record
+
+
+def _batches(user_id: int, after_id: Optional[int]) -> Iterator[list]:
+    """Rows in batches from a server-side cursor; owns its session for the life of the stream."""
+    db = SessionLocal()
+    try:
+        result = db.execute(
+            _export_select(user_id, after_id).execution_options(yield_per=EXPORT_BATCH_SIZE)
+        )
+        for partition in result.partitions():
+            yield [_record(row) for row in partition]
+    finally:
+        db.close()
+
+
+# -----------------------------
+# Formats
+# -----------------------------
+def _iter_ndjson(user_id: int, after_id: Optional[int]) -> Iterator[str]:
+    for batch in _batches(user_id, after_id):
+        yield "".join(json.dumps(r, ensure_ascii=False) + "\n" for r in batch)
+
+
+def _iter_csv(user_id: int, after_id: Optional[int]) -> Iterator[str]:
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=EXPORT_FIELDS)
+    writer.writeheader()
+    for batch in _batches(user_id, after_id):
+        for r in batch:
+            r["theme_scores"] = json.dumps(r["theme_scores"], ensure_ascii=False) if r["theme_scores"] is not None else ""
+            r["comments"] = json.dumps(r["comments"], ensure_ascii=False)
+            writer.writerow(r)
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue()  # header only (nothing to export)
+
+
+def iter_export(user_id: int, fmt: str, after_id: Optional[int] = None) -> Iterator[str]:
+    """Export chunks for fmt ("ndjson" | "csv"). Entries are ordered by id, so a
+    client that stopped part-way can resume with after_id = last id received."""
+    if fmt == "csv":
+        return _iter_csv(user_id, after_id)
+    return _iter_ndjson(user_id, after_id)
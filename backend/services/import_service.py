@@ -0,0 +1,213 @@
+# backend/services/import_service.py
+#
+# Bulk import of historical entries (JSONL or CSV with original timestamps).
+# Rows are inserted IMPORT_CHUNK_SIZE at a time with one multi-row INSERT per
+# chunk; each chunk commits together with its rollup deltas and analysis jobs.
+# Analysis is spread out (run_after) at IMPORT_ANALYSIS_PER_MINUTE so a large
+# import does not flood the worker or the LLM.
+
+from __future__ import annotations
+
+import csv
+import io
+import json
+import os
+from datetime import datetime, timedelta, timezone
+from typing import IO, Any, Dict, Iterator, List, Optional, Tuple
+
+from sqlalchemy import func, insert
+from sqlalchemy.orm import Session
+
+from models import AnalysisJob, ImportJob, JournalEntry
+from models.entry import generate_summary
+from .analysis_queue import JOB_TYPE_ANALYSIS
+from .rollup_service import apply_inserted_entries
+
+IMPORT_CHUNK_SIZE = int(os.getenv("IMPORT_CHUNK_SIZE", "500"))
+IMPORT_ANALYSIS_PER_MINUTE = float(os.getenv("IMPORT_ANALYSIS_PER_MINUTE", "60"))
+IMPORT_MAX_BYTES = int(os.getenv("IMPORT_MAX_BYTES", str(50 * 1024 * 1024)))
+
+# Rejected rows kept on the import for the status resource
+MAX_REPORTED_ERRORS = 20
+
+
+# -----------------------------
+# Parsing
+# -----------------------------
+def _parse_created_at(value: Any) -> datetime:
+    if not isinstance(value, str) or not value.strip():
+        raise ValueError("created_at is required")
+    try:
+        created_at = datetime.fromisoformat(value.strip())
+    except ValueError:
+        raise ValueError(f"invalid created_at: {value[:40]!r}")
+    if created_at.tzinfo is None:
+        created_at = created_at.replace(tzinfo=timezone.utc)
+    if created_at > datetime.now(timezone.utc) + timedelta(days=1):
+        raise ValueError("created_at is in the future")
+    return created_at
+
+
+def _entry_values(record: Any) -> Dict[str, Any]:
+    """Validated column values for one record (exports from GET /entries/export import as-is)."""
+    if not isinstance(record, dict):
+        raise ValueError("expected an object")
+    content = record.get("content")
+    if not isinstance(content, str) or not content.strip():
+        raise ValueError("content is required")
+    return {"content": content, "created_at": _parse_created_at(record.get("created_at"))}
+
+
+def _records(stream: IO[bytes], fmt: str) -> Iterator[Tuple[int, Any]]:
+    """(row number, record or the exception that made it unreadable), one at a time."""
+    text = io.TextIOWrapper(stream, encoding="utf-8-sig", errors="replace", newline="")
+    if fmt == "csv":
+        reader = csv.DictReader(text)
+        for row in reader:
+            yield reader.line_num, row
+        return
+
+    for line_no, line in enumerate(text, start=1):
+        if not line.strip():
+            continue
+        try:
+            yield line_no, json.loads(line)
+        except ValueError as e:
+            yield line_no, e
+
+
+# -----------------------------
+# Ingest
+# -----------------------------
+def _analysis_start(db: Session, user_id: int, spacing: float) -> datetime:
+    """Queue after this user's earlier imports that are still waiting."""
+    latest = (
+        db.query(func.max(AnalysisJob.run_after))
+        .filter(
+            AnalysisJob.user_id == user_id,
+            AnalysisJob.import_job_id.isnot(None),
+            AnalysisJob.status == "pending",
+        )
+        .scalar()
+    )
+    now = datetime.now(timezone.utc)
+    return max(now, latest + timedelta(seconds=spacing)) if latest else now
+
+
+def _insert_chunk(db: Session, job: ImportJob, rows: List[Dict[str, Any]], run_after: List[datetime]) -> None:
+    values = [
+        {
+            "user_id": job.user_id,
+            "content": r["content"],
+            "summary": generate_summary(r["content"]),
+            "created_at": r["created_at"],
+            "analysis_status": "pending",
+            "deleted": False,
+        }
+        for r in rows
+    ]
+    entry_ids = db.execute(insert(JournalEntry).values(values).returning(JournalEntry.id)).scalars().all()
+
+    apply_inserted_entries(
+        db.connection(),
+        [{**v, "emotion": None, "emotion_intensity": None, "theme_scores": None} for v in values],
+    )
+    db.execute(
+        insert(AnalysisJob).values([
+            {
+                "entry_id": entry_id,
+                "user_id": job.user_id,
+                "job_type": JOB_TYPE_ANALYSIS,
+                "status": "pending",
+                "run_after": at,
+                "import_job_id": job.id,
+            }
+            for entry_id, at in zip(entry_ids, run_after)
+        ])
+    )
+    job.rows_ingested += len(rows)
+
+
+def run_import(db: Session, user_id: int, fmt: str, stream: IO[bytes]) -> ImportJob:
+    """Ingest an uploaded file; returns the import (committed after every chunk)."""
+    job = ImportJob(user_id=user_id, format=fmt, status="ingesting", rows_ingested=0, rows_failed=0, errors=[])
+    db.add(job)
+    db.commit()
+
+    spacing = 60.0 / IMPORT_ANALYSIS_PER_MINUTE if IMPORT_ANALYSIS_PER_MINUTE > 0 else 0.0
+    start = _analysis_start(db, user_id, spacing)
+    errors: List[Dict[str, Any]] = []
+    chunk: List[Dict[str, Any]] = []
+
+    def flush() -> None:
+        first = job.rows_ingested
+        run_after = [start + timedelta(seconds=spacing * (first + i)) for i in range(len(chunk))]
+        _insert_chunk(db, job, chunk, run_after)
+        job.errors = list(errors)
+        db.commit()
+        chunk.clear()
+
+    try:
+        for row_no, record in _records(stream, fmt):
+            try:
+                if isinstance(record, Exception):
+                    raise ValueError(f"invalid JSON: {record}")
+                chunk.append(_entry_values(record))
+            except ValueError as e:
+                job.rows_failed += 1
+                if len(errors) < MAX_REPORTED_ERRORS:
+                    errors.append({"row": row_no, "error": str(e)[:200]})
+                continue
+            if len(chunk) >= IMPORT_CHUNK_SIZE:
+                flush()
+        if chunk:
+            flush()
+    except Exception as e:
+        # Chunks already committed stay imported; the status shows where it stopped
+        db.rollback()
+        print(f"[import] import {job.id} failed after {job.rows_ingested} rows: {type(e).__name__}: {e}")
+        errors.append({"row": None, "error": f"{type(e).__name__}: {e}"[:200]})
+        job.status = "failed"
+        job.errors = errors
+        db.commit()
+        return job
+
+    job.status = "ingested"
+    job.errors = errors
+    db.commit()
+    return job
+
+
+# -----------------------------
+# Status
+# -----------------------------
+def get_import_job(db: Session, user_id: int, import_id: int) -> Optional[ImportJob]:
+    return db.query(ImportJob).filter(ImportJob.id == import_id, ImportJob.user_id == user_id).first()
+
+
+def import_progress(db: Session, job: ImportJob) -> Dict[str, Any]:
+    counts = dict(
+        db.query(AnalysisJob.status, func.count())
+        .filter(AnalysisJob.import_job_id == job.id)
+        .group_by(AnalysisJob.status)
+        .all()
+    )
+    analysis_pending = counts.get("pending", 0) + counts.get("running", 0)
+
+    status = job.status
+    if status == "ingested":
+        status = "analyzing" if analysis_pending else "done"
+
+    return {
+        "id": job.id,
+        "format": job.format,
+        "status": status,
+        "rows_ingested": job.rows_ingested,
+        "rows_failed": job.rows_failed,
+        "rows_analyzed": counts.get("done", 0),
+        "analysis_failed": counts.get("failed", 0),
+        "analysis_pending": analysis_pending,
+        "errors": job.errors or [],
+        "created_at": job.created_at,
+        "updated_at": job.updated_at,
+    }
@@ -2,146 +2,109 @@
 
 from __future__ import annotations
 
-from datetime import datetime, timedelta, timezone
+from collections import OrderedDict
+from datetime import date, datetime, timedelta, timezone
+import asyncio
 import hashlib
 import json
+import os
+import threading
 from typing import Any, Dict, Optional
 
+from sqlalchemy import func
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.orm import Session
 
+from core.single_flight import single_flight
+from database import SessionLocal
 from models import JournalEntry, AICompanion, User, InsightsNoteCache
 from .ai_summary_service import generate_summary_message
+from .rollup_service import month_stamp, range_buckets, rollup_emotion_counts, rollup_theme_distribution
 
 # Import calendar generation logic
-from .calendar_service import build_week_calendar, build_month_calendar
+from .calendar_service import build_week_calendar, build_month_calendar, build_year_calendar
 
 
-VALENCE = {
-    "joy": 2,
-    "calm": 1,
-    "tired": -1,
-    "anxiety": -1,
-    "sadness": -2,
-    "anger": -2,
-}
+# Supported ?range= values; custom takes explicit start/end dates
+RANGE_TYPES = ("week", "month", "quarter", "year", "custom")
 
-INTENSITY_WEIGHT = {
-    1: 0.7,
-    2: 1.0,
-    3: 1.3,
-}
+# Closed periods whose aggregates are kept in memory (per process)
+INSIGHTS_CACHE_SIZE = int(os.getenv("INSIGHTS_CACHE_SIZE", "1024"))
 
-# Use unified theme keys: work/hobbies/social/other (no more job)
-THEME_KEYS = ["work", "hobbies", "social", "other"]
+_closed_cache: "OrderedDict[tuple, tuple]" = OrderedDict()
+_closed_cache_lock = threading.Lock()
+
+# A stale note is regenerated this long after the first request that saw it,
+# so a burst of new entries costs one LLM call
+INSIGHTS_NOTE_DEBOUNCE_SECONDS = float(os.getenv("INSIGHTS_NOTE_DEBOUNCE_SECONDS", "30"))
+
+# note key -> pending background refresh (per process)
+_pending_refresh: Dict[str, asyncio.Task] = {}
 
 
 # -----------------------------
 # Time range helpers (UTC-aware)
 # -----------------------------
-def get_datetime_range_utc(range_type: str) -> tuple[datetime, datetime]:
+def _utc_midnight(day: date) -> datetime:
+    return datetime(day.year, day.month, day.day, tzinfo=timezone.utc)
+
+
+def get_datetime_range_utc(range_type: str, anchor: Optional[date] = None) -> tuple[datetime, datetime]:
     """
-    Return [start, end) in UTC, both tz-aware datetimes.
+    Return [start, end) in UTC, both tz-aware datetimes, of the period that
+    contains anchor (default: today, UTC).
 
     - week: Monday 00:00Z -> next Monday 00:00Z
     - month: 1st day 00:00Z -> 1st day of next month 00:00Z
+    - quarter: Jan/Apr/Jul/Oct 1st 00:00Z -> 1st day of the next quarter 00:00Z
+    - year: Jan 1st 00:00Z -> next Jan 1st 00:00Z
     """
-    now = datetime.now(timezone.utc)
-    today = now.date()
+    today = anchor or datetime.now(timezone.utc).date()
 
     if range_type == "week":
         start_date = today - timedelta(days=today.weekday())  # Monday is 0
-        start = datetime(start_date.year, start_date.month, start_date.day, tzinfo=timezone.utc)
+        start = _utc_midnight(start_date)
         end = start + timedelta(days=7)
         return start, end
 
-    # month
-    start = datetime(today.year, today.month, 1, tzinfo=timezone.utc)
-    if today.month == 12:
-        end = datetime(today.year + 1, 1, 1, tzinfo=timezone.utc)
-    else:
-        end = datetime(today.year, today.month + 1, 1, tzinfo=timezone.utc)
-    return start, end
-
-
-def get_entries(db: Session, user_id: int, start: datetime, end: datetime):
-    """
-    Query entries in [start, end) (UTC, tz-aware).
-    """
-    return (
-        db.query(JournalEntry)
-        .filter(
-            JournalEntry.user_id == user_id,
-            JournalEntry.deleted == False,
-            JournalEntry.created_at >= start,
-            JournalEntry.created_at < end,
-        )
-        .all()
-    )
-
+    if range_type == "year":
+        return _utc_midnight(date(today.year, 1, 1)), _utc_midnight(date(today.year + 1, 1, 1))
 
-# -----------------------------
-# Theme helpers
-# -----------------------------
-def _coerce_float(x: Any) -> Optional[float]:
-    try:
-        if x is None:
-            return None
-        if isinstance(x, (int, float)):
-            return float(x)
-        if isinstance(x, str):
-            return float(x.strip())
-    except Exception:
-        return None
-    return None
-
-
-def _normalize_theme_scores(scores_dict: Any) -> Optional[Dict[str, float]]:
-    """
-    Input may be:
-    - dict: {"work":0.2,...}
-    - None
-    - (rare) str JSON if backend/DB driver returns raw text
-
-    Output:
-    - dict with exactly THEME_KEYS, values >=0, sum == 1 (approx)
-    - None if input cannot be parsed / sum <= 0
-    """
-    if scores_dict is None:
-        return None
+    # month / quarter
+    months = 3 if range_type == "quarter" else 1
+    first_month = (today.month - 1) // months * months + 1
+    start = datetime(today.year, first_month, 1, tzinfo=timezone.utc)
+    next_month = first_month + months
+    end = datetime(today.year + (next_month > 12), (next_month - 1) % 12 + 1, 1, tzinfo=timezone.utc)
+    return start, end
 
-    # If somehow stored as text
-    if isinstance(scores_dict, str):
-        try:
-            import json
 
-            scores_dict = json.loads(scores_dict)
-        except Exception:
-            return None
+def custom_range_utc(start_day: date, end_day: date) -> tuple[datetime, datetime]:
+    """[start_day 00:00Z, end_day + 1 day 00:00Z): both days inclusive."""
+    return _utc_midnight(start_day), _utc_midnight(end_day) + timedelta(days=1)
 
-    if not isinstance(scores_dict, dict):
-        return None
 
-    cleaned: Dict[str, float] = {k: 0.0 for k in THEME_KEYS}
-    for k in THEME_KEYS:
-        v = _coerce_float(scores_dict.get(k))
-        if v is None or v < 0:
-            v = 0.0
-        cleaned[k] = float(v)
+def trend_granularity(range_type: str, start: datetime, end: datetime) -> str:
+    """Valence trend points: daily up to a month, weekly for a quarter, monthly for a year."""
+    if range_type in ("week", "month"):
+        return "day"
+    if range_type == "quarter":
+        return "week"
+    if range_type == "year":
+        return "month"
+    days = (end - start).days
+    if days <= 62:
+        return "day"
+    return "week" if days <= 190 else "month"
 
-    total = sum(cleaned.values())
-    if total <= 0:
-        return None
 
-    for k in cleaned:
-        cleaned[k] = cleaned[k] / total
-
-    # Fix floating error by adding delta to other
-    total2 = sum(cleaned.values())
-    diff = 1.0 - total2
-    if abs(diff) > 1e-9:
-        cleaned["other"] = max(0.0, cleaned["other"] + diff)
-
-    return cleaned
+def _range_label(range_type: str, start: datetime, end: datetime) -> str:
+    """How the period is described to the note prompt."""
+    if range_type == "custom":
+        return f"{start.date()} to {(end - timedelta(days=1)).date()}"
+    if end.date() <= datetime.now(timezone.utc).date():
+        return f"{range_type} starting {start.date()}"
+    return range_type
 
 
 def _build_note_signature(
@@ -163,97 +126,161 @@ def _build_note_signature(
     return hashlib.sha256(raw.encode("utf-8")).hexdigest()
 
 
+# -----------------------------
+# Note cache helpers
+# -----------------------------
+def _get_note_cache(
+    db: Session, user_id: int, range_type: str, start: datetime, end: datetime
+) -> Optional[InsightsNoteCache]:
+    return (
+        db.query(InsightsNoteCache)
+        .filter(
+            InsightsNoteCache.user_id == user_id,
+            InsightsNoteCache.range_type == range_type,
+            InsightsNoteCache.start_date == start.date(),
+            InsightsNoteCache.end_date == end.date(),
+        )
+        .first()
+    )
+
+
+def _upsert_note_cache(
+    db: Session,
+    user_id: int,
+    range_type: str,
+    start: datetime,
+    end: datetime,
+    signature: str,
+    note: str,
+    note_author: str,
+) -> None:
+    """Insert or update the note row atomically (no IntegrityError on uq_note_cache_scope)."""
+    stmt = insert(InsightsNoteCache).values(
+        user_id=user_id,
+        range_type=range_type,
+        start_date=start.date(),
+        end_date=end.date(),
+        data_signature=signature,
+        note=note,
+        note_author=note_author,
+    )
+    stmt = stmt.on_conflict_do_update(
+        constraint="uq_note_cache_scope",
+        set_={
+            "data_signature": signature,
+            "note": note,
+            "note_author": note_author,
+            "updated_at": func.now(),
+        },
+    )
+    db.execute(stmt)
+    db.commit()
+
+
 # -----------------------------
 # Main aggregation
 # -----------------------------
-def aggregate_insights(db: Session, current_user: User, range_type: str):
-    """Aggregate stats + theme distribution (from DB theme_scores) + emotion trend + Calendar + AI Summary."""
+def _period_data(db: Session, current_user: User, range_type: str, start: datetime, end: datetime) -> Dict[str, Any]:
+    """Stats, distributions, trend and calendar of [start, end) from the rollup tiers."""
     user_id = current_user.id
+    granularity = trend_granularity(range_type, start, end)
 
-    # 1) Time range (UTC-aware, [start, end))
-    start, end = get_datetime_range_utc(range_type)
-
-    # 2) entries
-    entries = get_entries(db, user_id, start, end)
+    # Day/week/month buckets (at most a few hundred small rows); entry rows are never loaded
+    buckets = range_buckets(db, user_id, start.date(), end.date(), granularity)
 
     # ------------------------------
     # A. Basic stats
     # ------------------------------
-    content_joined = " ".join([e.content for e in entries])
     stats = {
-        "entries": len(entries),
-        "words": len(content_joined.split()) if content_joined else 0,
-        "active_days": len({e.created_at.date() for e in entries}),
+        "entries": sum(b.entry_count for b in buckets),
+        "words": sum(b.word_count for b in buckets),
+        "active_days": sum(b.active_days for b in buckets),
     }
 
     # ------------------------------
     # B. Emotion distribution
     # ------------------------------
-    emotion_counts: Dict[str, int] = {}
-    for e in entries:
-        if e.emotion:
-            emotion_counts[e.emotion] = emotion_counts.get(e.emotion, 0) + 1
+    emotion_counts = rollup_emotion_counts(buckets)
 
     # ------------------------------
-    # C. Emotion valence trend (daily)
+    # C. Emotion valence trend (one point per day / week / month)
     # ------------------------------
-    daily_sum: Dict[str, float] = {}
-    daily_count: Dict[str, int] = {}
     today = datetime.now(timezone.utc).date()
-
-    for e in entries:
-        if not e.created_at:
-            continue
-        d = e.created_at.date()
-        if d > today:
-            continue
-        key = d.isoformat()
-        base = VALENCE.get(e.emotion, 0)
-        weight = INTENSITY_WEIGHT.get(e.emotion_intensity, 1.0)
-        score = float(base) * float(weight)
-
-        daily_sum[key] = daily_sum.get(key, 0.0) + score
-        daily_count[key] = daily_count.get(key, 0) + 1
-
-    emotion_trend = []
-    for d in sorted(daily_sum.keys()):
-        count = daily_count.get(d, 0) or 1
-        avg = daily_sum[d] / count
-        emotion_trend.append({"date": d, "valence": round(avg, 3)})
+    emotion_trend = [
+        {"date": b.start.isoformat(), "valence": round(float(b.valence_sum) / b.entry_count, 3)}
+        for b in buckets
+        if b.start <= today
+    ]
 
     # ------------------------------
     # D. Theme aggregation (Inner Landscape)
     # - entries=0 -> themes={}
     # - entries>0 but no valid theme_scores -> themes={}
     # ------------------------------
-    if not entries:
-        theme_distribution: Dict[str, float] = {}
-    else:
-        theme_sum = {k: 0.0 for k in THEME_KEYS}
-        valid_theme_count = 0
-
-        for e in entries:
-            normalized = _normalize_theme_scores(getattr(e, "theme_scores", None))
-            if not normalized:
-                continue
-            valid_theme_count += 1
-            for k in THEME_KEYS:
-                theme_sum[k] += float(normalized.get(k, 0.0))
-
-        if valid_theme_count == 0:
-            theme_distribution = {}
-        else:
-            total_theme = sum(theme_sum.values()) or 1.0
-            theme_distribution = {k: round(theme_sum[k] / total_theme, 3) for k in THEME_KEYS}
+    theme_distribution = rollup_theme_distribution(buckets)
 
     # ------------------------------
-    # E. Calendar (weekly / monthly)
+    # E. Calendar (weekly / monthly / yearly heatmap; none for quarter and custom ranges)
     # ------------------------------
     if range_type == "week":
-        calendar_data = build_week_calendar(db, current_user)
+        calendar_data = build_week_calendar(db, current_user, start.date())
+    elif range_type == "month":
+        calendar_data = build_month_calendar(db, current_user, start.strftime("%Y-%m"))
+    elif range_type == "year":
+        calendar_data = build_year_calendar(db, current_user, start.year)
     else:
-        month_str = datetime.now(timezone.utc).strftime("%Y-%m")
-        calendar_data = build_month_calendar(db, current_user, month_str)
+        calendar_data = None
+
+    return {
+        "stats": stats,
+        "emotions": emotion_counts,
+        "valence_trend": emotion_trend,
+        "trend_granularity": granularity,
+        "themes": theme_distribution,
+        "calendar": calendar_data,
+    }
+
+
+def _cached_period_data(db: Session, current_user: User, range_type: str, start: datetime, end: datetime) -> Dict[str, Any]:
+    """_period_data, kept in memory for closed periods (ended before today, UTC).
+
+    Their rollups only change when old entries are deleted, re-analyzed or
+    imported, and every such change rewrites the month rollup rows, so the
+    cached result is reused while their row versions are unchanged.
+    """
+    if end.date() > datetime.now(timezone.utc).date():
+        return _period_data(db, current_user, range_type, start, end)
+
+    key = (current_user.id, range_type, start.date(), end.date())
+    stamp = month_stamp(db, current_user.id, start.date(), end.date())
+    with _closed_cache_lock:
+        cached = _closed_cache.get(key)
+        if cached is not None and cached[0] == stamp:
+            _closed_cache.move_to_end(key)
+            return cached[1]
+
+    data = _period_data(db, current_user, range_type, start, end)
+    with _closed_cache_lock:
+        _closed_cache[key] = (stamp, data)
+        _closed_cache.move_to_end(key)
+        while len(_closed_cache) > INSIGHTS_CACHE_SIZE:
+            _closed_cache.popitem(last=False)
+    return data
+
+
+def _aggregate_period(
+    db: Session,
+    current_user: User,
+    range_type: str,
+    start: datetime,
+    end: datetime,
+) -> Dict[str, Any]:
+    """Synchronous DB part of aggregate_insights (runs in a worker thread)."""
+    user_id = current_user.id
+    period = _cached_period_data(db, current_user, range_type, start, end)
+    stats = period["stats"]
+    emotion_counts = period["emotions"]
+    emotion_trend = period["valence_trend"]
 
     # ------------------------------
     # F. Mood Booster & Stressors (placeholder)
@@ -298,62 +325,175 @@ def aggregate_insights(db: Session, current_user: User, range_type: str):
         companion_id=companion_id,
     )
 
-    cache = (
-        db.query(InsightsNoteCache)
-        .filter(
-            InsightsNoteCache.user_id == user_id,
-            InsightsNoteCache.range_type == range_type,
-            InsightsNoteCache.start_date == start.date(),
-            InsightsNoteCache.end_date == end.date(),
-        )
-        .first()
-    )
-
-    if cache and cache.data_signature == signature and cache.note is not None:
-        note = cache.note
-        if cache.note_author:
-            note_author = cache.note_author
-    else:
-        if not entries:
-            note = ""
+    cache = _get_note_cache(db, user_id, range_type, start, end)
+    cached_note = stale_note = None
+    if cache and cache.note is not None:
+        if cache.data_signature == signature:
+            cached_note = (cache.note, cache.note_author or note_author)
         else:
-            note = generate_summary_message(
-                companion_obj,
-                range_type,
-                stats,
-                emotion_trend,
-                emotion_counts,
-            )
+            stale_note = (cache.note, cache.note_author or note_author)
+
+    return {
+        "start": start,
+        "end": end,
+        "stats": stats,
+        "themes": period["themes"],
+        "emotions": emotion_counts,
+        "valence_trend": emotion_trend,
+        "trend_granularity": period["trend_granularity"],
+        "calendar": period["calendar"],
+        "booster": booster,
+        "stressors": stressors,
+        "companion": companion_obj,
+        "note_author": note_author,
+        "signature": signature,
+        "cached_note": cached_note,
+        "stale_note": stale_note,
+    }
+
 
-        if cache:
-            cache.data_signature = signature
-            cache.note = note
-            cache.note_author = note_author
+# -----------------------------
+# Note generation
+# -----------------------------
+def _note_key(user_id: int, range_type: str, start: datetime, end: datetime) -> str:
+    return f"insights_note:{user_id}:{range_type}:{start.date()}:{end.date()}"
+
+
+async def _refresh_note(
+    db: Session, user_id: int, range_type: str, start: datetime, end: datetime, data: Dict[str, Any]
+) -> tuple[str, str]:
+    """Generate and store the note for data; concurrent callers share one LLM call."""
+    stats = data["stats"]
+    signature = data["signature"]
+    default_author = data["note_author"]
+
+    def _load_fresh() -> Optional[tuple[str, str]]:
+        # A concurrent request (or another worker) may have just stored it
+        db.expire_all()
+        fresh = _get_note_cache(db, user_id, range_type, start, end)
+        if fresh and fresh.data_signature == signature and fresh.note is not None:
+            return fresh.note, fresh.note_author or default_author
+        return None
+
+    async def _generate() -> tuple[str, str]:
+        fresh = await asyncio.to_thread(_load_fresh)
+        if fresh is not None:
+            return fresh
+
+        if not stats["entries"]:
+            new_note = ""
         else:
-            cache = InsightsNoteCache(
+            new_note = await generate_summary_message(
+                data["companion"],
+                _range_label(range_type, start, end),
+                stats,
+                data["valence_trend"],
+                data["emotions"],
                 user_id=user_id,
-                range_type=range_type,
-                start_date=start.date(),
-                end_date=end.date(),
-                data_signature=signature,
-                note=note,
-                note_author=note_author,
             )
-            db.add(cache)
 
-        db.commit()
+        await asyncio.to_thread(
+            _upsert_note_cache, db, user_id, range_type, start, end, signature, new_note, default_author
+        )
+        return new_note, default_author
+
+    return await single_flight.do(_note_key(user_id, range_type, start, end), _generate)
+
+
+def _schedule_note_refresh(user_id: int, range_type: str, start: datetime, end: datetime) -> None:
+    """Regenerate a stale note in the background, at most one pending refresh per note."""
+    key = _note_key(user_id, range_type, start, end)
+    if key in _pending_refresh:
+        return
+    task = asyncio.create_task(_refresh_later(key, user_id, range_type, start, end))
+    _pending_refresh[key] = task
+    task.add_done_callback(lambda _: _pending_refresh.pop(key, None))
+
+
+async def _refresh_later(key: str, user_id: int, range_type: str, start: datetime, end: datetime) -> None:
+    await asyncio.sleep(INSIGHTS_NOTE_DEBOUNCE_SECONDS)
+    try:
+        await _refresh_stale_note(user_id, range_type, start, end)
+    except Exception as e:
+        print(f"[insights] note refresh failed for {key}: {e}")
+
+
+async def _refresh_stale_note(user_id: int, range_type: str, start: datetime, end: datetime) -> bool:
+    # The request's session is closed by now, so read the latest data in a new one
+    db = SessionLocal()
+    try:
+        user = await asyncio.to_thread(db.get, User, user_id)
+        if user is None:
+            return False
+        data = await asyncio.to_thread(_aggregate_period, db, user, range_type, start, end)
+        if data["cached_note"] is not None:
+            return False
+        await _refresh_note(db, user_id, range_type, start, end, data)
+        return True
+    finally:
+        db.close()
+
+
+async def refresh_note(user_id: int, range_type: str, anchor: Optional[date] = None) -> bool:
+    """Bring the note of the week/month/quarter/year containing anchor up to date.
+
+    Returns True if a new note was generated, False if the stored one was current.
+    """
+    start, end = get_datetime_range_utc(range_type, anchor)
+    return await _refresh_stale_note(user_id, range_type, start, end)
+
+
+async def aggregate_insights(
+    db: Session,
+    current_user: User,
+    range_type: str,
+    anchor: Optional[date] = None,
+    custom: Optional[tuple[date, date]] = None,
+):
+    """Aggregate stats + theme distribution (from DB theme_scores) + emotion trend + Calendar + AI Summary.
+
+    The period is the week/month/quarter/year containing anchor (default:
+    today), or for range_type "custom" the inclusive (start, end) days.
+    DB work runs in a worker thread. The note is generated inline only the first
+    time; after that an outdated note is returned with note_stale=True and
+    regenerated in the background.
+    """
+    user_id = current_user.id
+    if range_type == "custom":
+        start, end = custom_range_utc(*custom)
+    else:
+        start, end = get_datetime_range_utc(range_type, anchor)
+    data = await asyncio.to_thread(_aggregate_period, db, current_user, range_type, start, end)
+
+    stats = data["stats"]
+
+    if data["cached_note"] is not None:
+        note, note_author = data["cached_note"]
+        note_stale = False
+    elif data["stale_note"] is not None:
+        # Serve the old note now; the LLM runs after the request, once per burst of entries
+        note, note_author = data["stale_note"]
+        note_stale = True
+        _schedule_note_refresh(user_id, range_type, start, end)
+    else:
+        # First note of this period: nothing to show yet, so generate it inline
+        note, note_author = await _refresh_note(db, user_id, range_type, start, end, data)
+        note_stale = False
 
     # ------------------------------
     # H. Return
     # ------------------------------
     return {
         "stats": stats,
-        "themes": theme_distribution,  # When {}, frontend shows empty state
-        "emotions": emotion_counts,
-        "valence_trend": emotion_trend,
-        "calendar": calendar_data,
-        "booster": booster,
-        "stressors": stressors,
+        "themes": data["themes"],  # When {}, frontend shows empty state
+        "emotions": data["emotions"],
+        "valence_trend": data["valence_trend"],
+        "trend_granularity": data["trend_granularity"],
+        "period": {"start": start.date().isoformat(), "end": (end - timedelta(days=1)).date().isoformat()},
+        "calendar": data["calendar"],
+        "booster": data["booster"],
+        "stressors": data["stressors"],
         "note": note,
         "note_author": note_author,
+        "note_stale": note_stale,
     }
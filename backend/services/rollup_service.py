@@ -0,0 +1,453 @@
+# backend/services/rollup_service.py
+
+from __future__ import annotations
+
+from datetime import date, datetime, timedelta, timezone
+from types import SimpleNamespace
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import Date, DateTime, cast, delete, event, func, inspect, literal, literal_column, or_, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+from models import JournalEntry, UserDailyRollup, UserPeriodRollup
+from models.entry import pleasure_score
+from .entry_metrics import (
+    EMOTIONS,
+    THEME_KEYS,
+    entry_valence,
+    normalize_theme_scores,
+    pleasure_expr,
+    theme_value_expr,
+    utc_day_expr,
+    valence_expr,
+    word_count,
+    word_count_expr,
+)
+
+EMOTION_COLUMNS = {e: f"emotion_{e}" for e in EMOTIONS}
+THEME_COLUMNS = {k: f"theme_{k}" for k in THEME_KEYS}
+
+# Every additive rollup column
+SUM_COLUMNS = [
+    "entry_count",
+    "word_count",
+    "char_count",
+    *EMOTION_COLUMNS.values(),
+    "valence_sum",
+    "pleasure_sum",
+    "theme_count",
+    *THEME_COLUMNS.values(),
+]
+
+# Entry attributes a rollup row depends on
+_TRACKED = ("user_id", "created_at", "content", "emotion", "emotion_intensity", "theme_scores", "deleted")
+
+RollupKey = Tuple[int, date]
+
+# Tiers above the daily rows (UserPeriodRollup.period)
+PERIODS = ("week", "month")
+
+
+# -----------------------------
+# Per-entry contribution
+# -----------------------------
+def rollup_day(created_at: datetime) -> date:
+    if created_at.tzinfo is None:
+        return created_at.date()
+    return created_at.astimezone(timezone.utc).date()
+
+
+def period_start(day: date, period: str) -> date:
+    """First day of the week (Monday) or month containing day."""
+    if period == "week":
+        return day - timedelta(days=day.weekday())
+    return day.replace(day=1)
+
+
+def period_end(start: date, period: str) -> date:
+    """First day after the week/month starting at start."""
+    if period == "week":
+        return start + timedelta(days=7)
+    return date(start.year + (start.month == 12), start.month % 12 + 1, 1)
+
+
+def entry_contribution(values: Dict[str, Any]) -> Optional[Tuple[RollupKey, Dict[str, float]]]:
+    """((user_id, day), {column: amount}) for one entry's values; None if it does not count."""
+    if values["deleted"] or values["user_id"] is None or values["created_at"] is None:
+        return None
+
+    content = values["content"] or ""
+    emotion = values["emotion"]
+    intensity = values["emotion_intensity"]
+
+    deltas: Dict[str, float] = {
+        "entry_count": 1,
+        "word_count": word_count(content),
+        "char_count": len(content),
+        "valence_sum": entry_valence(emotion, intensity),
+        "pleasure_sum": pleasure_score(emotion, intensity),
+    }
+    if emotion in EMOTION_COLUMNS:
+        deltas[EMOTION_COLUMNS[emotion]] = 1
+
+    normalized = normalize_theme_scores(values["theme_scores"])
+    if normalized:
+        deltas["theme_count"] = 1
+        for k in THEME_KEYS:
+            deltas[THEME_COLUMNS[k]] = normalized[k]
+
+    return (values["user_id"], rollup_day(values["created_at"])), deltas
+
+
+def _add(changes: Dict[RollupKey, Dict[str, float]], contribution, sign: int) -> None:
+    if contribution is None:
+        return
+    key, deltas = contribution
+    bucket = changes.setdefault(key, {})
+    for col, amount in deltas.items():
+        bucket[col] = bucket.get(col, 0) + sign * amount
+
+
+def _upsert_totals(conn, model, key_columns: List[str], rows: List[Dict[str, Any]], returning=()):
+    """Insert rows or add their non-key values to the existing ones."""
+    stmt = insert(model).values(rows)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=key_columns,
+        set_={
+            **{col: getattr(model, col) + stmt.excluded[col] for col in rows[0] if col not in key_columns},
+            "updated_at": func.now(),
+        },
+    )
+    if returning:
+        stmt = stmt.returning(*returning)
+    return conn.execute(stmt)
+
+
+def apply_rollup_deltas(conn, changes: Dict[RollupKey, Dict[str, float]]) -> None:
+    """Add deltas to the daily rows and to their week/month rows, in the
+    caller's transaction (atomic upserts)."""
+    changes = {key: deltas for key, deltas in changes.items() if any(deltas.values())}
+    if not changes:
+        return
+
+    # Sorted keys: fixed lock order across writers
+    daily = _upsert_totals(
+        conn,
+        UserDailyRollup,
+        ["user_id", "day"],
+        [
+            {"user_id": user_id, "day": day, **{col: deltas.get(col, 0) for col in SUM_COLUMNS}}
+            for (user_id, day), deltas in sorted(changes.items())
+        ],
+        returning=(UserDailyRollup.user_id, UserDailyRollup.day, UserDailyRollup.entry_count),
+    )
+
+    period_changes: Dict[Tuple[int, str, date], Dict[str, float]] = {}
+    for user_id, day, entry_count in daily:
+        deltas = changes[(user_id, day)]
+        # The row is locked by our upsert, so the count before it is exact
+        before = entry_count - deltas.get("entry_count", 0)
+        active_delta = int(entry_count > 0) - int(before > 0)
+        for period in PERIODS:
+            bucket = period_changes.setdefault((user_id, period, period_start(day, period)), {"active_days": 0})
+            bucket["active_days"] += active_delta
+            for col, amount in deltas.items():
+                bucket[col] = bucket.get(col, 0) + amount
+
+    _upsert_totals(conn, UserPeriodRollup, ["user_id", "period", "start"], [
+        {
+            "user_id": user_id,
+            "period": period,
+            "start": start,
+            "active_days": deltas["active_days"],
+            **{col: deltas.get(col, 0) for col in SUM_COLUMNS},
+        }
+        for (user_id, period, start), deltas in sorted(period_changes.items())
+    ])
+
+
+# -----------------------------
+# Incremental maintenance
+# -----------------------------
+def _current_values(entry: JournalEntry) -> Dict[str, Any]:
+    return {attr: getattr(entry, attr) for attr in _TRACKED}
+
+
+def _committed_values(session: Session, entry_ids: List[int]) -> Dict[int, Dict[str, Any]]:
+    """Values as currently stored (before this flush) for the given entries."""
+    if not entry_ids:
+        return {}
+    cols = [getattr(JournalEntry, attr) for attr in _TRACKED]
+    rows = session.connection().execute(
+        select(JournalEntry.id, *cols).where(JournalEntry.id.in_(entry_ids))
+    )
+    return {row[0]: dict(zip(_TRACKED, row[1:])) for row in rows}
+
+
+def _rollup_fields_changed(entry: JournalEntry) -> bool:
+    state = inspect(entry)
+    return any(state.attrs[attr].history.has_changes() for attr in _TRACKED)
+
+
+@event.listens_for(Session, "before_flush")
+def _track_entry_changes(session: Session, flush_context, instances) -> None:
+    """Turn created / re-analyzed / (soft-)deleted entries into rollup deltas.
+
+    Runs inside the flush, so the rollup rows change in the same transaction as
+    the entries and roll back with them.
+    """
+    changes: Dict[RollupKey, Dict[str, float]] = {}
+
+    with session.no_autoflush:
+        for obj in session.new:
+            if isinstance(obj, JournalEntry):
+                if obj.created_at is None:
+                    # Normally a server default; the rollup needs the day before the INSERT
+                    obj.created_at = datetime.now(timezone.utc)
+                _add(changes, entry_contribution(_current_values(obj)), +1)
+
+        dirty = [
+            obj for obj in session.dirty
+            if isinstance(obj, JournalEntry) and obj.id is not None and _rollup_fields_changed(obj)
+        ]
+        removed = [obj for obj in session.deleted if isinstance(obj, JournalEntry) and obj.id is not None]
+        if not dirty and not removed and not changes:
+            return
+
+        # Old values come from the DB: expired attributes have no usable history
+        stored = _committed_values(session, [obj.id for obj in dirty + removed])
+        for obj in dirty:
+            if obj.id in stored:
+                _add(changes, entry_contribution(stored[obj.id]), -1)
+            _add(changes, entry_contribution(_current_values(obj)), +1)
+        for obj in removed:
+            if obj.id in stored:
+                _add(changes, entry_contribution(stored[obj.id]), -1)
+
+    apply_rollup_deltas(session.connection(), changes)
+
+
+def apply_inserted_entries(conn, entries: List[Dict[str, Any]]) -> None:
+    """Rollup deltas for entries inserted with Core statements (bulk import),
+    which the flush hook does not see. Same transaction as the INSERT."""
+    changes: Dict[RollupKey, Dict[str, float]] = {}
+    for values in entries:
+        _add(changes, entry_contribution(values), +1)
+    apply_rollup_deltas(conn, changes)
+
+
+# -----------------------------
+# Rebuild (repairs / first deploy)
+# -----------------------------
+def _rollup_select(user_id: Optional[int] = None):
+    """Rollup rows recomputed from journal_entries with one GROUP BY."""
+    themes = {k: theme_value_expr(k) for k in THEME_KEYS}
+    per_entry = select(
+        JournalEntry.user_id.label("user_id"),
+        utc_day_expr().label("day"),
+        JournalEntry.emotion.label("emotion"),
+        word_count_expr().label("words"),
+        func.char_length(JournalEntry.content).label("chars"),
+        valence_expr().label("valence"),
+        pleasure_expr().label("pleasure"),
+        *[expr.label(k) for k, expr in themes.items()],
+    ).where(JournalEntry.deleted == False)
+    if user_id is not None:
+        per_entry = per_entry.where(JournalEntry.user_id == user_id)
+    e = per_entry.subquery()
+
+    theme_total = func.nullif(sum((e.c[k] for k in THEME_KEYS[1:]), e.c[THEME_KEYS[0]]), 0)
+    return select(
+        e.c.user_id,
+        e.c.day,
+        func.count().label("entry_count"),
+        func.coalesce(func.sum(e.c.words), 0).label("word_count"),
+        func.coalesce(func.sum(e.c.chars), 0).label("char_count"),
+        *[func.count().filter(e.c.emotion == emotion).label(col) for emotion, col in EMOTION_COLUMNS.items()],
+        func.sum(e.c.valence).label("valence_sum"),
+        func.sum(e.c.pleasure).label("pleasure_sum"),
+        func.count(theme_total).label("theme_count"),
+        *[func.coalesce(func.sum(e.c[k] / theme_total), 0.0).label(THEME_COLUMNS[k]) for k in THEME_KEYS],
+    ).group_by(e.c.user_id, e.c.day)
+
+
+def rebuild_rollups(db: Session, user_id: Optional[int] = None) -> int:
+    """Recompute rollups for one user (or everyone) from the entries; returns rows written.
+
+    Runs in the caller's transaction; commit afterwards.
+    """
+    target = delete(UserDailyRollup)
+    if user_id is not None:
+        target = target.where(UserDailyRollup.user_id == user_id)
+    db.execute(target)
+
+    source = _rollup_select(user_id)
+    columns = ["user_id", "day", *SUM_COLUMNS]
+    stmt = insert(UserDailyRollup).from_select(columns, source)
+    # An entry committed between the DELETE and this INSERT may have re-created a row
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["user_id", "day"],
+        set_={**{col: stmt.excluded[col] for col in SUM_COLUMNS}, "updated_at": func.now()},
+    )
+    rows = db.execute(stmt).rowcount
+    rebuild_period_rollups(db, user_id)
+    return rows
+
+
+def rebuild_period_rollups(db: Session, user_id: Optional[int] = None) -> int:
+    """Recompute the week/month rows from the daily rows; returns rows written.
+
+    Runs in the caller's transaction; commit afterwards.
+    """
+    target = delete(UserPeriodRollup)
+    if user_id is not None:
+        target = target.where(UserPeriodRollup.user_id == user_id)
+    db.execute(target)
+
+    written = 0
+    columns = ["user_id", "period", "start", "active_days", *SUM_COLUMNS]
+    for period in PERIODS:
+        start = cast(func.date_trunc(period, cast(UserDailyRollup.day, DateTime)), Date)
+        source = select(
+            UserDailyRollup.user_id,
+            literal(period),
+            start,
+            func.count().filter(UserDailyRollup.entry_count > 0),
+            *[func.sum(getattr(UserDailyRollup, col)) for col in SUM_COLUMNS],
+        ).group_by(UserDailyRollup.user_id, start)
+        if user_id is not None:
+            source = source.where(UserDailyRollup.user_id == user_id)
+
+        stmt = insert(UserPeriodRollup).from_select(columns, source)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["user_id", "period", "start"],
+            set_={**{col: stmt.excluded[col] for col in columns[3:]}, "updated_at": func.now()},
+        )
+        written += db.execute(stmt).rowcount
+    return written
+
+
+# -----------------------------
+# Reads
+# -----------------------------
+def daily_rollups(db: Session, user_id: int, start_day: date, end_day: date) -> List[UserDailyRollup]:
+    """Rollup rows with at least one entry for days in [start_day, end_day), oldest first."""
+    return (
+        db.query(UserDailyRollup)
+        .filter(
+            UserDailyRollup.user_id == user_id,
+            UserDailyRollup.day >= start_day,
+            UserDailyRollup.day < end_day,
+            UserDailyRollup.entry_count > 0,
+        )
+        .order_by(UserDailyRollup.day.asc())
+        .all()
+    )
+
+
+def _totals(row) -> Dict[str, Any]:
+    return {col: getattr(row, col) for col in SUM_COLUMNS}
+
+
+def range_buckets(db: Session, user_id: int, start_day: date, end_day: date, granularity: str) -> List[SimpleNamespace]:
+    """Totals per day, week or month over [start_day, end_day), oldest first,
+    for buckets with entries. Each has `start` (its first day in the range),
+    `active_days` and the SUM_COLUMNS.
+
+    Weeks/months lying wholly inside the range are read from their own row;
+    only the clipped ones at the edges are summed from daily rows, so a year
+    of months costs ~12 period rows plus at most ~60 daily rows.
+    """
+    if granularity == "day":
+        return [
+            SimpleNamespace(start=r.day, active_days=1, **_totals(r))
+            for r in daily_rollups(db, user_id, start_day, end_day)
+        ]
+
+    full_start = period_start(start_day, granularity)
+    if full_start < start_day:
+        full_start = period_end(full_start, granularity)
+    full_end = max(period_start(end_day, granularity), full_start)
+
+    buckets: Dict[date, SimpleNamespace] = {}
+    if full_start < full_end:
+        for r in (
+            db.query(UserPeriodRollup)
+            .filter(
+                UserPeriodRollup.user_id == user_id,
+                UserPeriodRollup.period == granularity,
+                UserPeriodRollup.start >= full_start,
+                UserPeriodRollup.start < full_end,
+                UserPeriodRollup.entry_count > 0,
+            )
+        ):
+            buckets[r.start] = SimpleNamespace(start=r.start, active_days=r.active_days, **_totals(r))
+
+    edge_days = (
+        db.query(UserDailyRollup)
+        .filter(
+            UserDailyRollup.user_id == user_id,
+            UserDailyRollup.day >= start_day,
+            UserDailyRollup.day < end_day,
+            or_(UserDailyRollup.day < full_start, UserDailyRollup.day >= full_end),
+            UserDailyRollup.entry_count > 0,
+        )
+    )
+    for r in edge_days:
+        key = max(period_start(r.day, granularity), start_day)
+        bucket = buckets.get(key)
+        if bucket is None:
+            buckets[key] = SimpleNamespace(start=key, active_days=1, **_totals(r))
+            continue
+        bucket.active_days += 1
+        for col in SUM_COLUMNS:
+            setattr(bucket, col, getattr(bucket, col) + getattr(r, col))
+
+    return [buckets[k] for k in sorted(buckets)]
+
+
+def month_stamp(db: Session, user_id: int, start_day: date, end_day: date) -> Tuple:
+    """Row versions (xmin) of the month rows covering [start_day, end_day).
+
+    Every change to a day also rewrites its month row in the same transaction,
+    so an unchanged stamp means nothing in the range changed.
+    """
+    rows = db.execute(
+        select(UserPeriodRollup.start, literal_column("xmin::text"))
+        .where(
+            UserPeriodRollup.user_id == user_id,
+            UserPeriodRollup.period == "month",
+            UserPeriodRollup.start >= period_start(start_day, "month"),
+            UserPeriodRollup.start < end_day,
+        )
+        .order_by(UserPeriodRollup.start)
+    )
+    return tuple(tuple(r) for r in rows)
+
+
+def rollup_emotion_counts(rows: List[UserDailyRollup]) -> Dict[str, int]:
+    counts = {e: sum(getattr(r, col) for r in rows) for e, col in EMOTION_COLUMNS.items()}
+    return {e: n for e, n in counts.items() if n}
+
+
+def rollup_theme_distribution(rows: List[UserDailyRollup]) -> Dict[str, float]:
+    """Mean of the per-entry normalized theme scores ({} when no entry has valid scores)."""
+    if sum(r.theme_count for r in rows) == 0:
+        return {}
+    theme_sum = {k: sum(max(0.0, getattr(r, THEME_COLUMNS[k])) for r in rows) for k in THEME_KEYS}
+    total_theme = sum(theme_sum.values()) or 1.0
+    return {k: round(theme_sum[k] / total_theme, 3) for k in THEME_KEYS}
+
+
+def rollup_months(db: Session, user_id: int) -> List[str]:
+    """"YYYY-MM" (UTC) of every month with at least one entry, newest first."""
+    month = func.to_char(UserDailyRollup.day, "YYYY-MM")
+    rows = (
+        db.query(month)
+        .filter(UserDailyRollup.user_id == user_id, UserDailyRollup.entry_count > 0)
+        .group_by(month)
+        .order_by(month.desc())
+        .all()
+    )
+    return [r[0] for r in rows]
@@ -0,0 +1,116 @@
+# backend/services/scheduled_jobs.py
+#
+# Off-peak precomputation, run by core.scheduler in one worker. Every job
+# works on the users active in the last SCHEDULER_ACTIVE_DAYS days, at most
+# SCHEDULER_USER_CONCURRENCY users at a time.
+
+from __future__ import annotations
+
+import asyncio
+import os
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List
+
+from database import SessionLocal
+from models import User, UserDailyRollup
+from core.llm_cache import LLM_CACHE_ENABLED
+from core.scheduler import run_bounded, scheduler
+from .entry_aggregates import rollup_mismatches
+from .insights_service import refresh_note
+from .rollup_service import rebuild_rollups
+from .time_capsule_service import get_time_capsule
+
+
+SCHEDULER_ACTIVE_DAYS = int(os.getenv("SCHEDULER_ACTIVE_DAYS", "14"))
+SCHEDULER_USER_CONCURRENCY = int(os.getenv("SCHEDULER_USER_CONCURRENCY", "4"))
+
+# Cron expressions, UTC
+SCHEDULE_TIME_CAPSULES = os.getenv("SCHEDULE_TIME_CAPSULES", "15 0 * * *")
+SCHEDULE_INSIGHTS_NOTES = os.getenv("SCHEDULE_INSIGHTS_NOTES", "0 3 * * *")
+SCHEDULE_ROLLUP_RECONCILE = os.getenv("SCHEDULE_ROLLUP_RECONCILE", "30 4 * * *")
+
+
+def active_user_ids(days: int = SCHEDULER_ACTIVE_DAYS) -> List[int]:
+    """Users with at least one entry in the last `days` days (from the daily rollups)."""
+    since = datetime.now(timezone.utc).date() - timedelta(days=days)
+    db = SessionLocal()
+    try:
+        rows = (
+            db.query(UserDailyRollup.user_id)
+            .filter(UserDailyRollup.day >= since, UserDailyRollup.entry_count > 0)
+            .distinct()
+            .order_by(UserDailyRollup.user_id)
+            .all()
+        )
+        return [row[0] for row in rows]
+    finally:
+        db.close()
+
+
+# -----------------------------
+# Jobs
+# -----------------------------
+@scheduler.job("insights_notes", SCHEDULE_INSIGHTS_NOTES)
+async def precompute_insights_notes() -> Dict[str, int]:
+    """Regenerate this week's and this month's notes whose data changed."""
+    user_ids = await asyncio.to_thread(active_user_ids)
+
+    async def _one(user_id: int) -> int:
+        generated = 0
+        for range_type in ("week", "month"):
+            generated += await refresh_note(user_id, range_type)
+        return generated
+
+    results, failures = await run_bounded(user_ids, _one, SCHEDULER_USER_CONCURRENCY)
+    return {"users": len(user_ids), "generated": sum(results), "failures": failures}
+
+
+@scheduler.job("time_capsules", SCHEDULE_TIME_CAPSULES)
+async def precompute_time_capsules() -> Dict[str, int]:
+    """Pick today's time-capsule quote; the LLM response cache then serves the user's request."""
+    if not LLM_CACHE_ENABLED:
+        return {"users": 0, "found": 0, "failures": 0}
+    user_ids = await asyncio.to_thread(active_user_ids)
+
+    async def _one(user_id: int) -> bool:
+        db = SessionLocal()
+        try:
+            user = await asyncio.to_thread(db.get, User, user_id)
+            if user is None:
+                return False
+            return (await get_time_capsule(db, user))["found"]
+        finally:
+            db.close()
+
+    results, failures = await run_bounded(user_ids, _one, SCHEDULER_USER_CONCURRENCY)
+    return {"users": len(user_ids), "found": sum(results), "failures": failures}
+
+
+def _reconcile_user(user_id: int) -> int:
+    db = SessionLocal()
+    try:
+        days = rollup_mismatches(db, user_id)
+        if days:
+            rebuild_rollups(db, user_id)
+            db.commit()
+            print(f"[scheduler] rebuilt rollups of user {user_id}: {len(days)} day(s) had drifted")
+        return len(days)
+    finally:
+        db.close()
+
+
+@scheduler.job("rollup_reconcile", SCHEDULE_ROLLUP_RECONCILE)
+async def reconcile_rollups() -> Dict[str, int]:
+    """Compare active users' rollups with their entries and rebuild the ones that drifted."""
+    user_ids = await asyncio.to_thread(active_user_ids)
+
+    async def _one(user_id: int) -> int:
+        return await asyncio.to_thread(_reconcile_user, user_id)
+
+    results, failures = await run_bounded(user_ids, _one, SCHEDULER_USER_CONCURRENCY)
+    return {
+        "users": len(user_ids),
+        "rebuilt": sum(1 for days in results if days),
+        "days": sum(results),
+        "failures": failures,
+    }
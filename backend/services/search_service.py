@@ -0,0 +1,70 @@
+# backend/services/search_service.py
+#
+# Full-text search over journal content. Matching uses the generated
+# content_tsv column (GIN index); results are ranked with ts_rank_cd and
+# paged by keyset on (rank, id). Snippets (ts_headline, which re-parses the
+# content) are built only for the rows of the returned page.
+
+from __future__ import annotations
+
+from typing import List, Optional, Tuple
+
+from sqlalchemy import REAL, cast, func, literal_column, select, tuple_
+from sqlalchemy.orm import Session
+
+from models import JournalEntry
+from models.entry import SEARCH_CONFIG
+
+# Snippet markup: matched words are wrapped in <mark>...</mark>
+HEADLINE_OPTIONS = "StartSel=<mark>, StopSel=</mark>, MaxWords=30, MinWords=12, MaxFragments=2, FragmentDelimiter= … "
+
+
+def search_entries(
+    db: Session,
+    user_id: int,
+    q: str,
+    limit: int,
+    after: Optional[Tuple[float, int]] = None,
+    emotion: Optional[str] = None,
+    theme: Optional[str] = None,
+    filters: Optional[list] = None,
+) -> List:
+    """Up to `limit` matches, best first: rows of (id, summary, created_at,
+    emotion, primary_theme, rank, snippet). `after` is the (rank, id) of the
+    last row of the previous page; `filters` are extra JournalEntry conditions."""
+    config = literal_column(f"'{SEARCH_CONFIG}'::regconfig")
+    query = func.websearch_to_tsquery(config, q)
+    rank = func.ts_rank_cd(JournalEntry.content_tsv, query)
+
+    matches = select(JournalEntry.id.label("id"), rank.label("rank")).where(
+        JournalEntry.user_id == user_id,
+        JournalEntry.deleted == False,
+        JournalEntry.content_tsv.op("@@")(query),
+    )
+    if emotion:
+        matches = matches.where(JournalEntry.emotion == emotion)
+    if theme:
+        matches = matches.where(JournalEntry.primary_theme == theme)
+    if filters:
+        matches = matches.where(*filters)
+    if after is not None:
+        # ts_rank_cd is real: compare as real, or the cursor row's own rank would not round-trip
+        after_rank, after_id = after
+        matches = matches.where(tuple_(rank, JournalEntry.id) < tuple_(cast(after_rank, REAL), after_id))
+
+    page = matches.order_by(rank.desc(), JournalEntry.id.desc()).limit(limit).subquery()
+
+    stmt = (
+        select(
+            JournalEntry.id,
+            JournalEntry.summary,
+            JournalEntry.created_at,
+            JournalEntry.emotion,
+            JournalEntry.primary_theme,
+            page.c.rank,
+            func.ts_headline(config, JournalEntry.content, query, HEADLINE_OPTIONS).label("snippet"),
+        )
+        .join(page, page.c.id == JournalEntry.id)
+        .order_by(page.c.rank.desc(), JournalEntry.id.desc())
+    )
+    return db.execute(stmt).all()
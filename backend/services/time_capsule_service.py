@@ -2,7 +2,9 @@ from __future__ import annotations
 
 from datetime import date, datetime, timedelta, timezone
 from typing import Optional
+import asyncio
 import calendar
+import os
 import re
 
 from sqlalchemy.orm import Session
@@ -10,6 +12,14 @@ from sqlalchemy.orm import Session
 from models import JournalEntry, User, AICompanion
 from core.ai_client import call_siliconflow
 from fastapi import HTTPException
+from .embedding_service import most_similar_before
+
+
+# Fallback when no entry exists exactly a year/month/week ago: the entry most
+# similar to the latest one among entries written more than SIMILAR_MIN_AGE_DAYS
+# days ago, if its cosine is at least SIMILAR_MIN_SCORE
+SIMILAR_MIN_AGE_DAYS = int(os.getenv("TIME_CAPSULE_SIMILAR_MIN_AGE_DAYS", "7"))
+SIMILAR_MIN_SCORE = float(os.getenv("TIME_CAPSULE_SIMILAR_MIN_SCORE", "0.15"))
 
 
 def _get_companion_or_default(db: Session, current_user: User) -> AICompanion:
@@ -128,12 +138,12 @@ def _fallback_quote(content: str) -> str:
     return sentences[0][:120].strip()
 
 
-def _extract_quote_with_ai(db: Session, current_user: User, content: str) -> str:
-    companion = _get_companion_or_default(db, current_user)
+async def _extract_quote_with_ai(db: Session, current_user: User, content: str) -> str:
+    companion = await asyncio.to_thread(_get_companion_or_default, db, current_user)
     prompt = _build_time_capsule_prompt(content, companion)
 
     try:
-        raw = call_siliconflow(prompt)
+        raw = await call_siliconflow(prompt, call_type="quote", user_id=current_user.id)
     except Exception:
         return _fallback_quote(content)
 
@@ -148,15 +158,44 @@ def _extract_quote_with_ai(db: Session, current_user: User, content: str) -> str
     return quote
 
 
-def get_time_capsule(db: Session, current_user: User) -> dict:
-    today = datetime.now(timezone.utc).date()
+def _find_similar_past_entry(db: Session, user_id: int, today: date) -> Optional[JournalEntry]:
+    """Fallback: the older entry closest in content to the latest one."""
+    latest = (
+        db.query(JournalEntry)
+        .filter(JournalEntry.user_id == user_id, JournalEntry.deleted == False)
+        .order_by(JournalEntry.created_at.desc())
+        .first()
+    )
+    if not latest:
+        return None
 
+    before = today - timedelta(days=SIMILAR_MIN_AGE_DAYS)
+    match = most_similar_before(db, user_id, latest.id, before, SIMILAR_MIN_SCORE)
+    if not match:
+        return None
+    return db.query(JournalEntry).filter(JournalEntry.id == match[0]).first()
+
+
+def _find_capsule_entry(db: Session, user_id: int, today: date) -> Optional[tuple[str, date, JournalEntry]]:
     for level, target_date in _candidate_dates(today):
-        entry = _find_entry_on_date(db, current_user.id, target_date)
-        if not entry:
-            continue
+        entry = _find_entry_on_date(db, user_id, target_date)
+        if entry:
+            return level, target_date, entry
+
+    entry = _find_similar_past_entry(db, user_id, today)
+    if entry:
+        return "similar", entry.created_at.astimezone(timezone.utc).date(), entry
+    return None
+
+
+async def get_time_capsule(db: Session, current_user: User) -> dict:
+    today = datetime.now(timezone.utc).date()
 
-        quote = _extract_quote_with_ai(db, current_user, entry.content)
+    # DB lookups run in a worker thread; only the LLM call awaits on the loop
+    found = await asyncio.to_thread(_find_capsule_entry, db, current_user.id, today)
+    if found:
+        level, target_date, entry = found
+        quote = await _extract_quote_with_ai(db, current_user, entry.content)
         return {
             "found": True,
             "source_date": target_date,
@@ -0,0 +1,11 @@
+# backend/startup/ai_client.py
+
+from fastapi import FastAPI
+from core.ai_client import close_client
+
+
+def register_startup_event(app: FastAPI):
+    @app.on_event("shutdown")
+    async def close_llm_client():
+        # Release pooled keep-alive connections to the LLM provider
+        await close_client()
@@ -0,0 +1,35 @@
+# backend/startup/daily_rollups.py
+
+from fastapi import FastAPI
+from sqlalchemy import text
+
+from database import SessionLocal
+from models import JournalEntry, UserDailyRollup, UserPeriodRollup
+from services.rollup_service import rebuild_period_rollups, rebuild_rollups
+
+# Arbitrary constant shared by all workers so only one of them backfills
+_BACKFILL_LOCK_ID = 0x726F6C6C  # "roll"
+
+
+def backfill_daily_rollups():
+    """First deploy of user_daily_rollup (and of its week/month tiers): build
+    it from the existing entries once."""
+    db = SessionLocal()
+    try:
+        # Transaction-scoped lock: other workers wait, then see a filled table
+        db.execute(text("SELECT pg_advisory_xact_lock(:k)"), {"k": _BACKFILL_LOCK_ID})
+        if db.query(UserDailyRollup.user_id).first() is None and db.query(JournalEntry.id).first() is not None:
+            rows = rebuild_rollups(db)
+            print(f"[rollups] backfilled {rows} daily rollup rows")
+        elif db.query(UserPeriodRollup.user_id).first() is None and db.query(UserDailyRollup.user_id).first() is not None:
+            rows = rebuild_period_rollups(db)
+            print(f"[rollups] backfilled {rows} week/month rollup rows")
+        db.commit()
+    finally:
+        db.close()
+
+
+def register_startup_event(app: FastAPI):
+    @app.on_event("startup")
+    def run_rollup_backfill():
+        backfill_daily_rollups()
@@ -0,0 +1,20 @@
+# backend/startup/scheduler.py
+
+from fastapi import FastAPI
+
+from core.scheduler import SCHEDULER_ENABLED, scheduler
+import services.scheduled_jobs  # noqa: F401  (registers the jobs)
+
+
+def register_startup_event(app: FastAPI):
+    if not SCHEDULER_ENABLED:
+        return
+
+    @app.on_event("startup")
+    async def start_scheduler():
+        # Every worker runs the loop; only the advisory-lock holder runs jobs
+        scheduler.start()
+
+    @app.on_event("shutdown")
+    async def stop_scheduler():
+        await scheduler.stop()
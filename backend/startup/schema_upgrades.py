@@ -0,0 +1,34 @@
+# backend/startup/schema_upgrades.py
+
+from fastapi import FastAPI
+from sqlalchemy import text
+
+from database import engine
+from models.entry import SEARCH_CONFIG
+
+# Base.metadata.create_all only creates missing tables; columns added to
+# existing tables are applied here. Every statement must be idempotent.
+# Adding the generated search column rewrites journal_entries once; its GIN
+# index is built separately (scripts/create_indexes_concurrently.py).
+SCHEMA_UPGRADES = [
+    "ALTER TABLE journal_entries "
+    "ADD COLUMN IF NOT EXISTS analysis_status VARCHAR(20) NOT NULL DEFAULT 'done'",
+    "ALTER TABLE analysis_jobs "
+    "ADD COLUMN IF NOT EXISTS import_job_id INTEGER REFERENCES import_jobs(id)",
+    "CREATE INDEX IF NOT EXISTS ix_analysis_jobs_import_job_id ON analysis_jobs (import_job_id)",
+    "ALTER TABLE journal_entries "
+    "ADD COLUMN IF NOT EXISTS content_tsv TSVECTOR "
+    f"GENERATED ALWAYS AS (to_tsvector('{SEARCH_CONFIG}'::regconfig, content)) STORED",
+]
+
+
+def apply_schema_upgrades():
+    with engine.begin() as conn:
+        for stmt in SCHEMA_UPGRADES:
+            conn.execute(text(stmt))
+
+
+def register_startup_event(app: FastAPI):
+    @app.on_event("startup")
+    def run_schema_upgrades():
+        apply_schema_upgrades()
@@ -0,0 +1,20 @@
+# backend/tests/test_calendar.py
+
+import base64
+from datetime import date
+from types import SimpleNamespace
+
+import services.calendar_service as calendar_service
+
+
+def test_year_calendar_encoding(monkeypatch):
+    rows = [SimpleNamespace(day=date(2024, 1, 1), entry_count=1), SimpleNamespace(day=date(2024, 12, 31), entry_count=300)]
+    monkeypatch.setattr(calendar_service, "daily_rollups", lambda db, user_id, start, end: rows)
+
+    data = calendar_service.build_year_calendar(None, SimpleNamespace(id=1), 2024)
+    counts = base64.b64decode(data["counts"])
+
+    assert data["days"] == len(counts) == len(data["paw"]) == 366
+    assert counts[0] == 1 and counts[-1] == 255 and sum(counts[1:-1]) == 0
+    assert data["paw"][0] == "1" and data["paw"][-1] == "2" and set(data["paw"][1:-1]) == {"0"}
+    assert (data["total_entries"], data["active_days"]) == (301, 2)
@@ -0,0 +1,48 @@
+# backend/tests/test_embeddings.py
+
+import numpy as np
+
+from core.embeddings import EMBEDDING_DIM, cosine_scores, embed, from_bytes, to_bytes
+from services.embedding_service import UserIndex, _top
+
+
+def _cos(a, b):
+    return float(cosine_scores(a[None, :], np.array([np.linalg.norm(a.astype(np.float32))]), b)[0])
+
+
+def test_embed_is_compact_and_deterministic():
+    vec = embed("Deadline at work, my manager moved the project again.")
+
+    assert vec.dtype == np.int8 and vec.shape == (EMBEDDING_DIM,)
+    assert np.abs(vec).max() == 127
+    assert np.array_equal(from_bytes(to_bytes(vec)), vec)
+    assert np.array_equal(embed("Deadline at work, my manager moved the project again."), vec)
+
+
+def test_stopwords_only_text_is_empty():
+    assert not embed("I was in the, and it was so").any()
+
+
+def test_related_entries_score_higher():
+    query = embed("Project deadline at the office, my manager wants the report")
+    related = embed("The manager moved the project deadline and the report is late")
+    unrelated = embed("Painted watercolors in the park with my sister")
+
+    assert _cos(related, query) > _cos(unrelated, query) + 0.2
+
+
+def test_top_masks_and_orders():
+    matrix = np.array([[127, 0], [90, 90], [0, 127], [127, 10]], dtype=np.int8)
+    index = UserIndex(
+        stamp=(4, 4),
+        ids=np.array([1, 2, 3, 4]),
+        days=np.array([10, 11, 12, 13]),
+        matrix=matrix,
+        norms=np.linalg.norm(matrix.astype(np.float32), axis=1),
+    )
+    query = np.array([127, 0], dtype=np.int8)
+
+    best = _top(index, query, index.ids != 1, limit=2, min_score=0.1)
+    assert [i for i, _ in best] == [4, 2]
+
+    assert _top(index, query, index.days < 12, limit=5, min_score=0.9) == [(1, 1.0)]
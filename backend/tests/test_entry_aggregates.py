@@ -0,0 +1,122 @@
+# backend/tests/test_entry_aggregates.py
+
+import random
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+
+import numpy as np
+
+from services.entry_aggregates import (
+    daily_sums,
+    emotion_counts,
+    entry_arrays,
+    normalize_theme_matrix,
+    theme_distribution,
+    valence_means,
+)
+from services.entry_metrics import EMOTIONS, THEME_KEYS, normalize_theme_scores
+from services.rollup_service import (
+    SUM_COLUMNS,
+    _add,
+    entry_contribution,
+    rollup_day,
+    rollup_emotion_counts,
+    rollup_theme_distribution,
+)
+
+ODD_SCORES = [
+    None,
+    "not json",
+    '{"work": 0.5, "social": "0.5"}',
+    ["work"],
+    {},
+    {"work": 0, "hobbies": 0},
+    {"work": -1, "other": 2},
+    {"work": "abc", "hobbies": 1},
+    {"work": 1e-300, "hobbies": 1e-300},
+    {"work": 0.1, "hobbies": 0.2, "social": 0.3, "other": 0.4},
+]
+
+
+def _random_entries(n, seed=7):
+    rng = random.Random(seed)
+    start = datetime(2025, 1, 1, tzinfo=timezone.utc)
+    entries = []
+    for _ in range(n):
+        scores = (
+            rng.choice(ODD_SCORES) if rng.random() < 0.2
+            else {k: round(rng.random(), rng.choice([1, 3, 6])) for k in THEME_KEYS if rng.random() < 0.8}
+        )
+        entries.append({
+            "user_id": 1,
+            "created_at": start + timedelta(minutes=rng.randrange(0, 60 * 24 * 90)),
+            "content": " ".join("word" for _ in range(rng.randrange(0, 30))),
+            "emotion": rng.choice([*EMOTIONS, None, "bored"]),
+            "emotion_intensity": rng.choice([1, 2, 3, None, 7]),
+            "theme_scores": scores,
+            "deleted": rng.random() < 0.05,
+        })
+    return entries
+
+
+def test_theme_matrix_matches_per_entry_normalization():
+    entries = _random_entries(2000)
+    arrays = entry_arrays(entries)
+    normalized, valid = normalize_theme_matrix(arrays.themes)
+
+    live = [e for e in entries if not e["deleted"]]
+    for row, ok, entry in zip(normalized, valid, live):
+        expected = normalize_theme_scores(entry["theme_scores"])
+        assert bool(ok) == (expected is not None)
+        if expected is not None:
+            assert row.tolist() == [expected[k] for k in THEME_KEYS]
+
+
+def test_daily_sums_identical_to_incremental_contributions():
+    entries = _random_entries(5000)
+
+    changes = {}
+    for entry in entries:
+        _add(changes, entry_contribution(entry), +1)
+
+    sums = daily_sums(entry_arrays(entries))
+
+    assert [d.toordinal() for (_, d) in sorted(changes)] == sums.days.tolist()
+    for i, (_, day) in enumerate(sorted(changes)):
+        deltas = changes[(1, day)]
+        for col in SUM_COLUMNS:
+            assert sums.columns[col][i] == deltas.get(col, 0), (day, col)
+
+
+def test_reads_match_rollup_reads():
+    entries = _random_entries(3000)
+    changes = {}
+    for entry in entries:
+        _add(changes, entry_contribution(entry), +1)
+    rows = [
+        SimpleNamespace(day=day, **{col: deltas.get(col, 0) for col in SUM_COLUMNS})
+        for (_, day), deltas in sorted(changes.items())
+    ]
+
+    sums = daily_sums(entry_arrays(entries))
+
+    assert theme_distribution(sums) == rollup_theme_distribution(rows)
+    assert emotion_counts(sums) == rollup_emotion_counts(rows)
+    assert valence_means(sums).tolist() == [r.valence_sum / r.entry_count for r in rows]
+
+
+def test_empty_range():
+    sums = daily_sums(entry_arrays([]))
+
+    assert len(sums.days) == 0
+    assert theme_distribution(sums) == {}
+    assert emotion_counts(sums) == {}
+
+
+def test_days_are_utc():
+    local = datetime(2025, 3, 1, 23, 30, tzinfo=timezone(timedelta(hours=-5)))
+    entry = {**_random_entries(1)[0], "created_at": local, "deleted": False}
+
+    sums = daily_sums(entry_arrays([entry]))
+    assert sums.days.tolist() == [rollup_day(local).toordinal()] == [datetime(2025, 3, 2).toordinal()]
+    assert np.array_equal(sums.columns["entry_count"], [1])
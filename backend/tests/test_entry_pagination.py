@@ -0,0 +1,24 @@
+# backend/tests/test_entry_pagination.py
+
+from datetime import datetime, timezone
+
+import pytest
+from fastapi import HTTPException
+
+from routers.entries import _decode_cursor, _encode_cursor
+
+
+def test_cursor_round_trip_keeps_microseconds():
+    created_at = datetime(2026, 3, 14, 8, 30, 5, 123456, tzinfo=timezone.utc)
+    cursor = _encode_cursor(created_at, 42)
+
+    assert "=" not in cursor
+    assert _decode_cursor(cursor) == (created_at, 42)
+
+
+@pytest.mark.parametrize("cursor", ["garbage", _encode_cursor(datetime(2026, 1, 1), 1), "WyIyMDI2LTAxLTAxIl0"])
+def test_invalid_cursor_is_rejected(cursor):
+    # bad base64/JSON, naive timestamp, wrong shape
+    with pytest.raises(HTTPException) as exc:
+        _decode_cursor(cursor)
+    assert exc.value.status_code == 400
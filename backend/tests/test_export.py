@@ -0,0 +1,58 @@
+# backend/tests/test_export.py
+
+import csv
+import io
+import json
+
+import services.export_service as export_service
+
+
+def _fake_batches(batches):
+    def fake(user_id, after_id):
+        for batch in batches:
+            yield [dict(r) for r in batch]
+    return fake
+
+
+ROW = {
+    "id": 5,
+    "created_at": "2026-03-01T10:00:00+00:00",
+    "content": 'Long day, "really"\nlong',
+    "summary": "Long day",
+    "emotion": "tired",
+    "emotion_intensity": 3,
+    "primary_theme": "work",
+    "theme_scores": {"work": 0.8, "other": 0.2},
+    "ai_reply": None,
+    "ai_reply_created_at": None,
+    "comments": [{"content": "later: better", "created_at": "2026-03-02T09:00:00"}],
+}
+
+
+def test_ndjson_one_line_per_entry(monkeypatch):
+    monkeypatch.setattr(export_service, "_batches", _fake_batches([[ROW], [{**ROW, "id": 6}]]))
+
+    chunks = list(export_service.iter_export(1, "ndjson"))
+
+    assert len(chunks) == 2  # one chunk per cursor batch
+    records = [json.loads(line) for line in "".join(chunks).splitlines()]
+    assert [r["id"] for r in records] == [5, 6]
+    assert records[0] == ROW
+
+
+def test_csv_header_once_and_json_columns(monkeypatch):
+    monkeypatch.setattr(export_service, "_batches", _fake_batches([[ROW], [{**ROW, "id": 6, "theme_scores": None}]]))
+
+    rows = list(csv.DictReader(io.StringIO("".join(export_service.iter_export(1, "csv")))))
+
+    assert [r["id"] for r in rows] == ["5", "6"]
+    assert rows[0]["content"] == ROW["content"]
+    assert json.loads(rows[0]["theme_scores"]) == ROW["theme_scores"]
+    assert rows[1]["theme_scores"] == ""
+    assert json.loads(rows[0]["comments"]) == ROW["comments"]
+
+
+def test_csv_empty_export_is_header_only(monkeypatch):
+    monkeypatch.setattr(export_service, "_batches", _fake_batches([]))
+
+    assert "".join(export_service.iter_export(1, "csv")).strip() == ",".join(export_service.EXPORT_FIELDS)
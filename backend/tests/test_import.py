@@ -0,0 +1,46 @@
+# backend/tests/test_import.py
+
+import io
+from datetime import datetime, timezone
+
+import pytest
+
+from services.import_service import _entry_values, _records
+
+
+def test_jsonl_records_keep_line_numbers_and_bad_json():
+    body = b'{"content": "a", "created_at": "2024-01-01"}\n\n{oops\n{"content": "b"}\n'
+
+    records = list(_records(io.BytesIO(body), "jsonl"))
+
+    assert [n for n, _ in records] == [1, 3, 4]
+    assert isinstance(records[1][1], ValueError)
+
+
+def test_csv_records_allow_multiline_fields():
+    body = 'content,created_at\n"two\nlines",2024-01-01T10:00:00Z\nnext,2024-01-02\n'.encode("utf-8-sig")
+
+    records = list(_records(io.BytesIO(body), "csv"))
+
+    assert [r["content"] for _, r in records] == ["two\nlines", "next"]
+    assert [n for n, _ in records] == [3, 4]
+
+
+def test_entry_values_default_to_utc():
+    values = _entry_values({"content": "x", "created_at": "2024-03-01T21:00:00", "id": 9})
+    assert values == {"content": "x", "created_at": datetime(2024, 3, 1, 21, tzinfo=timezone.utc)}
+
+
+@pytest.mark.parametrize(
+    "record",
+    [
+        {"content": "  ", "created_at": "2024-01-01"},
+        {"content": "x"},
+        {"content": "x", "created_at": "yesterday"},
+        {"content": "x", "created_at": "2999-01-01"},
+        ["x", "2024-01-01"],
+    ],
+)
+def test_entry_values_rejects(record):
+    with pytest.raises(ValueError):
+        _entry_values(record)
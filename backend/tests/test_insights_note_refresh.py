@@ -0,0 +1,69 @@
+# backend/tests/test_insights_note_refresh.py
+
+import asyncio
+from datetime import date
+
+import services.insights_service as insights
+from services.insights_service import get_datetime_range_utc
+
+
+def _patch_refresh(monkeypatch, calls):
+    async def fake_refresh(user_id, range_type, start, end):
+        calls.append((user_id, range_type, start, end))
+
+    monkeypatch.setattr(insights, "INSIGHTS_NOTE_DEBOUNCE_SECONDS", 0.05)
+    monkeypatch.setattr(insights, "_refresh_stale_note", fake_refresh)
+
+
+def test_burst_of_stale_reads_refreshes_once(monkeypatch):
+    calls = []
+    _patch_refresh(monkeypatch, calls)
+    start, end = get_datetime_range_utc("week", date(2025, 11, 19))
+
+    async def run():
+        for _ in range(5):
+            insights._schedule_note_refresh(1, "week", start, end)
+        assert calls == []  # nothing runs before the debounce delay
+        await asyncio.sleep(0.15)
+        assert len(calls) == 1
+
+        # Once done, the next stale read schedules a new refresh
+        insights._schedule_note_refresh(1, "week", start, end)
+        await asyncio.sleep(0.15)
+        assert len(calls) == 2
+
+    asyncio.run(run())
+    assert insights._pending_refresh == {}
+
+
+def test_refreshes_are_per_note(monkeypatch):
+    calls = []
+    _patch_refresh(monkeypatch, calls)
+    week = get_datetime_range_utc("week", date(2025, 11, 19))
+    month = get_datetime_range_utc("month", date(2025, 11, 19))
+
+    async def run():
+        insights._schedule_note_refresh(1, "week", *week)
+        insights._schedule_note_refresh(1, "month", *month)
+        insights._schedule_note_refresh(2, "week", *week)
+        await asyncio.sleep(0.15)
+
+    asyncio.run(run())
+    assert sorted((c[0], c[1]) for c in calls) == [(1, "month"), (1, "week"), (2, "week")]
+
+
+def test_failed_refresh_is_logged_and_cleared(monkeypatch, capsys):
+    async def broken(user_id, range_type, start, end):
+        raise RuntimeError("provider down")
+
+    monkeypatch.setattr(insights, "INSIGHTS_NOTE_DEBOUNCE_SECONDS", 0.0)
+    monkeypatch.setattr(insights, "_refresh_stale_note", broken)
+    start, end = get_datetime_range_utc("week", date(2025, 11, 19))
+
+    async def run():
+        insights._schedule_note_refresh(1, "week", start, end)
+        await asyncio.sleep(0.05)
+
+    asyncio.run(run())
+    assert "note refresh failed" in capsys.readouterr().out
+    assert insights._pending_refresh == {}
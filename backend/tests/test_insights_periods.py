@@ -0,0 +1,49 @@
+# backend/tests/test_insights_periods.py
+
+from datetime import date, datetime, timezone
+
+from services.insights_service import custom_range_utc, get_datetime_range_utc, trend_granularity
+from services.rollup_service import period_end, period_start
+
+
+def _days(range_utc):
+    start, end = range_utc
+    return start.date(), end.date()
+
+
+def test_periods_containing_an_anchor():
+    anchor = date(2025, 11, 19)  # a Wednesday
+
+    assert _days(get_datetime_range_utc("week", anchor)) == (date(2025, 11, 17), date(2025, 11, 24))
+    assert _days(get_datetime_range_utc("month", anchor)) == (date(2025, 11, 1), date(2025, 12, 1))
+    assert _days(get_datetime_range_utc("quarter", anchor)) == (date(2025, 10, 1), date(2026, 1, 1))
+    assert _days(get_datetime_range_utc("year", anchor)) == (date(2025, 1, 1), date(2026, 1, 1))
+    assert _days(get_datetime_range_utc("month", date(2025, 12, 31))) == (date(2025, 12, 1), date(2026, 1, 1))
+    assert _days(get_datetime_range_utc("quarter", date(2025, 1, 1))) == (date(2025, 1, 1), date(2025, 4, 1))
+
+
+def test_ranges_are_utc_midnights():
+    start, end = get_datetime_range_utc("quarter", date(2025, 5, 5))
+
+    assert start == datetime(2025, 4, 1, tzinfo=timezone.utc)
+    assert end == datetime(2025, 7, 1, tzinfo=timezone.utc)
+
+
+def test_custom_range_includes_the_end_day():
+    assert _days(custom_range_utc(date(2025, 2, 27), date(2025, 3, 1))) == (date(2025, 2, 27), date(2025, 3, 2))
+
+
+def test_trend_granularity():
+    assert trend_granularity("month", *get_datetime_range_utc("month", date(2025, 1, 9))) == "day"
+    assert trend_granularity("quarter", *get_datetime_range_utc("quarter", date(2025, 1, 9))) == "week"
+    assert trend_granularity("year", *get_datetime_range_utc("year", date(2025, 1, 9))) == "month"
+    assert trend_granularity("custom", *custom_range_utc(date(2025, 1, 1), date(2025, 2, 28))) == "day"
+    assert trend_granularity("custom", *custom_range_utc(date(2025, 1, 1), date(2025, 5, 31))) == "week"
+    assert trend_granularity("custom", *custom_range_utc(date(2024, 1, 1), date(2025, 5, 31))) == "month"
+
+
+def test_period_bounds():
+    assert period_start(date(2025, 3, 2), "week") == date(2025, 2, 24)
+    assert period_end(date(2025, 2, 24), "week") == date(2025, 3, 3)
+    assert period_start(date(2025, 12, 31), "month") == date(2025, 12, 1)
+    assert period_end(date(2025, 12, 1), "month") == date(2026, 1, 1)
@@ -0,0 +1,91 @@
+# backend/tests/test_json_extract.py
+
+import json
+import time
+
+from core.json_extract import extract_json_array, extract_json_object
+from services.ai_reply_service import _extract_json, _parse_llm_result
+
+REPLY = {
+    "reply": "That sounds exhausting. What helped, even a little?",
+    "emotion": "sadness",
+    "intensity": 3,
+    "theme_scores": {"work": 0.7, "social": 0.3},
+    "primary_theme": "work",
+}
+
+
+def test_plain_fenced_and_wrapped_objects():
+    raw = json.dumps(REPLY)
+
+    assert extract_json_object(raw) == REPLY
+    assert extract_json_object(f"```json\n{raw}\n```") == REPLY
+    assert extract_json_object(f"Sure! Here is the JSON:\n```\n{raw}\n```\nLet me know {{if}} needed.") == REPLY
+    assert extract_json_object(f"Here it is: {raw} and {{another}} one") == REPLY
+
+
+def test_braces_and_quotes_inside_strings_and_prose():
+    data = {"reply": 'She said "fine}" and left {again', "emotion": "angry"}
+    raw = f"Note: {{placeholder}} first, then {json.dumps(data)}"
+
+    assert extract_json_object(raw) == data
+
+
+def test_truncated_object_keeps_complete_fields():
+    raw = json.dumps(REPLY)
+
+    cut_in_reply = raw[:raw.index("exhausting") + 4]
+    assert extract_json_object(cut_in_reply) == {"reply": "That sounds exha"}
+
+    cut_after_key = raw[:raw.index('"intensity"') + len('"intensity"')]
+    assert extract_json_object(cut_after_key) == {"reply": REPLY["reply"], "emotion": "sadness"}
+
+    cut_in_scores = raw[:raw.index('"social"') + 4]
+    assert extract_json_object(cut_in_scores) == {
+        "reply": REPLY["reply"], "emotion": "sadness", "intensity": 3, "theme_scores": {"work": 0.7},
+    }
+
+
+def test_truncated_after_escape():
+    assert extract_json_object('{"reply": "a \\"quoted\\" word \\') == {"reply": 'a "quoted" word '}
+
+
+def test_no_json_falls_back_to_reply_text():
+    assert extract_json_object("Just a plain reply with {no json}.") is None
+    assert _extract_json("  Just a plain reply.  ")["reply"] == "Just a plain reply."
+    assert _parse_llm_result("Just a plain reply.")["emotion"] is None
+
+
+def test_parse_llm_result_from_truncated_completion():
+    raw = "```json\n" + json.dumps(REPLY)[:-30]
+
+    parsed = _parse_llm_result(raw)
+    assert parsed["reply"] == REPLY["reply"]
+    assert parsed["emotion"] == "sadness"
+    assert parsed["intensity"] == 3
+
+
+def test_arrays_and_wrapped_results():
+    items = [{"index": 0, "emotion": "joy"}, {"index": 1, "emotion": "calm"}]
+
+    assert extract_json_array(json.dumps(items)) == items
+    assert extract_json_array("Results:\n```json\n" + json.dumps({"results": items}) + "\n```") == items
+    assert extract_json_array('{"note": "see [1]", "entries": ' + json.dumps(items) + "}") == items
+    assert extract_json_array("[citation needed] " + json.dumps(items)) == items
+    assert extract_json_array("nothing here") is None
+
+
+def test_truncated_array_drops_partial_item():
+    raw = json.dumps([{"index": 0, "emotion": "joy"}, {"index": 1, "emotion": "calm"}])
+    cut = raw[:raw.rindex("calm")]
+
+    assert extract_json_array(cut)[0] == {"index": 0, "emotion": "joy"}
+
+
+def test_adversarial_input_is_linear():
+    cases = ["{" * 50_000, "[" * 25_000 + "," * 25_000, '{"a": "' + "\\" * 50_001, "{x} " * 12_500]
+    for text in cases:
+        started = time.perf_counter()
+        extract_json_object(text)
+        extract_json_array(text)
+        assert time.perf_counter() - started < 1.0
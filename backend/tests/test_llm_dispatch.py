@@ -0,0 +1,132 @@
+# backend/tests/test_llm_dispatch.py
+
+import asyncio
+
+import pytest
+
+from core.llm_dispatch import LLMDispatcher
+
+
+async def _hold(dispatcher, call_type, user_id, order, release):
+    async with dispatcher.slot(call_type, user_id):
+        order.append((call_type, user_id))
+        await release.wait()
+
+
+async def _start_queued(dispatcher, calls, order, release):
+    """Fill the only slot, queue calls behind it, then free the slot."""
+    blocker = asyncio.Event()
+    first = asyncio.create_task(_hold(dispatcher, "analysis", 0, [], blocker))
+    await asyncio.sleep(0)
+    tasks = []
+    for call_type, user_id in calls:
+        tasks.append(asyncio.create_task(_hold(dispatcher, call_type, user_id, order, release)))
+        await asyncio.sleep(0)
+    blocker.set()
+    await first
+    return tasks
+
+
+def _run_in_order(dispatcher, calls):
+    order = []
+
+    async def run():
+        release = asyncio.Event()
+        release.set()  # each call finishes as soon as it starts
+        tasks = await _start_queued(dispatcher, calls, order, release)
+        await asyncio.gather(*tasks)
+
+    asyncio.run(run())
+    return order
+
+
+def test_priority_classes():
+    order = _run_in_order(
+        LLMDispatcher(concurrency=1),
+        [("analysis", 1), ("summary", 1), ("quote", 1), ("reply", 1), ("analysis", 2)],
+    )
+    assert [call_type for call_type, _ in order] == ["reply", "quote", "summary", "analysis", "analysis"]
+
+
+def test_users_take_turns_within_a_class():
+    # User 1 queued a backfill before users 2 and 3 asked for anything
+    calls = [("analysis", 1)] * 4 + [("analysis", 2), ("analysis", 3)]
+    order = _run_in_order(LLMDispatcher(concurrency=1), calls)
+    assert [user for _, user in order] == [1, 2, 3, 1, 1, 1]
+
+
+def test_unknown_call_type_is_background_work():
+    order = _run_in_order(LLMDispatcher(concurrency=1), [("embedding", 1), ("summary", 1)])
+    assert order == [("summary", 1), ("embedding", 1)]
+
+
+def test_starved_call_goes_first():
+    order = _run_in_order(
+        LLMDispatcher(concurrency=1, starvation_seconds=0.0),
+        [("analysis", 1), ("reply", 2)],
+    )
+    assert order == [("analysis", 1), ("reply", 2)]
+
+
+def test_concurrency_bound_and_metrics():
+    dispatcher = LLMDispatcher(concurrency=2)
+    peak = 0
+
+    async def call(call_type, user_id):
+        nonlocal peak
+        async with dispatcher.slot(call_type, user_id):
+            peak = max(peak, dispatcher.active)
+            await asyncio.sleep(0.01)
+
+    async def run():
+        await asyncio.gather(*(call("analysis", i % 3) for i in range(6)), call("reply", 9))
+
+    asyncio.run(run())
+    snapshot = dispatcher.snapshot()
+    assert peak == 2
+    assert snapshot["active"] == 0
+    assert snapshot["classes"]["analysis"]["dispatched"] == 6
+    assert snapshot["classes"]["reply"]["dispatched"] == 1
+    assert snapshot["classes"]["analysis"]["wait_max_ms"] > 0
+    assert all(c["queued"] == 0 and c["in_flight"] == 0 for c in snapshot["classes"].values())
+
+
+def test_cancelled_waiter_leaves_the_queue():
+    dispatcher = LLMDispatcher(concurrency=1)
+
+    async def run():
+        release = asyncio.Event()
+        order = []
+        holder = asyncio.create_task(_hold(dispatcher, "reply", 1, order, release))
+        await asyncio.sleep(0)
+        waiting = asyncio.create_task(_hold(dispatcher, "analysis", 2, order, release))
+        await asyncio.sleep(0)
+        assert dispatcher.snapshot()["classes"]["analysis"]["queued"] == 1
+
+        waiting.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiting
+        assert dispatcher.snapshot()["classes"]["analysis"]["queued"] == 0
+
+        release.set()
+        await holder
+        # The slot is free again for the next caller
+        async with dispatcher.slot("analysis", 3):
+            assert dispatcher.active == 1
+
+    asyncio.run(run())
+    assert dispatcher.active == 0
+
+
+def test_failed_call_releases_its_slot():
+    dispatcher = LLMDispatcher(concurrency=1)
+
+    async def run():
+        with pytest.raises(RuntimeError):
+            async with dispatcher.slot("reply", 1):
+                raise RuntimeError("provider down")
+        async with dispatcher.slot("reply", 1):
+            pass
+
+    asyncio.run(run())
+    assert dispatcher.active == 0
@@ -0,0 +1,111 @@
+# backend/tests/test_local_classifier.py
+
+import pytest
+
+import core.local_classifier as local_classifier
+from core.local_classifier import EMOTION_LABELS, THEME_LABELS, HashedNgramClassifier, LexiconClassifier
+from core.text_features import hashed_ngrams
+
+
+def _check_shape(result):
+    assert result["reply"] == ""
+    assert result["emotion"] in EMOTION_LABELS
+    assert result["intensity"] in (1, 2, 3)
+    assert set(result["theme_scores"]) == set(THEME_LABELS)
+    assert abs(sum(result["theme_scores"].values()) - 1.0) < 1e-4
+    assert result["primary_theme"] == max(result["theme_scores"], key=result["theme_scores"].get)
+    assert 0.0 <= result["confidence"] <= 1.0
+
+
+# -----------------------------
+# Lexicon backend
+# -----------------------------
+def test_lexicon_labels_clear_entries():
+    clf = LexiconClassifier()
+
+    work = clf.classify("So anxious about the deadline, my boss scheduled another meeting. Really stressed.")
+    _check_shape(work)
+    assert work["emotion"] == "anxiety"
+    assert work["primary_theme"] == "work"
+
+    social = clf.classify("Had dinner with friends and laughed so much, such a happy night!")
+    _check_shape(social)
+    assert social["emotion"] == "joy"
+    assert social["primary_theme"] == "social"
+
+
+def test_lexicon_negation_and_intensity():
+    clf = LexiconClassifier()
+    assert clf.classify("I am not happy today")["confidence"] == 0.0
+
+    mild = clf.classify("a bit tired")
+    strong = clf.classify("extremely tired, completely exhausted and drained!!!")
+    assert strong["emotion"] == "tired"
+    assert strong["intensity"] > mild["intensity"]
+    assert strong["confidence"] > mild["confidence"]
+
+
+def test_lexicon_no_evidence_has_zero_confidence():
+    result = LexiconClassifier().classify("The bus arrived at 8.")
+    _check_shape(result)
+    assert result["confidence"] == 0.0
+    assert result["primary_theme"] == "other"
+
+
+# -----------------------------
+# Hashed n-gram backend
+# -----------------------------
+def test_ngram_backend_uses_shipped_weights(tmp_path):
+    np = pytest.importorskip("numpy")
+    dim = 64
+    idx = next(iter(hashed_ngrams("sleepy", dim)))
+    sign = hashed_ngrams("sleepy", dim)[idx]
+
+    arrays = {"dim": np.array(dim)}
+    for head, n in (("emotion", 6), ("intensity", 3), ("theme", 4)):
+        arrays[f"{head}_W"] = np.zeros((dim, n), dtype=np.float32)
+        arrays[f"{head}_b"] = np.zeros(n, dtype=np.float32)
+    arrays["emotion_W"][idx, EMOTION_LABELS.index("tired")] = 10.0 * sign
+    arrays["theme_b"][THEME_LABELS.index("other")] = 5.0
+    path = tmp_path / "weights.npz"
+    np.savez(path, **arrays)
+
+    result = HashedNgramClassifier(str(path)).classify("sleepy")
+    _check_shape(result)
+    assert result["emotion"] == "tired"
+    assert result["primary_theme"] == "other"
+    assert result["confidence"] > 0.9
+
+
+def test_hashed_ngrams_are_stable_and_normalized():
+    a = hashed_ngrams("Quiet evening with tea", 1024)
+    assert a == hashed_ngrams("quiet  evening, with TEA", 1024)
+    assert abs(sum(v * v for v in a.values()) - 1.0) < 1e-9
+
+
+# -----------------------------
+# Threshold / mode
+# -----------------------------
+def test_accepts_only_confident_results_in_on_mode(monkeypatch):
+    monkeypatch.setattr(local_classifier, "LOCAL_CLASSIFIER_THRESHOLD", 0.6)
+
+    monkeypatch.setattr(local_classifier, "LOCAL_CLASSIFIER_MODE", "on")
+    assert local_classifier.accepts({"confidence": 0.6})
+    assert not local_classifier.accepts({"confidence": 0.59})
+    assert not local_classifier.accepts(None)
+
+    # Shadow mode classifies but never replaces the LLM
+    monkeypatch.setattr(local_classifier, "LOCAL_CLASSIFIER_MODE", "shadow")
+    assert local_classifier.enabled()
+    assert not local_classifier.accepts({"confidence": 0.99})
+
+
+def test_agreement_stats_bucket_by_confidence():
+    stats = local_classifier.AgreementStats()
+    local = {"emotion": "joy", "intensity": 2, "primary_theme": "social", "confidence": 0.75}
+    stats.record_comparison(local, {"emotion": "joy", "intensity": 1, "primary_theme": "social"})
+    stats.record_comparison(local, {"emotion": "calm", "intensity": 2, "primary_theme": "social"})
+
+    snap = stats.snapshot()
+    assert snap["llm_fallbacks"] == 2
+    assert snap["agreement_by_confidence"][">=0.7"] == {"n": 2, "emotion": 0.5, "theme": 1.0, "intensity": 0.5}
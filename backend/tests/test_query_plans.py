@@ -0,0 +1,97 @@
+# backend/tests/test_query_plans.py
+#
+# The per-user journal reads must be served by the partial (user_id, created_at)
+# indexes. Needs a reachable DATABASE_URL; skipped otherwise. Everything runs in
+# one transaction that is rolled back, so no schema or data is left behind.
+
+from datetime import date, datetime, timezone
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy import event, text
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import Session
+from sqlalchemy.schema import CreateIndex
+
+import models  # noqa: F401
+from database import Base, engine
+from models import JournalEntry
+from routers.entries import _encode_cursor, get_entries
+from services.search_service import search_entries
+from services.time_capsule_service import _find_entry_on_date
+from startup.schema_upgrades import SCHEMA_UPGRADES
+
+
+@pytest.fixture
+def db():
+    try:
+        conn = engine.connect()
+    except OperationalError:
+        pytest.skip("database not reachable")
+
+    trans = conn.begin()
+    Base.metadata.create_all(conn)
+    for stmt in SCHEMA_UPGRADES:
+        conn.execute(text(stmt))
+    for index in JournalEntry.__table__.indexes:
+        conn.execute(CreateIndex(index, if_not_exists=True))
+    conn.exec_driver_sql("ANALYZE journal_entries")
+    conn.exec_driver_sql("SET LOCAL enable_seqscan = off")
+
+    session = Session(bind=conn)
+    try:
+        yield session
+    finally:
+        session.close()
+        trans.rollback()
+        conn.close()
+
+
+def _plans(db: Session, run) -> list[str]:
+    """EXPLAIN every journal_entries statement `run` executes."""
+    conn = db.connection()
+    captured = []
+
+    def capture(_conn, _cursor, statement, parameters, _context, _executemany):
+        if "journal_entries" in statement and statement.lstrip().upper().startswith("SELECT"):
+            captured.append((statement, parameters))
+
+    event.listen(conn, "before_cursor_execute", capture)
+    try:
+        run()
+    finally:
+        event.remove(conn, "before_cursor_execute", capture)
+
+    assert captured, "no journal_entries query was issued"
+    return [
+        "\n".join(row[0] for row in conn.exec_driver_sql("EXPLAIN " + statement, parameters))
+        for statement, parameters in captured
+    ]
+
+
+def _assert_indexed(plans: list[str]) -> None:
+    for plan in plans:
+        assert "Seq Scan on journal_entries" not in plan, plan
+        assert "ix_journal_entries_user_created" in plan, plan
+
+
+def _list(db, **params):
+    query = {"date": None, "from_date": None, "to_date": None, "limit": 50, "cursor": None, **params}
+    return lambda: get_entries(**query, db=db, current_user=SimpleNamespace(id=1))
+
+
+def test_entry_list_uses_partial_index(db):
+    cursor = _encode_cursor(datetime(2026, 3, 14, 8, 30, tzinfo=timezone.utc), 42)
+    _assert_indexed(_plans(db, _list(db)))
+    _assert_indexed(_plans(db, _list(db, date="2026-03")))
+    _assert_indexed(_plans(db, _list(db, cursor=cursor)))
+
+
+def test_time_capsule_lookup_uses_partial_index(db):
+    _assert_indexed(_plans(db, lambda: _find_entry_on_date(db, 1, date(2025, 3, 1))))
+
+
+def test_search_uses_an_index(db):
+    plans = _plans(db, lambda: search_entries(db, 1, "long day", limit=21, after=(0.5, 42), emotion="tired"))
+    for plan in plans:
+        assert "Seq Scan on journal_entries" not in plan, plan
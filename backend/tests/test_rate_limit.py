@@ -0,0 +1,137 @@
+# backend/tests/test_rate_limit.py
+
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+from fastapi import Depends, FastAPI, HTTPException
+from fastapi.testclient import TestClient
+
+import core.rate_limit as rate_limit
+from core.auth import get_current_user
+from core.rate_limit import MemoryRateLimitBackend, RateLimiter, llm_rate_limit
+
+
+@pytest.fixture
+def limiter(monkeypatch):
+    lim = RateLimiter(MemoryRateLimitBackend())
+    monkeypatch.setattr(rate_limit, "rate_limiter", lim)
+    monkeypatch.setattr(rate_limit, "RATE_LIMIT_USER_CONCURRENCY", 2)
+    monkeypatch.setitem(rate_limit.USER_BURST, "reply", 3)
+    monkeypatch.setitem(rate_limit.USER_RATE_PER_MINUTE, "reply", 6)
+    monkeypatch.setattr(rate_limit, "RATE_LIMIT_GLOBAL_BURST", 100)
+    monkeypatch.setattr(rate_limit, "RATE_LIMIT_GLOBAL_PER_MINUTE", 600)
+    return lim
+
+
+# -----------------------------
+# Token bucket
+# -----------------------------
+def test_bucket_allows_burst_then_reports_wait(monkeypatch):
+    clock = [1000.0]
+    monkeypatch.setattr(rate_limit.time, "monotonic", lambda: clock[0])
+    backend = MemoryRateLimitBackend()
+
+    async def run():
+        assert [await backend.take("k", 3, 0.5) for _ in range(3)] == [0.0, 0.0, 0.0]
+        assert await backend.take("k", 3, 0.5) == pytest.approx(2.0)
+
+        clock[0] += 1.0  # half a token back
+        assert await backend.take("k", 3, 0.5) == pytest.approx(1.0)
+        clock[0] += 1.0
+        assert await backend.take("k", 3, 0.5) == 0.0
+
+        clock[0] += 3600  # refills only up to the burst size
+        assert [await backend.take("k", 3, 0.5) for _ in range(4)][-1] > 0
+
+    asyncio.run(run())
+
+
+def test_slots_are_per_key():
+    backend = MemoryRateLimitBackend()
+
+    async def run():
+        a1 = await backend.acquire_slot("a", 1)
+        assert a1 is not None
+        assert await backend.acquire_slot("a", 1) is None
+        assert await backend.acquire_slot("b", 1) is not None
+        await backend.release_slot("a", a1)
+        assert await backend.acquire_slot("a", 1) is not None
+
+    asyncio.run(run())
+
+
+# -----------------------------
+# Limiter
+# -----------------------------
+def test_user_rate_limit_is_per_user(limiter):
+    async def run():
+        for _ in range(3):
+            await limiter.release(await limiter.acquire(1, "reply"))
+        with pytest.raises(HTTPException) as exc:
+            await limiter.acquire(1, "reply")
+        assert exc.value.status_code == 429
+        assert exc.value.headers["Retry-After"] == "10"  # 1 token at 6/min
+
+        await limiter.release(await limiter.acquire(2, "reply"))
+
+    asyncio.run(run())
+    assert limiter.counters["allowed"] == 4
+    assert limiter.counters["rejected_user_rate"] == 1
+
+
+def test_concurrency_cap(limiter):
+    async def run():
+        first = await limiter.acquire(1, "reply")
+        second = await limiter.acquire(1, "reply")
+        with pytest.raises(HTTPException) as exc:
+            await limiter.acquire(1, "reply")
+        assert exc.value.headers["Retry-After"] == "1"
+
+        await limiter.release(first)
+        await limiter.release(await limiter.acquire(1, "reply"))
+        await limiter.release(second)
+
+    asyncio.run(run())
+    assert limiter.counters["rejected_concurrency"] == 1
+
+
+def test_global_rejection_frees_the_slot(limiter, monkeypatch):
+    monkeypatch.setattr(rate_limit, "RATE_LIMIT_GLOBAL_BURST", 1)
+
+    async def run():
+        held = await limiter.acquire(1, "reply")
+        with pytest.raises(HTTPException) as exc:
+            await limiter.acquire(2, "reply")
+        assert exc.value.status_code == 429
+        await limiter.release(held)
+
+    asyncio.run(run())
+    assert limiter.counters["rejected_global_rate"] == 1
+    assert limiter.backend._slots == {}
+
+
+# -----------------------------
+# Route dependency
+# -----------------------------
+def test_dependency_returns_429_with_retry_after(limiter):
+    app = FastAPI()
+    app.dependency_overrides[get_current_user] = lambda: SimpleNamespace(id=7)
+
+    @app.post("/reply", dependencies=[Depends(llm_rate_limit("reply"))])
+    async def reply():
+        return {"ok": True}
+
+    with TestClient(app) as client:
+        statuses = [client.post("/reply").status_code for _ in range(4)]
+        rejected = client.post("/reply")
+
+    assert statuses == [200, 200, 200, 429]
+    assert rejected.status_code == 429
+    assert int(rejected.headers["Retry-After"]) >= 1
+    assert limiter.backend._slots == {}  # every slot released after its response
+
+
+def test_unknown_class_is_a_programming_error():
+    with pytest.raises(ValueError):
+        llm_rate_limit("export")
@@ -0,0 +1,177 @@
+# backend/tests/test_resilience.py
+
+import asyncio
+import json
+import time
+
+import httpx
+import pytest
+from fastapi import HTTPException
+
+import core.resilience as resilience
+from core.resilience import CircuitBreaker, LLMProviderError, RetryBudget
+
+
+@pytest.fixture
+def breaker(monkeypatch):
+    b = CircuitBreaker(failure_threshold=2, cooldown=0.05)
+    monkeypatch.setattr(resilience, "breaker", b)
+    monkeypatch.setattr(resilience, "retry_budget", RetryBudget(ratio=0.0, max_tokens=10))
+    monkeypatch.setattr(resilience, "latency", resilience.LatencyTracker())
+    monkeypatch.setattr(resilience, "_backoff_delay", lambda attempt: 0)
+    return b
+
+
+def _open_then_cool(b: CircuitBreaker) -> None:
+    for _ in range(b.failure_threshold):
+        b.record_failure()
+    assert b.state == "open"
+    time.sleep(b.cooldown + 0.01)
+
+
+# -----------------------------
+# Circuit breaker state machine
+# -----------------------------
+def test_breaker_closed_open_half_open_closed(breaker):
+    assert breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == "closed"
+    breaker.record_failure()
+    assert breaker.state == "open"
+    assert not breaker.allow()
+
+    time.sleep(breaker.cooldown + 0.01)
+    assert breaker.allow()              # the single probe
+    assert breaker.state == "half_open"
+    assert not breaker.allow()          # probe already in flight
+
+    breaker.record_success()
+    assert breaker.state == "closed"
+    assert breaker.allow()
+
+
+def test_failed_probe_reopens(breaker):
+    _open_then_cool(breaker)
+    assert breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == "open"
+    assert not breaker.allow()
+
+
+def test_cancelled_probe_releases_slot(breaker):
+    _open_then_cool(breaker)
+
+    async def hang(timeout):
+        await asyncio.sleep(10)
+
+    async def run():
+        task = asyncio.ensure_future(resilience.execute("reply", hang))
+        await asyncio.sleep(0.01)
+        assert breaker.state == "half_open"
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    asyncio.run(run())
+    assert breaker.state == "half_open"
+    assert breaker.allow()  # next caller may probe again
+
+
+def test_unexpected_error_in_probe_is_recorded(breaker):
+    _open_then_cool(breaker)
+
+    async def broken(timeout):
+        raise ValueError("not json")
+
+    with pytest.raises(ValueError):
+        asyncio.run(resilience.execute("reply", broken))
+    assert breaker.state == "open"
+    time.sleep(breaker.cooldown + 0.01)
+    assert breaker.allow()
+
+
+# -----------------------------
+# Retry budget
+# -----------------------------
+def test_retry_budget_spend():
+    budget = RetryBudget(ratio=0.5, max_tokens=1)
+    assert budget.try_spend()
+    assert not budget.try_spend()
+    budget.record_request()
+    budget.record_request()
+    assert budget.try_spend()
+
+
+def test_spent_retry_budget_stops_retries(breaker, monkeypatch):
+    monkeypatch.setattr(resilience, "LLM_MAX_RETRIES", 5)
+    monkeypatch.setattr(resilience, "retry_budget", RetryBudget(ratio=0.0, max_tokens=1))
+    breaker.failure_threshold = 100
+    calls = []
+
+    async def failing(timeout):
+        calls.append(timeout)
+        raise LLMProviderError("503", status_code=503)
+
+    with pytest.raises(HTTPException) as exc:
+        asyncio.run(resilience.execute("reply", failing))
+    assert exc.value.status_code == 502
+    assert len(calls) == 2  # first attempt + the only budgeted retry
+
+
+# -----------------------------
+# Hedging
+# -----------------------------
+def test_hedge_winner_cancels_loser(breaker, monkeypatch):
+    monkeypatch.setattr(resilience, "LLM_HEDGE_ENABLED", True)
+    monkeypatch.setattr(resilience, "LLM_HEDGE_MIN_DELAY", 0.01)
+    monkeypatch.setattr(resilience.latency, "p95", lambda call_type: 0.01)
+    started = []
+    cancelled = []
+
+    async def fn(timeout):
+        n = len(started)
+        started.append(n)
+        try:
+            await asyncio.sleep(1.0 if n == 0 else 0.01)
+        except asyncio.CancelledError:
+            cancelled.append(n)
+            raise
+        return f"attempt-{n}"
+
+    async def run():
+        result = await resilience.execute("reply", fn)
+        await asyncio.sleep(0)  # let the loser observe its cancellation
+        return result
+
+    assert asyncio.run(run()) == "attempt-1"
+    assert cancelled == [0]
+    assert breaker.state == "closed"
+
+
+# -----------------------------
+# Streaming: disconnect releases the probe
+# -----------------------------
+def test_stream_disconnect_releases_probe(breaker, monkeypatch):
+    import core.ai_client as ai_client
+
+    monkeypatch.setattr(ai_client, "breaker", breaker)
+    monkeypatch.setattr(ai_client, "LLM_CACHE_ENABLED", False)
+
+    def handler(request):
+        lines = "".join(
+            f"data: {json.dumps({'choices': [{'delta': {'content': c}}]})}\n\n" for c in ["a", "b", "c"]
+        )
+        return httpx.Response(200, content=lines.encode(), headers={"content-type": "text/event-stream"})
+
+    client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    monkeypatch.setattr(ai_client, "get_client", lambda: client)
+    _open_then_cool(breaker)
+
+    async def run():
+        stream = ai_client.stream_siliconflow("hello")
+        assert await stream.__anext__() == "a"
+        await stream.aclose()  # client went away mid-stream
+        await client.aclose()
+
+    asyncio.run(run())
+    assert breaker.allow()
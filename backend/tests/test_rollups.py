@@ -0,0 +1,52 @@
+# backend/tests/test_rollups.py
+
+from datetime import datetime, timedelta, timezone
+
+from services.rollup_service import _add, entry_contribution
+
+
+def _entry(**overrides):
+    values = {
+        "user_id": 7,
+        "created_at": datetime(2026, 3, 1, 23, 30, tzinfo=timezone(timedelta(hours=-5))),
+        "content": "Long day at work,\n very tired",
+        "emotion": "tired",
+        "emotion_intensity": 3,
+        "theme_scores": {"work": 3, "hobbies": 0, "social": "1", "other": -2},
+        "deleted": False,
+    }
+    values.update(overrides)
+    return values
+
+
+def test_contribution_uses_utc_day_and_entry_scores():
+    key, deltas = entry_contribution(_entry())
+
+    assert key == (7, datetime(2026, 3, 2).date())  # 23:30 at UTC-5 is the next UTC day
+    assert deltas["entry_count"] == 1
+    assert deltas["word_count"] == 6
+    assert deltas["char_count"] == len("Long day at work,\n very tired")
+    assert deltas["emotion_tired"] == 1
+    assert deltas["valence_sum"] == -1.3
+    assert deltas["pleasure_sum"] == 3.0
+    assert deltas["theme_count"] == 1
+    assert (deltas["theme_work"], deltas["theme_social"], deltas["theme_other"]) == (0.75, 0.25, 0.0)
+
+
+def test_deleted_or_unscored_entries():
+    assert entry_contribution(_entry(deleted=True)) is None
+
+    _, deltas = entry_contribution(_entry(emotion=None, emotion_intensity=None, theme_scores={"work": 0}))
+    assert deltas["valence_sum"] == 0 and deltas["pleasure_sum"] == 0
+    assert "theme_count" not in deltas and "emotion_tired" not in deltas
+
+
+def test_reanalysis_nets_to_the_difference():
+    changes = {}
+    _add(changes, entry_contribution(_entry()), -1)
+    _add(changes, entry_contribution(_entry(emotion="joy", emotion_intensity=2)), +1)
+
+    (deltas,) = changes.values()
+    assert deltas["entry_count"] == 0 and deltas["word_count"] == 0
+    assert deltas["emotion_tired"] == -1 and deltas["emotion_joy"] == 1
+    assert round(deltas["valence_sum"], 6) == round(2.0 + 1.3, 6)
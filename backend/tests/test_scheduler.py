@@ -0,0 +1,178 @@
+# backend/tests/test_scheduler.py
+
+import asyncio
+from datetime import datetime, timezone
+
+import pytest
+
+from core.scheduler import CronSchedule, Scheduler, run_bounded
+
+
+def _utc(*args):
+    return datetime(*args, tzinfo=timezone.utc)
+
+
+# -----------------------------
+# Cron expressions
+# -----------------------------
+def test_daily_schedule():
+    cron = CronSchedule("0 3 * * *")
+    assert cron.next_after(_utc(2025, 11, 19, 1, 30)) == _utc(2025, 11, 19, 3, 0)
+    assert cron.next_after(_utc(2025, 11, 19, 3, 0)) == _utc(2025, 11, 20, 3, 0)  # strictly after
+    assert cron.next_after(_utc(2025, 12, 31, 23, 59, 30)) == _utc(2026, 1, 1, 3, 0)
+
+
+def test_steps_ranges_and_lists():
+    cron = CronSchedule("*/15 9-17/4 * * *")
+    assert cron.next_after(_utc(2025, 1, 1, 9, 1)) == _utc(2025, 1, 1, 9, 15)
+    assert cron.next_after(_utc(2025, 1, 1, 9, 50)) == _utc(2025, 1, 1, 13, 0)
+    assert cron.next_after(_utc(2025, 1, 1, 17, 45)) == _utc(2025, 1, 2, 9, 0)
+
+    assert CronSchedule("5,35 * * * *").next_after(_utc(2025, 1, 1, 0, 10)) == _utc(2025, 1, 1, 0, 35)
+
+
+def test_day_of_week_uses_sunday_zero():
+    monday = _utc(2025, 11, 17, 12, 0)
+    assert CronSchedule("0 4 * * 0").next_after(monday) == _utc(2025, 11, 23, 4, 0)
+    assert CronSchedule("0 4 * * 7").next_after(monday) == _utc(2025, 11, 23, 4, 0)
+    assert CronSchedule("0 4 * * 1-5").next_after(monday) == _utc(2025, 11, 18, 4, 0)
+
+
+def test_restricted_day_fields_match_either():
+    # The 1st of the month or any Friday
+    cron = CronSchedule("0 0 1 * 5")
+    assert cron.next_after(_utc(2025, 11, 17)) == _utc(2025, 11, 21)
+    assert cron.next_after(_utc(2025, 11, 29)) == _utc(2025, 12, 1)
+
+
+def test_rare_and_impossible_dates():
+    assert CronSchedule("0 0 29 2 *").next_after(_utc(2025, 3, 1)) == _utc(2028, 2, 29)
+    with pytest.raises(ValueError):
+        CronSchedule("0 0 31 2 *").next_after(_utc(2025, 1, 1))
+
+
+@pytest.mark.parametrize("expression", ["* * * *", "60 * * * *", "* 24 * * *", "*/0 * * * *", "5-1 * * * *"])
+def test_invalid_expressions(expression):
+    with pytest.raises(ValueError):
+        CronSchedule(expression)
+
+
+# -----------------------------
+# Running jobs
+# -----------------------------
+def test_overlapping_run_is_skipped():
+    scheduler = Scheduler()
+    release = None
+    runs = []
+
+    @scheduler.job("slow", "* * * * *")
+    async def slow():
+        runs.append(1)
+        await release.wait()
+        return "done"
+
+    async def run():
+        nonlocal release
+        release = asyncio.Event()
+        first = scheduler._launch(scheduler.jobs["slow"])
+        await asyncio.sleep(0)
+        assert scheduler._launch(scheduler.jobs["slow"]) is None
+        release.set()
+        await first
+
+    asyncio.run(run())
+    metrics = scheduler.snapshot()["jobs"]["slow"]
+    assert runs == [1]
+    assert (metrics["runs"], metrics["skipped"], metrics["running"]) == (1, 1, 0)
+    assert metrics["last_result"] == "done"
+
+
+def test_global_job_slots():
+    scheduler = Scheduler(max_concurrent_jobs=1)
+    active = []
+    peak = 0
+
+    def _make(name):
+        @scheduler.job(name, "* * * * *")
+        async def job():
+            nonlocal peak
+            active.append(name)
+            peak = max(peak, len(active))
+            await asyncio.sleep(0.01)
+            active.remove(name)
+
+    for name in ("a", "b", "c"):
+        _make(name)
+
+    async def run():
+        await asyncio.gather(*(scheduler.run_job(name) for name in ("a", "b", "c")))
+
+    asyncio.run(run())
+    assert peak == 1
+    assert all(m["runs"] == 1 for m in scheduler.snapshot()["jobs"].values())
+
+
+def test_failures_and_timeouts_are_recorded():
+    scheduler = Scheduler()
+
+    @scheduler.job("broken", "* * * * *")
+    async def broken():
+        raise RuntimeError("no database")
+
+    @scheduler.job("stuck", "* * * * *", timeout=0.01)
+    async def stuck():
+        await asyncio.sleep(10)
+
+    async def run():
+        await scheduler.run_job("broken")
+        await scheduler.run_job("stuck")
+
+    asyncio.run(run())
+    jobs = scheduler.snapshot()["jobs"]
+    assert jobs["broken"]["failures"] == 1
+    assert jobs["broken"]["last_error"] == "RuntimeError: no database"
+    assert jobs["stuck"]["failures"] == 1
+    assert jobs["stuck"]["last_error"].startswith("TimeoutError")
+
+
+def test_tick_runs_due_jobs_only_on_the_leader():
+    scheduler = Scheduler()
+    runs = []
+
+    @scheduler.job("tick", "0 3 * * *")
+    async def tick():
+        runs.append(1)
+
+    async def run():
+        scheduler._tick(_utc(2025, 11, 19, 2, 59))
+        scheduler._tick(_utc(2025, 11, 19, 3, 0))  # due, but not the leader
+        await asyncio.sleep(0)
+        assert runs == []
+        assert scheduler.jobs["tick"].next_run == _utc(2025, 11, 20, 3, 0)
+
+        scheduler.is_leader = True
+        scheduler._tick(_utc(2025, 11, 20, 3, 0, 10))
+        await asyncio.gather(*scheduler._running)
+
+    asyncio.run(run())
+    assert runs == [1]
+
+
+def test_run_bounded_limits_concurrency_and_isolates_failures():
+    active = 0
+    peak = 0
+
+    async def work(n):
+        nonlocal active, peak
+        active += 1
+        peak = max(peak, active)
+        await asyncio.sleep(0.01)
+        active -= 1
+        if n == 3:
+            raise ValueError("bad item")
+        return n
+
+    results, failures = asyncio.run(run_bounded(range(8), work, 2))
+    assert peak == 2
+    assert sorted(results) == [0, 1, 2, 4, 5, 6, 7]
+    assert failures == 1
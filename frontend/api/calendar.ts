@@ -0,0 +1,45 @@
+// frontend/api/calendar.ts
+import { apiRequest } from "./index";
+
+export type PawLevel = "none" | "light" | "dark";
+
+export interface YearCalendar {
+  year: number;
+  start: string; // YYYY-MM-DD, day 0
+  days: number;
+  counts: string; // base64, one byte (entry count, capped at 255) per day
+  paw: string; // one digit per day, index into paw_levels
+  paw_levels: PawLevel[];
+  total_entries: number;
+  active_days: number;
+}
+
+export interface YearCalendarDay {
+  date: string;
+  paw: PawLevel;
+}
+
+export const calendarApi = {
+  async getWeek(): Promise<{ week: YearCalendarDay[] }> {
+    return apiRequest("/journals/calendar/week");
+  },
+
+  async getMonth(month: string): Promise<{ month: PawLevel[][] }> {
+    return apiRequest(`/journals/calendar/month?month=${month}`);
+  },
+
+  async getYear(year?: number): Promise<YearCalendar> {
+    return apiRequest(`/journals/calendar/year${year ? `?year=${year}` : ""}`);
+  },
+};
+
+/** Expand the compact `paw` string into one cell per day (for a heatmap grid). */
+export function decodeYearCalendar(data: YearCalendar): YearCalendarDay[] {
+  const [y, m, d] = data.start.split("-").map(Number);
+  const days: YearCalendarDay[] = [];
+  for (let i = 0; i < data.days; i++) {
+    const date = new Date(Date.UTC(y, m - 1, d + i)).toISOString().slice(0, 10);
+    days.push({ date, paw: data.paw_levels[Number(data.paw[i])] ?? "none" });
+  }
+  return days;
+}
@@ -27,6 +27,30 @@ export interface EntrySummary {
   primary_theme?: EntryTheme | null;
 }
 
+// Backend EntryPage mapping (one page of the list)
+export interface EntryPage {
+  items: EntrySummary[];
+  next_cursor: string | null;
+}
+
+// Backend EntrySearchHit mapping (search result)
+export interface EntrySearchHit extends EntrySummary {
+  rank: number;
+  // Matching passages; matched words are wrapped in <mark></mark>
+  snippet: string;
+}
+
+export interface EntrySearchPage {
+  items: EntrySearchHit[];
+  next_cursor: string | null;
+}
+
+// Backend SimilarEntryOut mapping
+export interface SimilarEntry extends EntrySummary {
+  // Content similarity (higher is closer)
+  score: number;
+}
+
 // Backend EntryOut mapping (detail view)
 export interface Entry {
   id: number;
@@ -47,9 +71,25 @@ export interface Entry {
   // Now an object, not a string
   ai_reply?: AIReply | null;
 
+  // Analysis pipeline state (AI reply/emotion/theme are filled in asynchronously)
+  analysis_status?: AnalysisStatus | null;
+
   pleasure: number;
 }
 
+export type AnalysisStatus = "pending" | "done" | "failed";
+
+// Backend AnalysisStatusOut mapping (polling)
+export interface EntryAnalysisStatus {
+  entry_id: number;
+  analysis_status: AnalysisStatus;
+  job_type?: "reply" | "analysis" | null;
+  job_status?: string | null;
+  attempts: number;
+  last_error?: string | null;
+  ai_reply_ready: boolean;
+}
+
 // Comment type
 export interface EntryComment {
   id: number;
@@ -59,17 +99,24 @@ export interface EntryComment {
 }
 
 export const entriesApi = {
-  /** Get all entries of current user */
-  async getAll(params?: {
+  /**
+   * Get one page of the current user's entries (newest first).
+   * Pass the previous page's next_cursor as `cursor` to continue; next_cursor is null on the last page.
+   */
+  async list(params?: {
     date?: string;
     from_date?: string;
     to_date?: string;
-  }): Promise<EntrySummary[]> {
+    limit?: number;
+    cursor?: string | null;
+  }): Promise<EntryPage> {
     const query = new URLSearchParams();
 
     if (params?.date) query.append("date", params.date);
     if (params?.from_date) query.append("from_date", params.from_date);
     if (params?.to_date) query.append("to_date", params.to_date);
+    if (params?.limit) query.append("limit", String(params.limit));
+    if (params?.cursor) query.append("cursor", params.cursor);
 
     const qs = query.toString();
     // Keep trailing slash to avoid redirect losing Authorization header
@@ -78,11 +125,49 @@ export const entriesApi = {
     return apiRequest(url, { method: "GET" });
   },
 
+  /** Months ("YYYY-MM", UTC) that have entries, newest first */
+  async getMonths(): Promise<string[]> {
+    return apiRequest("/entries/months", { method: "GET" });
+  },
+
+  /**
+   * Full-text search over the current user's entries (best match first).
+   * q supports "quoted phrases", -excluded words and OR.
+   */
+  async search(params: {
+    q: string;
+    emotion?: string;
+    theme?: string; // work | hobbies | social | other
+    date?: string;
+    from_date?: string;
+    to_date?: string;
+    limit?: number;
+    cursor?: string | null;
+  }): Promise<EntrySearchPage> {
+    const query = new URLSearchParams({ q: params.q });
+
+    if (params.emotion) query.append("emotion", params.emotion);
+    if (params.theme) query.append("theme", params.theme);
+    if (params.date) query.append("date", params.date);
+    if (params.from_date) query.append("from_date", params.from_date);
+    if (params.to_date) query.append("to_date", params.to_date);
+    if (params.limit) query.append("limit", String(params.limit));
+    if (params.cursor) query.append("cursor", params.cursor);
+
+    return apiRequest(`/entries/search?${query.toString()}`, { method: "GET" });
+  },
+
   /** Get single entry by ID */
   async getOne(id: number): Promise<Entry> {
     return apiRequest(`/entries/${id}`, { method: "GET" });
   },
 
+  /** Entries most similar in content to the given one */
+  async getSimilar(id: number, limit?: number): Promise<SimilarEntry[]> {
+    const qs = limit ? `?limit=${limit}` : "";
+    return apiRequest(`/entries/${id}/similar${qs}`, { method: "GET" });
+  },
+
   /** Create new journal entry */
   async create(payload: { content: string; need_ai_reply: boolean }): Promise<Entry> {
     return apiRequest("/entries/", {
@@ -91,6 +176,11 @@ export const entriesApi = {
     });
   },
 
+  /** Poll analysis progress of a newly created entry */
+  async getAnalysisStatus(id: number): Promise<EntryAnalysisStatus> {
+    return apiRequest(`/entries/${id}/analysis`, { method: "GET" });
+  },
+
   /** Soft delete entry */
   async remove(id: number) {
     return apiRequest(`/entries/${id}`, { method: "DELETE" });
@@ -12,11 +12,31 @@ async function getCacheKey(range: "week" | "month") {
   return `insights_${range}_${tokenSuffix}_${getTodayKey()}`;
 }
 
+// A past or longer period: the week/month/quarter/year containing `date`
+// (YYYY-MM-DD, default today), or a custom start..end (both inclusive)
+export type InsightsPeriod =
+  | { range: "week" | "month" | "quarter" | "year"; date?: string }
+  | { range: "custom"; start: string; end: string };
+
+// A stale note is being regenerated on the server; don't keep it for the day
+async function storeToday(cacheKey: string, res: any) {
+  if (res?.note_stale) {
+    await AsyncStorage.removeItem(cacheKey);
+    return;
+  }
+  await storeToday(cacheKey, res);
+}
+
 export const insightsApi = {
   async getInsights(range: "week" | "month") {
     return apiRequest(`/insights/?range=${range}`);
   },
 
+  async getPeriod(period: InsightsPeriod) {
+    const params = new URLSearchParams(period as Record<string, string>);
+    return apiRequest(`/insights/?${params.toString()}`);
+  },
+
   async getInsightsCached(range: "week" | "month") {
     const cacheKey = await getCacheKey(range);
 
@@ -29,7 +49,7 @@ export const insightsApi = {
 
     const res = await apiRequest(`/insights/?range=${range}`);
     try {
-      await AsyncStorage.setItem(cacheKey, JSON.stringify(res));
+      await storeToday(cacheKey, res);
     } catch {
       // Ignore cache write errors.
     }
@@ -48,7 +68,7 @@ export const insightsApi = {
 
     try {
       const res = await apiRequest(`/insights/?range=${range}`);
-      await AsyncStorage.setItem(cacheKey, JSON.stringify(res));
+      await storeToday(cacheKey, res);
     } catch {
       // Ignore preload failures.
     }
@@ -58,7 +78,7 @@ export const insightsApi = {
     const cacheKey = await getCacheKey(range);
     const res = await apiRequest(`/insights/?range=${range}`);
     try {
-      await AsyncStorage.setItem(cacheKey, JSON.stringify(res));
+      await storeToday(cacheKey, res);
     } catch {
       // Ignore cache write errors.
     }
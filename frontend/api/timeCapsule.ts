@@ -1,7 +1,7 @@
 import AsyncStorage from "@react-native-async-storage/async-storage";
 import { apiRequest, getToken } from "./index";
 
-export type TimeCapsuleSourceLevel = "year" | "month" | "week";
+export type TimeCapsuleSourceLevel = "year" | "month" | "week" | "similar";
 
 export interface TimeCapsule {
   found: boolean;
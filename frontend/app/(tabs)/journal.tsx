@@ -9,6 +9,8 @@ import {
   TouchableOpacity,
   Image,
   ActivityIndicator,
+  NativeSyntheticEvent,
+  NativeScrollEvent,
 } from "react-native";
 import { SafeAreaView } from "react-native-safe-area-context";
 import { useRouter } from "expo-router";
@@ -17,6 +19,9 @@ import { entriesApi } from "@/api/entries";
 import { timeCapsuleApi, TimeCapsule } from "@/api/timeCapsule";
 import { useI18n } from "@/i18n";
 
+// Entries per list request
+const PAGE_SIZE = 30;
+
 // Emotion -> color mapping
 const EMOTION_COLORS: Record<string, string> = {
   joy: "#F4D98E",
@@ -27,19 +32,6 @@ const EMOTION_COLORS: Record<string, string> = {
   anger: "#C66C5E",
 };
 
-// Filter entries by month (year+month)
-function filterEntriesByMonth(allEntries: any[], monthStr: string) {
-  if (!monthStr) return [];
-  const [y, m] = monthStr.split("-");
-  const year = Number(y);
-  const monthInt = Number(m); // 1-12
-
-  return allEntries.filter((e) => {
-    const d = new Date(e.created_at);
-    return d.getFullYear() === year && d.getMonth() + 1 === monthInt;
-  });
-}
-
 export default function JournalListPage() {
   const router = useRouter();
   const { language, t } = useI18n();
@@ -47,6 +39,8 @@ export default function JournalListPage() {
   const [allMonths, setAllMonths] = useState<string[]>([]);
   const [currentMonth, setCurrentMonth] = useState<string>("");
   const [loading, setLoading] = useState(true);
+  const [nextCursor, setNextCursor] = useState<string | null>(null);
+  const [loadingMore, setLoadingMore] = useState(false);
   const [showMonthSelector, setShowMonthSelector] = useState(false);
   const [showHelp, setShowHelp] = useState(false); // Help popup
   const [capsule, setCapsule] = useState<TimeCapsule | null>(null);
@@ -60,25 +54,21 @@ export default function JournalListPage() {
     }, [])
   );
 
-  // Load all entries -> extract months and set default current month list
+  // Load months that have entries -> first page of the most recent month
   async function loadAllMonths() {
     setLoading(true);
     try {
-      const all = await entriesApi.getAll(); // No date -> return all entries
-
-      const months = extractMonths(all);
+      const months = await entriesApi.getMonths();
       setAllMonths(months);
 
       if (months.length > 0) {
         const defaultMonth = months[0]; // Most recent month
         setCurrentMonth(defaultMonth);
-
-        // Keep only entries from this month
-        const filtered = filterEntriesByMonth(all, defaultMonth);
-        setEntries(filtered);
+        await loadMonthPage(defaultMonth);
       } else {
         setCurrentMonth("");
         setEntries([]);
+        setNextCursor(null);
       }
     } catch (err) {
       console.log(err);
@@ -87,19 +77,51 @@ export default function JournalListPage() {
     }
   }
 
+  // First page of a month (replaces the list)
+  async function loadMonthPage(m: string) {
+    const page = await entriesApi.list({ date: m, limit: PAGE_SIZE });
+    setEntries(page.items);
+    setNextCursor(page.next_cursor);
+  }
+
   // When user picks a month: refresh only that month
   async function handleSelectMonth(m: string) {
     setShowMonthSelector(false);
     setCurrentMonth(m);
 
     try {
-      const res = await entriesApi.getAll({ date: m });
-      setEntries(res);
+      await loadMonthPage(m);
     } catch (err) {
       console.log(err);
     }
   }
 
+  // Next page of the current month (appended), when scrolled near the bottom
+  async function loadMore() {
+    if (!nextCursor || loadingMore || !currentMonth) return;
+    setLoadingMore(true);
+    try {
+      const page = await entriesApi.list({
+        date: currentMonth,
+        limit: PAGE_SIZE,
+        cursor: nextCursor,
+      });
+      setEntries((prev) => [...prev, ...page.items]);
+      setNextCursor(page.next_cursor);
+    } catch (err) {
+      console.log(err);
+    } finally {
+      setLoadingMore(false);
+    }
+  }
+
+  function handleListScroll(e: NativeSyntheticEvent<NativeScrollEvent>) {
+    const { layoutMeasurement, contentOffset, contentSize } = e.nativeEvent;
+    if (layoutMeasurement.height + contentOffset.y >= contentSize.height - 200) {
+      loadMore();
+    }
+  }
+
   async function loadTimeCapsule() {
     setCapsuleLoading(true);
     try {
@@ -112,23 +134,6 @@ export default function JournalListPage() {
     }
   }
 
-  // Generate months that have content
-  function extractMonths(allEntries: any[]): string[] {
-    const set = new Set<string>();
-
-    allEntries.forEach((e) => {
-      const d = new Date(e.created_at);
-      const m = `${d.getFullYear()}-${String(d.getMonth() + 1).padStart(
-        2,
-        "0"
-      )}`;
-      set.add(m);
-    });
-
-    // Sort by date descending
-    return Array.from(set).sort((a, b) => (a > b ? -1 : 1));
-  }
-
   if (loading) {
     return (
       <SafeAreaView
@@ -255,10 +260,17 @@ export default function JournalListPage() {
       </View>
 
       {/* Journal List */}
-      <ScrollView style={{ flex: 1 }}>
+      <ScrollView
+        style={{ flex: 1 }}
+        onScroll={handleListScroll}
+        scrollEventThrottle={200}
+      >
         {entries.map((entry) => (
           <JournalCard key={entry.id} entry={entry} />
         ))}
+        {loadingMore && (
+          <ActivityIndicator style={{ marginVertical: 16 }} color="#6A4B3C" />
+        )}
       </ScrollView>
 
       {/* Help popup: centered card with question icon + text */}
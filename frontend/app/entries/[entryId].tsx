@@ -103,6 +103,28 @@ export default function EntryDetailScreen() {
     };
   }, [entryId]);
 
+  // Analysis runs in the background after save; poll until it finishes
+  useEffect(() => {
+    if (!entryId || entry?.analysis_status !== "pending") return;
+
+    let active = true;
+    const timer = setInterval(async () => {
+      try {
+        const status = await entriesApi.getAnalysisStatus(Number(entryId));
+        if (!active || status.analysis_status === "pending") return;
+        const data = await entriesApi.getOne(Number(entryId));
+        if (active) setEntry(data);
+      } catch (e) {
+        console.log("Failed to poll analysis status:", e);
+      }
+    }, 2000);
+
+    return () => {
+      active = false;
+      clearInterval(timer);
+    };
+  }, [entryId, entry?.analysis_status]);
+
   // Fetch comment list (self-notes)
   useEffect(() => {
     if (!entryId) return;